@@ -0,0 +1,124 @@
+from typing import List, Dict, Any
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+
+from api.keys import get_services
+from utils.playwright_runtime import playwright_runtime
+from services.login_flow import login_timing_stats
+from services.frame_registry import frame_discovery_stats
+
+router = APIRouter()
+
+class PooledBrowserResponse(BaseModel):
+    index: int
+    connected: bool
+    active_contexts: int
+    contexts_created: int
+    uptime: float
+    retiring: bool
+
+class BrowserPoolResponse(BaseModel):
+    running: bool
+    size: int
+    max_contexts_per_browser: int
+    capacity: int
+    active_contexts: int
+    contexts_per_launch: float
+    browsers_launched: int
+    browsers_recycled: int
+    browsers_replaced: int
+    contexts_created: int
+    contexts_released: int
+    health_checks: int
+    acquire_wait_time: float
+    requests_blocked: int
+    bytes_saved: int
+    browsers: List[PooledBrowserResponse]
+
+@router.get("/pool", response_model=BrowserPoolResponse)
+async def get_browser_pool_statistics(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    browser_pool = services["key_checker"].browser_pool
+    return browser_pool.get_statistics()
+
+@router.post("/pool/health-check")
+async def run_browser_pool_health_check(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    browser_pool = services["key_checker"].browser_pool
+    return await browser_pool.check_health()
+
+@router.get("/processes")
+async def get_browser_process_statistics(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    browser_pool = services["key_checker"].browser_pool
+    return {
+        **playwright_runtime.get_process_statistics(),
+        "pooled_browsers": len(browser_pool.browsers),
+        "active_contexts": sum(pooled.active_contexts for pooled in browser_pool.browsers)
+    }
+
+@router.get("/supervisor")
+async def get_supervisor_statistics(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    supervisor = services["key_checker"].supervisor
+    return supervisor.get_statistics()
+
+@router.get("/consent")
+async def get_consent_cookie_statistics(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    consent_cookies = services["key_checker"].browser_pool.consent_cookies
+    return consent_cookies.get_statistics()
+
+@router.get("/login-states")
+async def get_login_state_statistics():
+    
+    return login_timing_stats.get_statistics()
+
+@router.get("/frames")
+async def get_frame_discovery_statistics():
+    
+    return frame_discovery_stats.get_statistics()
+
+@router.get("/selectors")
+async def get_selector_statistics(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    selector_stats = services["key_checker"].selector_stats
+    return selector_stats.get_statistics()
+
+@router.delete("/selectors")
+async def clear_selector_statistics(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    selector_stats = services["key_checker"].selector_stats
+    selector_stats.clear()
+    return {"message": "Selector statistics cleared"}
+
+@router.get("/sessions")
+async def get_session_cache_statistics(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    session_cache = services["key_checker"].session_cache
+    return session_cache.get_statistics()
+
+@router.delete("/sessions")
+async def clear_session_cache(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    session_cache = services["key_checker"].session_cache
+    session_cache.clear()
+    return {"message": "Session cache cleared"}
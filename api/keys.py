@@ -54,6 +54,11 @@ class BatchStatusResponse(BaseModel):
     invalid_count: int
     region_error_count: int
     error_count: int
+    scheduling: Dict[str, Any] = {}
+    concurrency: Dict[str, Any] = {}
+    caching: Dict[str, Any] = {}
+    prefilter: Dict[str, Any] = {}
+    workers: Dict[str, Any] = {}
 
 class BatchCreateResponse(BaseModel):
     batch_id: str
@@ -76,6 +81,15 @@ async def get_services():
         "file_processor": file_processor
     }
 
+async def close_services():
+    global account_manager, vpn_manager, key_checker, file_processor
+    if key_checker is not None:
+        await key_checker.close()
+    account_manager = None
+    vpn_manager = None
+    key_checker = None
+    file_processor = None
+
 @router.post("/check", response_model=KeyCheckResponse)
 async def check_key(
     key_input: KeyInput,
@@ -144,7 +158,12 @@ async def get_batch_status(
         "used_count": status["used_keys"],
         "invalid_count": status["invalid_keys"],
         "region_error_count": status["region_error_keys"],
-        "error_count": status["error_keys"]
+        "error_count": status["error_keys"],
+        "scheduling": status["scheduling"],
+        "concurrency": status["concurrency"],
+        "caching": status["caching"],
+        "prefilter": status["prefilter"],
+        "workers": status["workers"]
     }
 
 @router.get("/batch/{batch_id}/results")
@@ -322,4 +341,46 @@ async def get_key_check_status(
             "message": "Произошла ошибка при получении статуса",
             "error_message": str(e),
             "result": None
-        } 
\ No newline at end of file
+        } 
+@router.get("/rate-limits")
+async def get_rate_limits(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    return services["key_checker"].rate_limiter.get_statistics()
+
+@router.get("/cache")
+async def get_result_cache(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    return services["key_checker"].result_cache.get_statistics()
+
+@router.delete("/cache")
+async def clear_result_cache(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    services["key_checker"].result_cache.clear()
+    return {"message": "Result cache cleared"}
+
+@router.get("/in-flight")
+async def get_in_flight_checks(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    return services["key_checker"].single_flight.get_statistics()
+
+@router.get("/prefilter")
+async def get_prefilter_statistics(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    return services["key_checker"].prefilter.get_statistics()
+
+@router.get("/jobs")
+async def get_job_queue(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    return services["key_checker"].job_store.get_statistics()
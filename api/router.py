@@ -3,6 +3,8 @@ from api.keys import router as keys_router
 from api.accounts import router as accounts_router
 from api.vpn import router as vpn_router
 from api.logs import router as logs_router
+from api.browser import router as browser_router
+from api.workers import router as workers_router
 
 router = APIRouter()
 
@@ -10,6 +12,8 @@ router.include_router(keys_router, prefix="/keys", tags=["keys"])
 router.include_router(accounts_router, prefix="/accounts", tags=["accounts"])
 router.include_router(vpn_router, prefix="/vpn", tags=["vpn"])
 router.include_router(logs_router, prefix="/logs", tags=["logs"])
+router.include_router(browser_router, prefix="/browser", tags=["browser"])
+router.include_router(workers_router, prefix="/workers", tags=["workers"])
 
 @router.get("/", tags=["info"])
 async def root():
@@ -23,7 +27,9 @@ async def root():
             "keys": "/keys",
             "accounts": "/accounts",
             "vpn": "/vpn",
-            "logs": "/logs"
+            "logs": "/logs",
+            "browser": "/browser",
+            "workers": "/workers"
         }
     }
 
@@ -2,8 +2,9 @@ from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
-from models.vpn import VPNRegion, VPNService, VPNProvider, VPNStatus
+from models.vpn import VPNRegion, VPNService, VPNProvider, VPNStatus, ProxyEndpoint
 from services.vpn_manager import VPNManager
+from api.keys import get_services
 
 router = APIRouter()
 
@@ -29,6 +30,7 @@ class VPNRegionResponse(BaseModel):
     name: str
     code: str
     is_active: bool
+    proxy: Optional[str] = None
 
 class VPNStatusResponse(BaseModel):
     connected: bool
@@ -134,7 +136,8 @@ async def get_vpn_service_regions(
             "id": region.id,
             "name": region.name,
             "code": region.code,
-            "is_active": region.is_active
+            "is_active": region.is_active,
+            "proxy": region.proxy.server if region.proxy else None
         }
         for region in service.regions
     ]
@@ -177,6 +180,51 @@ async def delete_vpn_service_region(
     
     return {"message": f"Region with ID {region_id} deleted from VPN service {service_name}"}
 
+@router.put("/services/{service_name}/regions/{region_id}/proxy", response_model=VPNRegionResponse)
+async def set_vpn_region_proxy(
+    service_name: str,
+    region_id: str,
+    proxy: ProxyEndpoint,
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    region = await services["vpn_manager"].set_region_proxy(service_name, region_id, proxy)
+    
+    if not region:
+        raise HTTPException(status_code=404, detail=f"VPN service with name {service_name} or region with ID {region_id} not found")
+    
+    return {
+        "id": region.id,
+        "name": region.name,
+        "code": region.code,
+        "is_active": region.is_active,
+        "proxy": region.proxy.server
+    }
+
+@router.delete("/services/{service_name}/regions/{region_id}/proxy")
+async def delete_vpn_region_proxy(
+    service_name: str,
+    region_id: str,
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    region = await services["vpn_manager"].set_region_proxy(service_name, region_id, None)
+    
+    if not region:
+        raise HTTPException(status_code=404, detail=f"VPN service with name {service_name} or region with ID {region_id} not found")
+    
+    return {"message": f"Proxy removed from region with ID {region_id} of VPN service {service_name}"}
+
+@router.get("/proxies")
+async def get_region_proxies(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    return {
+        code: proxy["server"]
+        for code, proxy in services["vpn_manager"].get_region_proxies().items()
+    }
+
 @router.post("/connect/{service_name}/{region_code}")
 async def connect_vpn(
     service_name: str,
@@ -0,0 +1,90 @@
+import hmac
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Header
+from pydantic import BaseModel, Field
+
+from models.key import KeyCheckResult
+from api.keys import get_services
+from config import config
+
+router = APIRouter()
+
+class LeaseRequest(BaseModel):
+    worker: str
+    limit: int = Field(default=1, ge=1, le=100)
+    lease_seconds: Optional[float] = None
+
+class WorkerRequest(BaseModel):
+    worker: str
+
+class JobResult(BaseModel):
+    id: int
+    result: KeyCheckResult
+
+class ResultsRequest(BaseModel):
+    worker: str
+    results: List[JobResult]
+
+async def verify_worker_token(x_worker_token: Optional[str] = Header(default=None)):
+    expected = config.key.job_queue.worker_token
+    if not expected:
+        raise HTTPException(status_code=503, detail="Worker API is disabled: KEY_WORKER_TOKEN is not configured")
+    if not x_worker_token or not hmac.compare_digest(x_worker_token, expected):
+        raise HTTPException(status_code=401, detail="Invalid worker token")
+
+@router.post("/lease", dependencies=[Depends(verify_worker_token)])
+async def lease_jobs(
+    request: LeaseRequest,
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    jobs = services["key_checker"].job_store.claim(request.worker, request.limit, request.lease_seconds)
+    
+    return {
+        "jobs": jobs,
+        "lease_seconds": request.lease_seconds or config.key.job_queue.lease_seconds
+    }
+
+@router.get("/mode", dependencies=[Depends(verify_worker_token)])
+async def get_mode(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    return {"external_workers": services["key_checker"].job_store.accepts_workers()}
+
+@router.post("/heartbeat", dependencies=[Depends(verify_worker_token)])
+async def heartbeat(
+    request: WorkerRequest,
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    return {"extended": services["key_checker"].job_store.extend_leases(request.worker)}
+
+@router.post("/results", dependencies=[Depends(verify_worker_token)])
+async def report_results(
+    request: ResultsRequest,
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    job_store = services["key_checker"].job_store
+    accepted = [item.id for item in request.results if job_store.complete(item.id, request.worker, item.result)]
+    
+    return {
+        "accepted": accepted,
+        "dropped": [item.id for item in request.results if item.id not in accepted]
+    }
+
+@router.post("/release", dependencies=[Depends(verify_worker_token)])
+async def release_jobs(
+    request: WorkerRequest,
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    return {"released": services["key_checker"].job_store.release(request.worker)}
+
+@router.get("/")
+async def get_workers(
+    services: Dict[str, Any] = Depends(get_services)
+):
+    
+    return services["key_checker"].job_store.worker_statistics()
@@ -10,16 +10,98 @@ DATA_DIR = BASE_DIR / "data"
 os.makedirs(LOGS_DIR, exist_ok=True)
 os.makedirs(DATA_DIR, exist_ok=True)
 
+class ConcurrencyConfig(BaseModel):
+    adaptive: bool = True
+    min_parallel: int = 1
+    max_parallel: int = 10
+    window: int = 5  
+    target_latency: float = 45.0  
+    max_error_rate: float = 0.2
+    decrease_factor: float = 0.5
+    decrease_cooldown: float = 15.0  
+    memory_threshold: float = 85.0  
+
+class RateLimitConfig(BaseModel):
+    enabled: bool = True
+    global_per_minute: float = 120.0
+    account_per_minute: float = 20.0
+    region_per_minute: float = 60.0
+    burst: int = 3
+    max_session_wait: float = 5.0
+
+class ResultCacheConfig(BaseModel):
+    enabled: bool = True
+    filename: str = "result_cache.db"
+    max_entries: int = 50000
+    ttl: Dict[str, int] = {
+        "valid": 600,
+        "used": 30 * 86400,
+        "invalid": 30 * 86400,
+        "region_error": 86400
+    }
+
+class JobQueueConfig(BaseModel):
+    enabled: bool = True
+    filename: str = "jobs.db"
+    recover_on_startup: bool = True
+    external_workers: bool = False
+    lease_seconds: float = 300.0
+    poll_interval: float = 2.0
+    worker_token: Optional[str] = None
+
 class KeyConfig(BaseModel):
     max_keys_per_check: int = 1000
     parallel_checks: int = 5
-    check_delay: float = 1.0
+    prefilter_enabled: bool = True
+    concurrency: ConcurrencyConfig = ConcurrencyConfig()
+    rate_limits: RateLimitConfig = RateLimitConfig()
+    result_cache: ResultCacheConfig = ResultCacheConfig()
+    job_queue: JobQueueConfig = JobQueueConfig()
+
+class RedeemResponseConfig(BaseModel):
+    enabled: bool = True
+    url_patterns: List[str] = [
+        "*purchase.mp.microsoft.com/*/tokenDescriptions*",
+        "*purchase.mp.microsoft.com/*/redeem*",
+        "*redeem.microsoft.com/*/api/*",
+        "*account.microsoft.com/*/api/redeem*"
+    ]
+    wait_timeout: int = 10000  
+    token_states: Dict[str, str] = {
+        "active": "success",
+        "redeemed": "used",
+        "deactivated": "disabled",
+        "disabled": "disabled",
+        "expired": "invalid",
+        "invalid": "invalid"
+    }
+    error_codes: Dict[str, str] = {
+        "notfound": "invalid",
+        "tokennotfound": "invalid",
+        "invalidtoken": "invalid",
+        "invalidtokenformat": "invalid",
+        "tokenexpired": "invalid",
+        "tokenalreadyredeemed": "used",
+        "alreadyredeemed": "used",
+        "tokenredeemed": "used",
+        "tokendeactivated": "disabled",
+        "tokendisabled": "disabled",
+        "marketmismatch": "region_error",
+        "invalidmarket": "region_error",
+        "countrymismatch": "region_error",
+        "productnotavailableinmarket": "region_error",
+        "tokenregionmismatch": "region_error"
+    }
 
 class MicrosoftAccountConfig(BaseModel):
     max_checks_per_account: int = 10
     cooldown_period: int = 3600  
     login_timeout: int = 60  
     account_rotation_strategy: str = "sequential"  
+    session_cache_enabled: bool = True
+    session_ttl: int = 1800  
+    cleanup_mode: str = "context_disposal"  
+    redeem_responses: RedeemResponseConfig = RedeemResponseConfig()
 
 class VPNConfig(BaseModel):
     enabled: bool = True
@@ -28,12 +110,69 @@ class VPNConfig(BaseModel):
     connection_timeout: int = 30  
     retry_attempts: int = 3
 
+class ResourceBlockingConfig(BaseModel):
+    enabled: bool = True
+    blocked_resource_types: List[str] = ["image", "font", "media"]
+    allowed_resource_types: List[str] = []  
+    blocked_hosts: List[str] = [
+        "*.clarity.ms",
+        "*.events.data.microsoft.com",
+        "js.monitor.azure.com",
+        "*.google-analytics.com",
+        "*.googletagmanager.com",
+        "*.doubleclick.net",
+        "*.demdex.net",
+        "*.omtrdc.net",
+        "*.adobedtm.com"
+    ]
+    allowed_hosts: List[str] = []
+    estimated_bytes: Dict[str, int] = {
+        "image": 30000,
+        "font": 60000,
+        "media": 250000,
+        "script": 40000,
+        "stylesheet": 20000,
+        "xhr": 2000,
+        "fetch": 2000
+    }
+
+class ConsentCookieConfig(BaseModel):
+    enabled: bool = True
+    cookies: List[Dict[str, str]] = [
+        {"name": "MSCC", "value": "c1=2-c2=2-c3=2", "domain": ".microsoft.com", "path": "/"}
+    ]
+    capture_names: List[str] = ["MSCC"]
+    max_age: int = 31536000  
+
+class SupervisorConfig(BaseModel):
+    enabled: bool = True
+    check_interval: float = 2.0  
+    default_stage_timeout: int = 60  
+    stage_timeouts: Dict[str, int] = {
+        "login": 120,
+        "restore_session": 45,
+        "navigate": 210,
+        "vpn_connect": 60,
+        "key_input": 45,
+        "result_wait": 30
+    }
+    max_requeues: int = 1
+    close_timeout: int = 15  
+
 class BrowserConfig(BaseModel):
     browser_type: str = "chromium"  
     headless: bool = True
     user_agent: Optional[str] = None
     viewport_size: Dict[str, int] = {"width": 1920, "height": 1080}
     timeout: int = 30000  
+    pool_size: int = 2  
+    max_contexts_per_browser: int = 5  
+    recycle_after_contexts: int = 100  
+    health_check_interval: int = 30  
+    debug_screenshots: bool = False
+    blocking: ResourceBlockingConfig = ResourceBlockingConfig()
+    supervisor: SupervisorConfig = SupervisorConfig()
+    consent: ConsentCookieConfig = ConsentCookieConfig()
 
 class APIConfig(BaseModel):
     host: str = "0.0.0.0"
@@ -70,15 +209,75 @@ if os.getenv("KEY_MAX_PER_CHECK"):
 if os.getenv("KEY_PARALLEL_CHECKS"):
     config.key.parallel_checks = int(os.getenv("KEY_PARALLEL_CHECKS"))
 
+if os.getenv("KEY_ADAPTIVE_CONCURRENCY"):
+    config.key.concurrency.adaptive = os.getenv("KEY_ADAPTIVE_CONCURRENCY").lower() == "true"
+
+if os.getenv("KEY_MAX_PARALLEL_CHECKS"):
+    config.key.concurrency.max_parallel = int(os.getenv("KEY_MAX_PARALLEL_CHECKS"))
+
+if os.getenv("KEY_PREFILTER_ENABLED"):
+    config.key.prefilter_enabled = os.getenv("KEY_PREFILTER_ENABLED").lower() == "true"
+
+if os.getenv("KEY_RESULT_CACHE_ENABLED"):
+    config.key.result_cache.enabled = os.getenv("KEY_RESULT_CACHE_ENABLED").lower() == "true"
+
+if os.getenv("KEY_RESULT_CACHE_SIZE"):
+    config.key.result_cache.max_entries = int(os.getenv("KEY_RESULT_CACHE_SIZE"))
+
+if os.getenv("KEY_JOB_QUEUE_ENABLED"):
+    config.key.job_queue.enabled = os.getenv("KEY_JOB_QUEUE_ENABLED").lower() == "true"
+
+if os.getenv("KEY_RECOVER_BATCHES"):
+    config.key.job_queue.recover_on_startup = os.getenv("KEY_RECOVER_BATCHES").lower() == "true"
+
+if os.getenv("KEY_EXTERNAL_WORKERS"):
+    config.key.job_queue.external_workers = os.getenv("KEY_EXTERNAL_WORKERS").lower() == "true"
+
+if os.getenv("KEY_WORKER_TOKEN"):
+    config.key.job_queue.worker_token = os.getenv("KEY_WORKER_TOKEN")
+
+if os.getenv("KEY_RATE_LIMIT_ENABLED"):
+    config.key.rate_limits.enabled = os.getenv("KEY_RATE_LIMIT_ENABLED").lower() == "true"
+
+if os.getenv("KEY_GLOBAL_CHECKS_PER_MINUTE"):
+    config.key.rate_limits.global_per_minute = float(os.getenv("KEY_GLOBAL_CHECKS_PER_MINUTE"))
+
+if os.getenv("KEY_ACCOUNT_CHECKS_PER_MINUTE"):
+    config.key.rate_limits.account_per_minute = float(os.getenv("KEY_ACCOUNT_CHECKS_PER_MINUTE"))
+
+if os.getenv("KEY_REGION_CHECKS_PER_MINUTE"):
+    config.key.rate_limits.region_per_minute = float(os.getenv("KEY_REGION_CHECKS_PER_MINUTE"))
+
 if os.getenv("MS_MAX_CHECKS_PER_ACCOUNT"):
     config.microsoft_account.max_checks_per_account = int(os.getenv("MS_MAX_CHECKS_PER_ACCOUNT"))
 
+if os.getenv("MS_SESSION_CACHE_ENABLED"):
+    config.microsoft_account.session_cache_enabled = os.getenv("MS_SESSION_CACHE_ENABLED").lower() == "true"
+
+if os.getenv("MS_CLEANUP_MODE"):
+    config.microsoft_account.cleanup_mode = os.getenv("MS_CLEANUP_MODE")
+
+if os.getenv("MS_NETWORK_RESULTS_ENABLED"):
+    config.microsoft_account.redeem_responses.enabled = os.getenv("MS_NETWORK_RESULTS_ENABLED").lower() == "true"
+
 if os.getenv("VPN_ENABLED"):
     config.vpn.enabled = os.getenv("VPN_ENABLED").lower() == "true"
 
 if os.getenv("BROWSER_HEADLESS"):
     config.browser.headless = os.getenv("BROWSER_HEADLESS").lower() == "true"
 
+if os.getenv("BROWSER_POOL_SIZE"):
+    config.browser.pool_size = int(os.getenv("BROWSER_POOL_SIZE"))
+
+if os.getenv("BROWSER_BLOCK_RESOURCES"):
+    config.browser.blocking.enabled = os.getenv("BROWSER_BLOCK_RESOURCES").lower() == "true"
+
+if os.getenv("BROWSER_CONSENT_COOKIES"):
+    config.browser.consent.enabled = os.getenv("BROWSER_CONSENT_COOKIES").lower() == "true"
+
+if os.getenv("BROWSER_DEBUG_SCREENSHOTS"):
+    config.browser.debug_screenshots = os.getenv("BROWSER_DEBUG_SCREENSHOTS").lower() == "true"
+
 if os.getenv("API_SECRET_KEY"):
     config.api.secret_key = os.getenv("API_SECRET_KEY")
 
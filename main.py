@@ -1,5 +1,6 @@
 import os
 import logging
+from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,6 +8,8 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
 
 from api import router
+from api.keys import get_services, close_services
+from utils.playwright_runtime import playwright_runtime
 from config import config, LOGS_DIR
 
 os.makedirs(LOGS_DIR, exist_ok=True)
@@ -21,7 +24,16 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await playwright_runtime.start()
+    await get_services()
+    yield
+    await close_services()
+    await playwright_runtime.stop()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Microsoft Key Checker API",
     description="API для проверки ключей активации продуктов Microsoft с учетом региональных ограничений",
     version="1.0.0",
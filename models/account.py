@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Callable
 from pydantic import BaseModel, Field, EmailStr
 
 class AccountStatus(str, Enum):
@@ -70,9 +70,9 @@ class MicrosoftAccount(BaseModel):
         self.status = AccountStatus.BLOCKED
         self.error_message = message
     
-    def register_key_check(self):
+    def register_key_check(self, count: int = 1):
         
-        self.checks_count += 1
+        self.checks_count += count
         self.last_check_time = datetime.now()
         self.last_used_at = datetime.now()
 
@@ -88,27 +88,30 @@ class AccountPool(BaseModel):
         
         self.accounts = [acc for acc in self.accounts if acc.id != account_id]
     
-    def get_available_account(self, max_checks: int = 10) -> Optional[MicrosoftAccount]:
+    def get_available_account(
+        self,
+        max_checks: int = 10,
+        delay: Optional[Callable[[MicrosoftAccount], float]] = None
+    ) -> Optional[MicrosoftAccount]:
         
         if not self.accounts:
             return None
         
         
-        start_index = self.current_index
-        while True:
-            account = self.accounts[self.current_index]
-            
-            
-            self.current_index = (self.current_index + 1) % len(self.accounts)
-            
-            
-            if account.can_check_keys(max_checks):
-                return account
-            
-            
-            
-            if self.current_index == start_index:
-                return None
+        candidates = [
+            index
+            for index in (
+                (self.current_index + offset) % len(self.accounts) for offset in range(len(self.accounts))
+            )
+            if self.accounts[index].can_check_keys(max_checks)
+        ]
+        if not candidates:
+            return None
+        
+        
+        index = min(candidates, key=lambda index: delay(self.accounts[index])) if delay else candidates[0]
+        self.current_index = (index + 1) % len(self.accounts)
+        return self.accounts[index]
     
     def get_statistics(self) -> Dict:
         
@@ -1,8 +1,80 @@
+import re
 from datetime import datetime
 from enum import Enum
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, NamedTuple, Tuple
 from pydantic import BaseModel, Field
 
+PRODUCT_KEY_ALPHABET = "BCDFGHJKMPQRTVWXY2346789"
+
+KEY_GROUP_SIZE = 5
+
+KEY_GROUPS = 5
+
+KEY_LENGTH = KEY_GROUP_SIZE * KEY_GROUPS
+
+KEY_SEPARATOR_PATTERN = r"[\s-]"
+
+KEY_GROUPING_PATTERN = (
+    f"[A-Za-z0-9]{{{KEY_LENGTH}}}"
+    f"|[A-Za-z0-9]{{{KEY_GROUP_SIZE}}}(?:{KEY_SEPARATOR_PATTERN}[A-Za-z0-9]{{{KEY_GROUP_SIZE}}}){{{KEY_GROUPS - 1}}}"
+)
+
+class KeyFormatRule(NamedTuple):
+    code: str
+    subject: str
+    pattern: str
+    must_match: bool
+    message: str
+
+KEY_FORMAT_RULES = [
+    KeyFormatRule(
+        "characters", "cleaned", r"[A-Z0-9]*", True,
+        "Key contains characters other than letters, digits and separators"
+    ),
+    KeyFormatRule(
+        "length", "cleaned", f".{{{KEY_LENGTH}}}", True,
+        f"Key must contain {KEY_LENGTH} characters, got {{length}}"
+    ),
+    KeyFormatRule(
+        "alphabet", "cleaned", f"[^{PRODUCT_KEY_ALPHABET}N]", False,
+        "Key contains characters outside the product key alphabet"
+    ),
+    KeyFormatRule(
+        "letter_n", "cleaned", "N.*N", False,
+        "Key contains the letter N more than once"
+    ),
+    KeyFormatRule(
+        "grouping", "raw", KEY_GROUPING_PATTERN, True,
+        f"Key must be written as {KEY_GROUPS} groups of {KEY_GROUP_SIZE} characters"
+    )
+]
+
+KEY_FORMAT_MESSAGES = {rule.code: rule.message for rule in KEY_FORMAT_RULES}
+
+class KeyFormatError(NamedTuple):
+    code: str
+    length: int
+
+    @property
+    def message(self) -> str:
+        return KEY_FORMAT_MESSAGES[self.code].format(length=self.length)
+
+def normalize_key(value: str) -> str:
+    return re.sub(KEY_SEPARATOR_PATTERN, "", value.strip().upper())
+
+def key_format_error(value: str) -> Optional[KeyFormatError]:
+    subjects = {"raw": value.strip(), "cleaned": normalize_key(value)}
+
+    for rule in KEY_FORMAT_RULES:
+        subject = subjects[rule.subject]
+        if rule.must_match:
+            violated = re.fullmatch(rule.pattern, subject) is None
+        else:
+            violated = re.search(rule.pattern, subject) is not None
+        if violated:
+            return KeyFormatError(rule.code, len(subjects["cleaned"]))
+    return None
+
 class KeyStatus(str, Enum):
     VALID = "valid"
     USED = "used"
@@ -23,27 +95,16 @@ class Key(BaseModel):
         cleaned_key = ''.join(c for c in self.key if c.isalnum()).upper()
         
         
-        if len(cleaned_key) != 25:
+        if len(cleaned_key) != KEY_LENGTH:
             return self.key  
         
         
-        formatted = '-'.join([cleaned_key[i:i+5] for i in range(0, 25, 5)])
+        formatted = '-'.join([cleaned_key[i:i+KEY_GROUP_SIZE] for i in range(0, KEY_LENGTH, KEY_GROUP_SIZE)])
         return formatted
     
     def is_valid_format(self) -> bool:
         
-        
-        cleaned_key = ''.join(c for c in self.key if c.isalnum())
-        
-        
-        
-        if len(cleaned_key) != 25:
-            return False
-        
-        
-        
-        valid_chars = set("ABCDEFGHJKMNPQRTUVWXY2346789")
-        return all(c.upper() in valid_chars for c in cleaned_key)
+        return key_format_error(self.key) is None
 
 class KeyCheckResult(BaseModel):
     key: Key
@@ -54,6 +115,7 @@ class KeyCheckResult(BaseModel):
     region_used: Optional[str] = None
     is_global: bool = False
     check_id: Optional[str] = None
+    from_cache: bool = False
     
     def mark_valid(self):
         self.status = KeyStatus.VALID
@@ -73,11 +135,16 @@ class KeyCheckResult(BaseModel):
         self.error_message = message
 
 class KeyCheckBatch(BaseModel):
+    batch_id: Optional[str] = None
     keys: List[Key]
     results: List[KeyCheckResult] = []
     created_at: datetime = Field(default_factory=datetime.now)
     completed_at: Optional[datetime] = None
     progress: float = 0.0  
+    scheduling: Dict[str, Any] = {}
+    caching: Dict[str, Any] = {}
+    prefilter: Dict[str, Any] = {}
+    duplicates: Dict[str, List[Tuple[Key, Optional[str]]]] = {}
     
     def add_result(self, result: KeyCheckResult):
         self.results.append(result)
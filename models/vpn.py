@@ -13,11 +13,22 @@ class VPNStatus(str, Enum):
     CONNECTING = "connecting"
     ERROR = "error"
 
+class ProxyEndpoint(BaseModel):
+    server: str  
+    username: Optional[str] = None
+    password: Optional[str] = None
+    bypass: Optional[str] = None
+    
+    def to_playwright(self) -> Dict[str, str]:
+        
+        return {name: value for name, value in self.dict().items() if value is not None}
+
 class VPNRegion(BaseModel):
     id: str  
     name: str  
     code: str  
     is_active: bool = True  
+    proxy: Optional[ProxyEndpoint] = None  
     
     @property
     def country_name(self) -> str:
@@ -106,4 +117,13 @@ class VPNServicePool(BaseModel):
         for service in self.services:
             if service.name == name:
                 return service
-        return None 
\ No newline at end of file
+        return None
+    
+    def get_region_proxies(self) -> Dict[str, ProxyEndpoint]:
+        
+        proxies = {}
+        for service in self.services:
+            for region in service.regions:
+                if region.is_active and region.proxy:
+                    proxies.setdefault(region.code.upper(), region.proxy)
+        return proxies 
\ No newline at end of file
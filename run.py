@@ -93,6 +93,48 @@ def setup_project():
     os.makedirs(os.path.join(PROJECT_DIR, "data"), exist_ok=True)
     os.makedirs(os.path.join(PROJECT_DIR, "logs"), exist_ok=True)
 
+def bench_classifier(corpus_file=None, iterations=1000):
+    
+    from services.result_classifier import result_classifier, benchmark
+    
+    report = benchmark(result_classifier, corpus_file, iterations)
+    
+    logger.info(f"Corpus: {report['samples']} texts, {report['iterations']} iterations")
+    for name, method in report["methods"].items():
+        logger.info(f"{name}: accuracy {method['accuracy']:.1%}, {method['us_per_text']} us/text, "
+                    f"{len(method['mismatches'])} mismatches")
+        for mismatch in method["mismatches"]:
+            logger.info(f"  expected {mismatch['expected']}, got {mismatch['got']}: {mismatch['text']!r}")
+
+def run_proxy(host="127.0.0.1", port=8899, name=None):
+    
+    import asyncio
+    from utils.local_proxy import LocalProxy
+    
+    proxy = LocalProxy(host=host, port=port, name=name)
+    try:
+        asyncio.run(proxy.serve_forever())
+    except KeyboardInterrupt:
+        logger.info(f"Local proxy stopped: {proxy.get_statistics()}")
+
+def run_workers(processes=None, concurrency=None, coordinator=None, token=None):
+    
+    from services.check_worker import run_worker_pool, unproxied_regions
+    
+    if not processes:
+        missing = unproxied_regions()
+        processes = 1 if missing else os.cpu_count() or 1
+        if missing:
+            logger.info(f"Regions without proxies ({', '.join(missing)}) need VPN switching, starting a single worker process")
+    
+    logger.info(f"Starting {processes} check worker processes, queue: {coordinator or 'local'}")
+    try:
+        exit_codes = run_worker_pool(processes, concurrency, coordinator, token)
+    except ValueError as e:
+        logger.error(str(e))
+        return
+    logger.info(f"Check workers stopped, exit codes: {exit_codes}")
+
 def main():
     
     parser = argparse.ArgumentParser(description="Microsoft Key Checker CLI")
@@ -111,6 +153,24 @@ def main():
     setup_parser = subparsers.add_parser("setup", help="Setup project for first use")
     
     
+    proxy_parser = subparsers.add_parser("proxy", help="Start a local HTTP proxy to stand in for a regional egress")
+    proxy_parser.add_argument("--host", default="127.0.0.1", help="Host to bind the proxy to")
+    proxy_parser.add_argument("--port", type=int, default=8899, help="Port to bind the proxy to")
+    proxy_parser.add_argument("--name", default=None, help="Name shown in proxy logs, e.g. the region code")
+    
+    
+    worker_parser = subparsers.add_parser("worker", help="Start worker processes that check queued batch keys")
+    worker_parser.add_argument("--processes", type=int, default=None, help="Number of worker processes (default: CPU count, or 1 while some VPN regions have no proxy)")
+    worker_parser.add_argument("--concurrency", type=int, default=None, help="Concurrent checks per worker process")
+    worker_parser.add_argument("--coordinator", default=None, help="API server URL to lease keys from instead of the local queue")
+    worker_parser.add_argument("--token", default=None, help="Worker token expected by the coordinator")
+    
+    
+    bench_parser = subparsers.add_parser("bench-classifier", help="Benchmark result text classifier on a corpus")
+    bench_parser.add_argument("--corpus", default=None, help="Path to JSON corpus of page texts")
+    bench_parser.add_argument("--iterations", type=int, default=1000, help="Number of passes over the corpus")
+    
+    
     args = parser.parse_args()
     
     
@@ -130,6 +190,20 @@ def main():
     elif args.command == "setup":
         setup_project()
     
+    elif args.command == "proxy":
+        run_proxy(host=args.host, port=args.port, name=args.name)
+    
+    elif args.command == "worker":
+        run_workers(
+            processes=args.processes,
+            concurrency=args.concurrency,
+            coordinator=args.coordinator,
+            token=args.token
+        )
+    
+    elif args.command == "bench-classifier":
+        bench_classifier(corpus_file=args.corpus, iterations=args.iterations)
+    
     else:
         
         parser.print_help()
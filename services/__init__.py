@@ -1,11 +1,15 @@
+from services.browser_pool import BrowserPool
 from services.microsoft_auth import MicrosoftAuthenticator
+from services.redeem_session import RedeemSession
 from services.key_checker import KeyChecker
 from services.account_manager import AccountManager
 from services.vpn_manager import VPNManager
 from services.file_processor import FileProcessor
 
 __all__ = [
+    "BrowserPool",
     "MicrosoftAuthenticator",
+    "RedeemSession",
     "KeyChecker",
     "AccountManager",
     "VPNManager",
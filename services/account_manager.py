@@ -4,12 +4,14 @@ import logging
 import os
 import random
 from datetime import datetime
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple, Callable
 
 from models.account import MicrosoftAccount, AccountPool, AccountStatus
 from utils.crypto import encrypt_data, decrypt_data
 from config import config, DATA_DIR
 
+ACCOUNT_STATE_FIELDS = ("status", "checks_count", "last_check_time", "last_used_at", "cooldown_until", "error_message")
+
 class DateTimeEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, datetime):
@@ -17,11 +19,13 @@ class DateTimeEncoder(json.JSONEncoder):
         return super().default(obj)
 
 class AccountManager:
-    def __init__(self):
+    def __init__(self, shard: Optional[Tuple[int, int]] = None):
         self.logger = logging.getLogger(__name__)
         self.account_pool = AccountPool()
         self.accounts_file = os.path.join(DATA_DIR, "accounts.json")
+        self.state_file = os.path.join(DATA_DIR, f"accounts.shard{shard[0]}-of-{shard[1]}.json") if shard else None
         self.lock = asyncio.Lock()
+        self.shard = shard
     
     async def initialize(self):
         
@@ -74,11 +78,15 @@ class AccountManager:
                 return account
         return None
     
-    async def get_available_account(self) -> Optional[MicrosoftAccount]:
+    async def get_available_account(
+        self,
+        delay: Optional[Callable[[MicrosoftAccount], float]] = None
+    ) -> Optional[MicrosoftAccount]:
         
         async with self.lock:
             account = self.account_pool.get_available_account(
-                max_checks=config.microsoft_account.max_checks_per_account
+                max_checks=config.microsoft_account.max_checks_per_account,
+                delay=delay
             )
             
             if account:
@@ -90,11 +98,11 @@ class AccountManager:
             
             return account
     
-    async def release_account(self, account: MicrosoftAccount, use_cooldown: bool = True):
+    async def release_account(self, account: MicrosoftAccount, use_cooldown: bool = True, checks: int = 1):
         
         async with self.lock:
             
-            account.register_key_check()
+            account.register_key_check(checks)
             
             
             if account.checks_count >= config.microsoft_account.max_checks_per_account and use_cooldown:
@@ -143,22 +151,28 @@ class AccountManager:
                 self.logger.info("Accounts file not found, starting with empty pool")
                 return
             
-            with open(self.accounts_file, "r") as f:
-                encrypted_data = f.read()
-            
+            accounts_data = self._read_accounts(self.accounts_file)
             
-            decrypted_data = decrypt_data(
-                encrypted_data,
-                config.security.encryption_key
-            )
-            
-            accounts_data = json.loads(decrypted_data)
             
+            states = {}
+            if self.state_file and os.path.exists(self.state_file):
+                states = {state["id"]: state for state in self._read_accounts(self.state_file)}
             
             pool = AccountPool()
             
-            for account_data in accounts_data:
-                account = MicrosoftAccount(**account_data)
+            for index, account_data in enumerate(accounts_data):
+                if self.shard and index % self.shard[1] != self.shard[0]:
+                    continue
+                
+                state = states.get(account_data.get("id"), {})
+                account = MicrosoftAccount(**{
+                    **account_data,
+                    **{field: state[field] for field in ACCOUNT_STATE_FIELDS if field in state}
+                })
+                
+                
+                if state and account.status == AccountStatus.IN_USE:
+                    account.status = AccountStatus.AVAILABLE
                 
                 
                 if account.status == AccountStatus.COOLDOWN and account.cooldown_until:
@@ -179,8 +193,23 @@ class AccountManager:
             
             self.account_pool = AccountPool()
     
+    def _read_accounts(self, path: str) -> List[Dict]:
+        
+        with open(path, "r") as f:
+            encrypted_data = f.read()
+        
+        
+        decrypted_data = decrypt_data(
+            encrypted_data,
+            config.security.encryption_key
+        )
+        
+        return json.loads(decrypted_data)
+    
     async def save_accounts(self):
         
+        accounts_file = self.state_file or self.accounts_file
+        
         try:
             
             accounts_data = [account.dict() for account in self.account_pool.accounts]
@@ -195,11 +224,11 @@ class AccountManager:
             )
             
             
-            os.makedirs(os.path.dirname(self.accounts_file), exist_ok=True)
-            with open(self.accounts_file, "w") as f:
+            os.makedirs(os.path.dirname(accounts_file), exist_ok=True)
+            with open(accounts_file, "w") as f:
                 f.write(encrypted_data)
             
-            self.logger.debug(f"Saved {len(self.account_pool.accounts)} accounts to file")
+            self.logger.debug(f"Saved {len(self.account_pool.accounts)} accounts to {accounts_file}")
         
         except Exception as e:
             self.logger.error(f"Error saving accounts: {str(e)}")
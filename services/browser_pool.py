@@ -0,0 +1,312 @@
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, List, Any
+
+from playwright.async_api import Playwright, Browser, BrowserContext
+
+from services.consent_cookies import ConsentCookieStore
+from utils.playwright_runtime import playwright_runtime
+
+from config import config
+
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-accelerated-2d-canvas',
+    '--disable-gpu',
+    '--dns-server=8.8.8.8,8.8.4.4'
+]
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36"
+
+
+def build_context_options(**overrides) -> Dict[str, Any]:
+    context_options = {
+        "viewport": config.browser.viewport_size,
+        "ignore_https_errors": True,
+        "user_agent": config.browser.user_agent or DEFAULT_USER_AGENT
+    }
+    context_options.update({name: value for name, value in overrides.items() if value is not None})
+    return context_options
+
+
+class PooledBrowser:
+    def __init__(self, index: int, browser: Browser):
+        self.index = index
+        self.browser = browser
+        self.contexts: List[BrowserContext] = []
+        self.contexts_created = 0
+        self.launched_at = time.time()
+        self.retiring = False
+
+    @property
+    def active_contexts(self) -> int:
+        return len(self.contexts)
+
+    def is_healthy(self) -> bool:
+        return self.browser.is_connected()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "connected": self.browser.is_connected(),
+            "active_contexts": self.active_contexts,
+            "contexts_created": self.contexts_created,
+            "uptime": round(time.time() - self.launched_at, 1),
+            "retiring": self.retiring
+        }
+
+
+class BrowserPool:
+    def __init__(self, size: Optional[int] = None, max_contexts_per_browser: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.size = size or config.browser.pool_size
+        self.max_contexts_per_browser = max_contexts_per_browser or config.browser.max_contexts_per_browser
+        self.playwright: Optional[Playwright] = None
+        self.browsers: List[PooledBrowser] = []
+        self.context_owners: Dict[BrowserContext, PooledBrowser] = {}
+        self.lock = asyncio.Lock()
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.health_task: Optional[asyncio.Task] = None
+        self.next_index = 0
+        self.consent_cookies = ConsentCookieStore()
+        self.stats = {
+            "browsers_launched": 0,
+            "browsers_recycled": 0,
+            "browsers_replaced": 0,
+            "contexts_created": 0,
+            "contexts_released": 0,
+            "contexts_discarded": 0,
+            "health_checks": 0,
+            "acquire_wait_time": 0.0,
+            "requests_blocked": 0,
+            "bytes_saved": 0
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self.playwright is not None
+
+    async def initialize(self):
+        if self.is_running:
+            return
+
+        self.playwright = await playwright_runtime.start()
+        self.slots = asyncio.Semaphore(self.size * self.max_contexts_per_browser)
+
+        for _ in range(self.size):
+            self.browsers.append(await self._launch_browser())
+
+        if config.browser.health_check_interval > 0:
+            self.health_task = asyncio.create_task(self._health_loop())
+
+        self.logger.info(f"Initialized BrowserPool with {len(self.browsers)} browsers, "
+                         f"{self.max_contexts_per_browser} contexts per browser")
+
+    async def close(self):
+        if self.health_task:
+            self.health_task.cancel()
+            self.health_task = None
+
+        for pooled in self.browsers:
+            await self._close_browser(pooled)
+        self.browsers = []
+        self.context_owners = {}
+
+        self.playwright = None
+
+        self.logger.info("Closed BrowserPool resources")
+
+    async def acquire_context(self, **context_overrides) -> BrowserContext:
+        if not self.is_running:
+            await self.initialize()
+
+        wait_started = time.time()
+        await self.slots.acquire()
+        self.stats["acquire_wait_time"] += time.time() - wait_started
+
+        try:
+            async with self.lock:
+                pooled = await self._select_browser()
+                context = await pooled.browser.new_context(**build_context_options(**context_overrides))
+                context.set_default_timeout(config.browser.timeout)
+                await self.consent_cookies.apply(context)
+
+                pooled.contexts.append(context)
+                pooled.contexts_created += 1
+                self.context_owners[context] = pooled
+                self.stats["contexts_created"] += 1
+
+                if pooled.contexts_created >= config.browser.recycle_after_contexts:
+                    pooled.retiring = True
+
+            return context
+        except Exception:
+            self.slots.release()
+            raise
+
+    async def release_context(self, context: BrowserContext):
+        async with self.lock:
+            pooled = self.context_owners.pop(context, None)
+            if pooled and context in pooled.contexts:
+                pooled.contexts.remove(context)
+
+        if pooled is None:
+            return
+
+        try:
+            await self._close_context(pooled, context)
+        finally:
+            self.stats["contexts_released"] += 1
+            self.slots.release()
+
+        if pooled.retiring and pooled.active_contexts == 0:
+            await self._recycle_browser(pooled)
+
+    async def discard_context(self, context: BrowserContext) -> bool:
+        async with self.lock:
+            pooled = self.context_owners.pop(context, None)
+            tracked = pooled is not None and context in pooled.contexts
+            if tracked:
+                pooled.contexts.remove(context)
+            else:
+                pooled = next((pooled for pooled in self.browsers if pooled.browser is context.browser), None)
+
+        if pooled is None:
+            return False
+
+        self.logger.warning(f"Discarding a stuck context on browser {pooled.index}")
+        self.stats["contexts_discarded"] += 1
+        try:
+            await self._close_context(pooled, context)
+        finally:
+            if tracked:
+                self.slots.release()
+
+        if pooled.retiring and pooled.active_contexts == 0:
+            await self._recycle_browser(pooled)
+        return True
+
+    def record_request_stats(self, request_stats: Dict[str, Any]):
+        self.stats["requests_blocked"] += request_stats.get("requests_blocked", 0)
+        self.stats["bytes_saved"] += request_stats.get("bytes_saved", 0)
+
+    async def check_health(self) -> Dict[str, Any]:
+        self.stats["health_checks"] += 1
+
+        async with self.lock:
+            unhealthy = [pooled for pooled in self.browsers if not pooled.is_healthy()]
+
+        for pooled in unhealthy:
+            self.logger.warning(f"Browser {pooled.index} is disconnected, replacing it")
+            await self._replace_browser(pooled)
+            self.stats["browsers_replaced"] += 1
+
+        return {
+            "healthy": len(self.browsers) - len(unhealthy),
+            "replaced": len(unhealthy)
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        launched = self.stats["browsers_launched"]
+
+        return {
+            "running": self.is_running,
+            "size": self.size,
+            "max_contexts_per_browser": self.max_contexts_per_browser,
+            "capacity": self.size * self.max_contexts_per_browser,
+            "active_contexts": sum(pooled.active_contexts for pooled in self.browsers),
+            "contexts_per_launch": round(self.stats["contexts_created"] / launched, 2) if launched else 0.0,
+            **self.stats,
+            "acquire_wait_time": round(self.stats["acquire_wait_time"], 3),
+            "browsers": [pooled.to_dict() for pooled in self.browsers]
+        }
+
+    async def _select_browser(self) -> PooledBrowser:
+        candidates = [
+            pooled for pooled in self.browsers
+            if pooled.is_healthy() and not pooled.retiring and pooled.active_contexts < self.max_contexts_per_browser
+        ]
+
+        if not candidates:
+            pooled = await self._launch_browser()
+            self.browsers.append(pooled)
+            return pooled
+
+        return min(candidates, key=lambda pooled: pooled.active_contexts)
+
+    async def _launch_browser(self) -> PooledBrowser:
+        browser_type = getattr(self.playwright, config.browser.browser_type)
+        browser = await browser_type.launch(
+            headless=config.browser.headless,
+            args=BROWSER_ARGS,
+            timeout=60000
+        )
+
+        pooled = PooledBrowser(self.next_index, browser)
+        self.next_index += 1
+        self.stats["browsers_launched"] += 1
+        self.logger.info(f"Launched pooled browser {pooled.index}")
+        return pooled
+
+    async def _close_context(self, pooled: PooledBrowser, context: BrowserContext):
+        try:
+            await asyncio.wait_for(context.close(), timeout=config.browser.supervisor.close_timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"Context on browser {pooled.index} did not close, "
+                              f"retiring the browser once its other contexts finish")
+            pooled.retiring = True
+        except Exception as e:
+            self.logger.debug(f"Error closing pooled context: {str(e)}")
+
+    async def _close_browser(self, pooled: PooledBrowser):
+        try:
+            await asyncio.wait_for(pooled.browser.close(), timeout=config.browser.supervisor.close_timeout)
+        except Exception as e:
+            self.logger.debug(f"Error closing pooled browser {pooled.index}: {str(e)}")
+
+    async def _recycle_browser(self, pooled: PooledBrowser):
+        self.logger.info(f"Recycling browser {pooled.index} after {pooled.contexts_created} contexts")
+        await self._replace_browser(pooled)
+        self.stats["browsers_recycled"] += 1
+
+    async def _replace_browser(self, pooled: PooledBrowser):
+        async with self.lock:
+            if pooled not in self.browsers:
+                return
+
+            self.browsers.remove(pooled)
+            for context in pooled.contexts:
+                self.context_owners.pop(context, None)
+                self.slots.release()
+            pooled.contexts = []
+
+        await self._close_browser(pooled)
+
+        if len(self.browsers) >= self.size:
+            return
+
+        try:
+            replacement = await self._launch_browser()
+        except Exception as e:
+            self.logger.error(f"Failed to launch replacement browser: {str(e)}")
+            return
+
+        async with self.lock:
+            if len(self.browsers) < self.size:
+                self.browsers.append(replacement)
+                return
+
+        await self._close_browser(replacement)
+
+    async def _health_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(config.browser.health_check_interval)
+                await self.check_health()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Error during browser pool health check: {str(e)}")
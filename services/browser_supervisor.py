@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any, Awaitable, Callable, List, Tuple
+
+from playwright.async_api import Page
+
+from services.browser_pool import BrowserPool
+from services.redeem_session import RedeemSession
+from config import config, SupervisorConfig
+
+
+class SupervisorError(Exception):
+    pass
+
+
+class SupervisedWork:
+    def __init__(self, name: str, task: asyncio.Task, stage: str):
+        self.name = name
+        self.task = task
+        self.stage = stage
+        self.started_at = time.monotonic()
+        self.last_beat = self.started_at
+        self.failure: Optional[str] = None
+        self.listeners: List[Tuple[Any, str, Callable]] = []
+
+    def beat(self, stage: str):
+        self.stage = stage
+        self.last_beat = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "name": self.name,
+            "stage": self.stage,
+            "running_for": round(now - self.started_at, 1),
+            "since_heartbeat": round(now - self.last_beat, 1)
+        }
+
+
+class BrowserSupervisor:
+    def __init__(self, browser_pool: BrowserPool, profile: Optional[SupervisorConfig] = None):
+        self.logger = logging.getLogger(__name__)
+        self.browser_pool = browser_pool
+        self.profile = profile or config.browser.supervisor
+        self.watched: Dict[asyncio.Task, SupervisedWork] = {}
+        self.monitor_task: Optional[asyncio.Task] = None
+        self.stats = {
+            "supervised": 0,
+            "hangs": 0,
+            "page_crashes": 0,
+            "browser_disconnects": 0,
+            "close_timeouts": 0,
+            "requeued_keys": 0
+        }
+
+    async def start(self):
+        if self.profile.enabled and not self.monitor_task:
+            self.monitor_task = asyncio.create_task(self._monitor_loop())
+
+    async def stop(self):
+        if self.monitor_task:
+            self.monitor_task.cancel()
+            await asyncio.gather(self.monitor_task, return_exceptions=True)
+            self.monitor_task = None
+
+    async def run(self, session: RedeemSession, work: Awaitable, stage: str) -> Any:
+        if not self.profile.enabled:
+            return await work
+
+        task = asyncio.ensure_future(work)
+        supervised = SupervisedWork(session.account.email, task, stage)
+        self.watched[task] = supervised
+        self.stats["supervised"] += 1
+        self._attach(session, supervised)
+
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if supervised.failure:
+                raise SupervisorError(supervised.failure)
+            raise
+        finally:
+            self._detach(session, supervised)
+            self.watched.pop(task, None)
+
+    async def dispose(self, session: RedeemSession):
+        context = session.auth.context
+        try:
+            await asyncio.wait_for(session.close(), timeout=self.profile.close_timeout)
+        except asyncio.TimeoutError:
+            self.stats["close_timeouts"] += 1
+            self.logger.error(f"Closing redeem session for {session.account.email} timed out, discarding its context")
+            if not context or not await self.browser_pool.discard_context(context):
+                await self.browser_pool.check_health()
+
+    def record_requeue(self):
+        self.stats["requeued_keys"] += 1
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.profile.enabled,
+            **self.stats,
+            "active": [supervised.to_dict() for supervised in self.watched.values()]
+        }
+
+    def _attach(self, session: RedeemSession, supervised: SupervisedWork):
+        session.auth.heartbeat = supervised.beat
+
+        context = session.auth.context
+        if not context:
+            return
+
+        def on_page(page: Page):
+            self._listen(supervised, page, "crash", lambda _: self._fail(supervised, "page crashed", "page_crashes"))
+
+        for page in context.pages:
+            on_page(page)
+        self._listen(supervised, context, "page", on_page)
+
+        if context.browser:
+            self._listen(supervised, context.browser, "disconnected", lambda _: self._on_disconnected(supervised))
+
+    def _detach(self, session: RedeemSession, supervised: SupervisedWork):
+        session.auth.heartbeat = None
+
+        for emitter, event, handler in supervised.listeners:
+            try:
+                emitter.remove_listener(event, handler)
+            except Exception as e:
+                self.logger.debug(f"Error removing {event} listener: {str(e)}")
+        supervised.listeners = []
+
+    def _listen(self, supervised: SupervisedWork, emitter: Any, event: str, handler: Callable):
+        emitter.on(event, handler)
+        supervised.listeners.append((emitter, event, handler))
+
+    def _on_disconnected(self, supervised: SupervisedWork):
+        self._fail(supervised, "browser disconnected", "browser_disconnects")
+        asyncio.create_task(self.browser_pool.check_health())
+
+    def _fail(self, supervised: SupervisedWork, reason: str, counter: str):
+        if supervised.failure or supervised.task.done():
+            return
+
+        supervised.failure = f"{reason} during {supervised.stage}"
+        self.stats[counter] += 1
+        self.logger.error(f"Supervisor stopping work for {supervised.name}: {supervised.failure}")
+        supervised.task.cancel()
+
+    async def _monitor_loop(self):
+        while True:
+            try:
+                await asyncio.sleep(self.profile.check_interval)
+
+                now = time.monotonic()
+                for supervised in list(self.watched.values()):
+                    timeout = self.profile.stage_timeouts.get(supervised.stage, self.profile.default_stage_timeout)
+                    if now - supervised.last_beat > timeout:
+                        self._fail(supervised, f"no heartbeat for {timeout}s", "hangs")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Error in browser supervisor: {str(e)}")
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple, Deque, Set
+
+from models.key import Key, KeyCheckResult, KeyCheckBatch
+from services.account_manager import AccountManager
+from services.vpn_manager import VPNManager
+from services.key_checker import KeyChecker
+from services.region_scheduler import RegionScheduler
+from services.job_store import JobStore
+from services.result_cache import ResultCache
+from services.remote_queue import LocalJobQueue, RemoteJobQueue
+from utils.playwright_runtime import playwright_runtime
+from config import config
+
+
+class QueueModeError(Exception):
+    pass
+
+
+class CheckWorker:
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        job_store: Optional[JobStore] = None,
+        coordinator: Optional[str] = None,
+        token: Optional[str] = None,
+        allow_vpn: bool = True
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency or config.key.parallel_checks
+        self.prefetch = self.concurrency * 2
+        self.shard = shard
+        self.coordinator = coordinator
+        self.allow_vpn = allow_vpn
+        self.queue = RemoteJobQueue(coordinator, token) if coordinator else LocalJobQueue(job_store)
+        self.key_checker: Optional[KeyChecker] = None
+        self.batch = KeyCheckBatch(batch_id=f"worker_{self.worker_id}", keys=[])
+        self.scheduler: Optional[RegionScheduler] = None
+        self.jobs: Dict[int, Dict[str, Any]] = {}
+        self.pending: Dict[str, Deque[int]] = {}
+        self.capacity_freed = asyncio.Event()
+        self.reports: Set[asyncio.Task] = set()
+        self.stopping = False
+        self.stats = {"claimed": 0, "completed": 0, "dropped": 0, "started_at": time.time()}
+
+    async def run(self):
+        accepts_workers = await self.queue.accepts_workers()
+        if accepts_workers is False:
+            await self.queue.close()
+            raise QueueModeError(
+                "The API checks queued keys itself; restart it with KEY_EXTERNAL_WORKERS=true before starting workers"
+            )
+        if accepts_workers is None:
+            self.logger.warning(f"Could not confirm that {self.coordinator} runs in external worker mode, "
+                                f"keys will be claimed once it does")
+
+        await playwright_runtime.start()
+        account_manager = AccountManager(shard=self.shard or (0, 1))
+        await account_manager.initialize()
+        vpn_manager = VPNManager()
+        await vpn_manager.initialize()
+        self.key_checker = KeyChecker(account_manager, vpn_manager)
+        await self.key_checker.initialize(coordinator=False)
+        self.scheduler = self.key_checker.create_scheduler(self.batch, [], streaming=True, allow_vpn=self.allow_vpn)
+        self.logger.info(f"Worker {self.worker_id} started with concurrency {self.concurrency}, "
+                         f"queue: {self.coordinator or 'local'}, VPN switching: {self.allow_vpn}")
+
+        pipeline = asyncio.create_task(
+            self.key_checker.run_stream(self.scheduler, self.batch, self.concurrency, self._on_result)
+        )
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while not self.stopping and not pipeline.done():
+                free = self.prefetch - len(self.jobs)
+                if free <= 0:
+                    self.capacity_freed.clear()
+                    try:
+                        await asyncio.wait_for(self.capacity_freed.wait(), timeout=config.key.job_queue.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                jobs = await self.queue.claim(self.worker_id, free)
+                if not jobs:
+                    await asyncio.sleep(config.key.job_queue.poll_interval)
+                    continue
+
+                await self.scheduler.add(self.key_checker.admit_keys(self.batch, self._accept(jobs)))
+        finally:
+            heartbeat.cancel()
+            pipeline.cancel()
+            await asyncio.gather(heartbeat, pipeline, return_exceptions=True)
+            await self.close()
+
+    def stop(self):
+        self.stopping = True
+
+    async def close(self):
+        if self.reports:
+            await asyncio.gather(*self.reports, return_exceptions=True)
+        self._tally(await self.queue.flush(self.worker_id))
+
+        released = await self.queue.release(self.worker_id)
+        if released:
+            self.logger.info(f"Worker {self.worker_id} returned {released} unfinished keys to the queue")
+
+        if self.key_checker:
+            await self.key_checker.close()
+        await self.queue.close()
+        await playwright_runtime.stop()
+        self.logger.info(f"Worker {self.worker_id} stopped: {self.get_statistics()}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        elapsed = time.time() - self.stats["started_at"]
+
+        return {
+            "worker": self.worker_id,
+            "running": len(self.jobs),
+            "keys_per_minute": round(self.stats["completed"] / elapsed * 60, 2) if elapsed else 0.0,
+            "scheduling": self.scheduler.get_statistics() if self.scheduler else {},
+            "caching": self.batch.caching,
+            "prefilter": self.batch.prefilter,
+            **self.stats
+        }
+
+    def _accept(self, jobs: List[Dict[str, Any]]) -> List[Tuple[Key, Optional[str]]]:
+        self.stats["claimed"] += len(jobs)
+        for job in jobs:
+            self.jobs[job["id"]] = job
+            self.pending.setdefault(ResultCache.key_for(job["key"], job["region"]), deque()).append(job["id"])
+        return [(job["key"], job["region"]) for job in jobs]
+
+    def _on_result(self, result: KeyCheckResult, region: Optional[str]):
+        pending_key = ResultCache.key_for(result.key, region)
+        job_ids = self.pending.get(pending_key)
+        if not job_ids:
+            self.logger.warning(f"Worker {self.worker_id} got a result for unclaimed key {result.key.formatted_key}")
+            return
+
+        job = self.jobs.pop(job_ids.popleft())
+        if not job_ids:
+            del self.pending[pending_key]
+        self.capacity_freed.set()
+
+        report = asyncio.create_task(self._report(job["id"], result))
+        self.reports.add(report)
+        report.add_done_callback(self.reports.discard)
+
+    async def _report(self, job_id: int, result: KeyCheckResult):
+        try:
+            self._tally(await self.queue.complete(job_id, self.worker_id, result))
+        except Exception as e:
+            self.logger.error(f"Worker {self.worker_id} failed to report job {job_id}: {str(e)}")
+
+    def _tally(self, reported: Dict[str, List[int]]):
+        self.stats["completed"] += len(reported["accepted"])
+        self.stats["dropped"] += len(reported["dropped"])
+
+    async def _heartbeat(self):
+        interval = config.key.job_queue.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self._tally(await self.queue.flush(self.worker_id))
+                await self.queue.extend_leases(self.worker_id)
+            except Exception as e:
+                self.logger.error(f"Worker {self.worker_id} failed to extend leases: {str(e)}")
+
+
+def unproxied_regions() -> List[str]:
+    if not config.vpn.enabled:
+        return []
+
+    vpn_manager = VPNManager()
+    asyncio.run(vpn_manager.initialize())
+    regions = {
+        region.code.upper()
+        for service in vpn_manager.vpn_pool.services
+        for region in service.regions
+        if region.is_active
+    }
+    return sorted(regions - set(vpn_manager.get_region_proxies()))
+
+
+def run_worker_process(
+    index: int,
+    count: int,
+    concurrency: Optional[int] = None,
+    coordinator: Optional[str] = None,
+    token: Optional[str] = None
+):
+    worker = CheckWorker(
+        worker_id=f"{socket.gethostname()}:{os.getpid()}:{index}",
+        concurrency=concurrency,
+        shard=(index, count) if count > 1 else None,
+        coordinator=coordinator,
+        token=token,
+        allow_vpn=count == 1
+    )
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+    except QueueModeError as e:
+        logging.getLogger(__name__).error(f"Worker {worker.worker_id} not started: {str(e)}")
+        raise SystemExit(1)
+
+
+def run_worker_pool(
+    processes: int,
+    concurrency: Optional[int] = None,
+    coordinator: Optional[str] = None,
+    token: Optional[str] = None
+) -> List[int]:
+    import multiprocessing
+
+    if processes > 1:
+        missing = unproxied_regions()
+        if missing:
+            raise ValueError(
+                f"VPN connections are machine-wide, so {processes} worker processes would switch them under "
+                f"each other. Configure proxies for regions {', '.join(missing)} or run a single process."
+            )
+
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(
+            target=run_worker_process,
+            args=(index, processes, concurrency, coordinator, token),
+            name=f"check-worker-{index}"
+        )
+        for index in range(processes)
+    ]
+    for process in workers:
+        process.start()
+
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        for process in workers:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+
+    return [process.exitcode for process in workers]
@@ -0,0 +1,125 @@
+import logging
+import re
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+
+import psutil
+
+from config import config, ConcurrencyConfig
+
+THROTTLE_KEYWORDS = ["throttled", "too many requests", "слишком много запросов"]
+
+THROTTLE_STATUS_PATTERN = re.compile(r"\b(?:http|status(?: code)?)[\s:/.\d]*?\b429\b", re.IGNORECASE)
+
+TIMEOUT_KEYWORDS = ["timeout", "timed out", "no heartbeat", "превышено время"]
+
+
+def classify_outcome(status: str, message: Optional[str]) -> str:
+    if status != "error":
+        return "ok"
+
+    message_lower = (message or "").lower()
+    if any(keyword in message_lower for keyword in THROTTLE_KEYWORDS) or THROTTLE_STATUS_PATTERN.search(message_lower):
+        return "throttled"
+    if any(keyword in message_lower for keyword in TIMEOUT_KEYWORDS):
+        return "timeout"
+    return "error"
+
+
+class ConcurrencyController:
+    def __init__(self, initial: Optional[int] = None, max_limit: Optional[int] = None, profile: Optional[ConcurrencyConfig] = None):
+        self.logger = logging.getLogger(__name__)
+        self.profile = profile or config.key.concurrency
+        self.min_limit = max(self.profile.min_parallel, 1)
+        self.max_limit = max(min(self.profile.max_parallel, max_limit or self.profile.max_parallel), self.min_limit)
+        self.limit = min(max(initial or config.key.parallel_checks, self.min_limit), self.max_limit)
+        self.workers = 0
+        self.retiring = 0
+        self.samples: List[Tuple[float, str]] = []
+        self.last_decrease = 0.0
+        self.changes = deque(maxlen=50)
+        self.outcomes = {"ok": 0, "error": 0, "timeout": 0, "throttled": 0}
+
+    @property
+    def adaptive(self) -> bool:
+        return self.profile.adaptive
+
+    @property
+    def active_workers(self) -> int:
+        return self.workers - self.retiring
+
+    def worker_started(self):
+        self.workers += 1
+
+    def worker_finished(self, retired: bool = False):
+        self.workers -= 1
+        if retired:
+            self.retiring -= 1
+
+    def try_retire(self) -> bool:
+        if self.active_workers > self.limit:
+            self.retiring += 1
+            return True
+        return False
+
+    def record(self, latency: float, outcome: str):
+        self.outcomes[outcome] += 1
+        if not self.adaptive:
+            return
+
+        if outcome in ["timeout", "throttled"]:
+            self.samples = []
+            self._decrease(f"{outcome} after {latency:.1f}s")
+            return
+
+        self.samples.append((latency, outcome))
+        if len(self.samples) >= self.profile.window:
+            self._evaluate()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "adaptive": self.adaptive,
+            "limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "workers": self.active_workers,
+            "outcomes": dict(self.outcomes),
+            "changes": list(self.changes)
+        }
+
+    def _evaluate(self):
+        samples, self.samples = self.samples, []
+        avg_latency = sum(latency for latency, _ in samples) / len(samples)
+        error_rate = sum(1 for _, outcome in samples if outcome != "ok") / len(samples)
+        memory_percent = psutil.virtual_memory().percent
+
+        if memory_percent >= self.profile.memory_threshold:
+            self._decrease(f"host memory at {memory_percent:.0f}%")
+        elif error_rate > self.profile.max_error_rate:
+            self._decrease(f"error rate {error_rate:.0%} over last {len(samples)} checks")
+        elif avg_latency > self.profile.target_latency:
+            self._decrease(f"average latency {avg_latency:.1f}s above {self.profile.target_latency:.0f}s")
+        else:
+            self._change(
+                self.limit + 1,
+                f"healthy: latency {avg_latency:.1f}s, error rate {error_rate:.0%}, memory {memory_percent:.0f}%"
+            )
+
+    def _decrease(self, reason: str):
+        now = time.monotonic()
+        if now - self.last_decrease < self.profile.decrease_cooldown:
+            self.logger.debug(f"Skipping concurrency decrease during cooldown: {reason}")
+            return
+
+        self.last_decrease = now
+        self._change(int(self.limit * self.profile.decrease_factor), reason)
+
+    def _change(self, limit: int, reason: str):
+        limit = min(max(limit, self.min_limit), self.max_limit)
+        if limit == self.limit:
+            return
+
+        self.changes.append({"at": time.time(), "from": self.limit, "to": limit, "reason": reason})
+        self.logger.info(f"Concurrency limit {self.limit} -> {limit}: {reason}")
+        self.limit = limit
@@ -0,0 +1,88 @@
+import json
+import logging
+import os
+import time
+from typing import Optional, Dict, Any, List
+
+from playwright.async_api import BrowserContext
+
+from config import config, DATA_DIR, ConsentCookieConfig
+
+
+class ConsentCookieStore:
+    def __init__(self, profile: Optional[ConsentCookieConfig] = None, state_file: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.profile = profile or config.browser.consent
+        self.state_file = state_file or os.path.join(DATA_DIR, "consent_cookies.json")
+        self.cookies: List[Dict[str, Any]] = [dict(cookie) for cookie in self.profile.cookies]
+        self.stats = {
+            "contexts_seeded": 0,
+            "dialog_fallbacks": 0,
+            "captures": 0
+        }
+        self.load()
+
+    @property
+    def enabled(self) -> bool:
+        return self.profile.enabled and bool(self.cookies)
+
+    def load(self):
+        if not os.path.exists(self.state_file):
+            return
+
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                captured = json.load(f)
+            if captured:
+                self.cookies = captured
+                self.logger.info(f"Loaded {len(captured)} captured consent cookies")
+        except Exception as e:
+            self.logger.error(f"Error loading consent cookies: {str(e)}")
+
+    async def apply(self, context: BrowserContext):
+        if not self.enabled:
+            return
+
+        expires = time.time() + self.profile.max_age
+        try:
+            await context.add_cookies([{**cookie, "expires": expires} for cookie in self.cookies])
+            self.stats["contexts_seeded"] += 1
+        except Exception as e:
+            self.logger.error(f"Error seeding consent cookies: {str(e)}")
+
+    def record_fallback(self):
+        self.stats["dialog_fallbacks"] += 1
+        self.logger.warning(f"Consent dialog was shown despite seeded cookies "
+                            f"({self.stats['dialog_fallbacks']} fallbacks so far)")
+
+    async def capture(self, context: BrowserContext):
+        try:
+            cookies = await context.cookies()
+        except Exception as e:
+            self.logger.error(f"Error reading consent cookies: {str(e)}")
+            return
+
+        captured = [
+            {name: cookie[name] for name in ["name", "value", "domain", "path"]}
+            for cookie in cookies
+            if cookie["name"] in self.profile.capture_names
+        ]
+        if not captured:
+            return
+
+        self.cookies = captured
+        self.stats["captures"] += 1
+
+        try:
+            with open(self.state_file, "w", encoding="utf-8") as f:
+                json.dump(captured, f, indent=2)
+            self.logger.info(f"Captured {len(captured)} consent cookies")
+        except Exception as e:
+            self.logger.error(f"Error saving consent cookies: {str(e)}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "cookies": [cookie["name"] for cookie in self.cookies],
+            **self.stats
+        }
@@ -0,0 +1,177 @@
+import logging
+import re
+from typing import Optional, Dict, Any, List, Tuple, Union
+
+from playwright.async_api import Page, Frame
+
+from services.result_classifier import result_classifier
+
+HAS_TEXT_PATTERN = re.compile(r'^(?P<css>.*?):has-text\("(?P<text>[^"]*)"\)$')
+
+ERROR_SELECTORS = [
+    '.errorContainer--Xj5VIIIy',
+    '.errorMessageText--NWPmAAeE',
+    '[role="alert"]',
+    '[class*="error"]',
+    'div:has-text("код отключен")',
+    'div:has-text("уже использован")',
+    'div:has-text("недействителен")'
+]
+
+SUCCESS_SELECTORS = [
+    'div:has-text("Активировано")',
+    'div:has-text("Activated")',
+    'div.successContainer--nGBnuzHv',
+    'h1:has-text("Теперь у вас есть")',
+    'h1:has-text("You now have")',
+    '[class*="success"]'
+]
+
+TARGET_ERROR_SELECTORS = [
+    '.errorContainer--Xj5VIIIy',
+    '.errorMessageText--NWPmAAeE',
+    '[role="alert"]',
+    'div.infoContainer--LaCo6Qwb',
+    'p:has-text("код отключен")',
+    'p:has-text("уже использован")',
+    'p:has-text("недействителен")',
+    '[class*="error"]'
+]
+
+TARGET_SUCCESS_SELECTORS = SUCCESS_SELECTORS + ['h1', 'h2']
+
+MANAGE_SELECTORS = [
+    'button:has-text("Управление")',
+    'button:has-text("Manage")',
+    'a:has-text("Управление")',
+    'a:has-text("Manage")',
+    'a[href*="subscription"]',
+    'a[href*="product"]'
+]
+
+COOKIE_BUTTON_SELECTORS = [
+    'button:has-text("Принять")',
+    'button:has-text("Accept")',
+    'button:has-text("Agree")',
+    'button:has-text("Разрешить")'
+]
+
+PROBE_SCRIPT = """
+(spec) => {
+    const firstMatch = (rule) => {
+        let nodes;
+        try {
+            nodes = document.querySelectorAll(rule.css);
+        } catch (e) {
+            return null;
+        }
+        for (const node of nodes) {
+            const text = (node.textContent || '').trim();
+            if (rule.text && !text.toLowerCase().includes(rule.text.toLowerCase())) {
+                continue;
+            }
+            return {selector: rule.selector, text: text.slice(0, spec.maxText)};
+        }
+        return null;
+    };
+
+    const result = {};
+    for (const [name, rules] of Object.entries(spec.groups)) {
+        result[name] = rules.map(firstMatch).filter((match) => match !== null);
+    }
+
+    result.body_text = document.body ? document.body.innerText.slice(0, spec.maxBody) : '';
+    return result;
+}
+"""
+
+
+def compile_rules(selectors: List[str]) -> List[Dict[str, Optional[str]]]:
+    rules = []
+    for selector in selectors:
+        match = HAS_TEXT_PATTERN.match(selector)
+        if match:
+            rules.append({"selector": selector, "css": match.group("css") or "*", "text": match.group("text")})
+        else:
+            rules.append({"selector": selector, "css": selector, "text": None})
+    return rules
+
+
+def classify_error_text(error_text: str) -> Dict[str, str]:
+    match = result_classifier.classify(error_text)
+    if match and match["status"] != "success":
+        return result_classifier.to_result(match, error_text)
+    return {"status": "error", "message": error_text}
+
+
+class DomProbe:
+    def __init__(self, max_text: int = 500, max_body: int = 20000):
+        self.logger = logging.getLogger(__name__)
+        self.calls = 0
+        self.spec = {
+            "maxText": max_text,
+            "maxBody": max_body,
+            "groups": {
+                "errors": compile_rules(ERROR_SELECTORS),
+                "successes": compile_rules(SUCCESS_SELECTORS),
+                "target_errors": compile_rules(TARGET_ERROR_SELECTORS),
+                "target_successes": compile_rules(TARGET_SUCCESS_SELECTORS),
+                "manage": compile_rules(MANAGE_SELECTORS),
+                "cookie_buttons": compile_rules(COOKIE_BUTTON_SELECTORS)
+            }
+        }
+
+    def reset(self):
+        self.calls = 0
+
+    def count(self, calls: int = 1):
+        self.calls += calls
+
+    async def probe(self, frame: Union[Page, Frame]) -> Optional[Dict[str, Any]]:
+        self.calls += 1
+        try:
+            return await frame.evaluate(PROBE_SCRIPT, self.spec)
+        except Exception as e:
+            self.logger.debug(f"DOM probe failed for {frame.url}: {str(e)}")
+            return None
+
+    async def probe_frames(self, frames: List[Frame]) -> List[Tuple[Frame, Dict[str, Any]]]:
+        probes = []
+        for frame in frames:
+            result = await self.probe(frame)
+            if result is not None:
+                probes.append((frame, result))
+        return probes
+
+    @staticmethod
+    def find_error(probe: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        for match in probe["errors"]:
+            error_text = match["text"]
+            error_text_lower = error_text.lower()
+            if error_text and "cookie" not in error_text_lower and "файл" not in error_text_lower:
+                return classify_error_text(error_text)
+        return None
+
+    @staticmethod
+    def find_success(probe: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        for match in probe["successes"]:
+            if match["text"]:
+                return {"status": "success", "message": match["text"]}
+        return None
+
+    @staticmethod
+    def classify_target(probe: Dict[str, Any]) -> Dict[str, str]:
+        if probe["target_errors"]:
+            return classify_error_text(probe["target_errors"][0]["text"])
+
+        if probe["target_successes"]:
+            return {"status": "success", "message": probe["target_successes"][0]["text"]}
+
+        match = result_classifier.classify(probe["body_text"])
+        if match and match["status"] == "success":
+            return result_classifier.to_result(match)
+
+        if probe["manage"]:
+            return {"status": "success", "message": "Ключ активирован успешно"}
+
+        return {"status": "unknown", "message": "Неопределенный статус ключа"}
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any, List
+
+from playwright.async_api import Page, Frame, TimeoutError
+
+REDEEM_FRAME_KEYWORDS = ["redeem", "billing", "store"]
+
+MAIN_FRAME_INPUT_SELECTOR = (
+    'input[name="tokenString"], input[aria-label="Enter code"], input[aria-label="Введите 25-значный код"]'
+)
+
+REDEEM_INPUT_SELECTOR = f'{MAIN_FRAME_INPUT_SELECTOR}, input[type="text"]'
+
+
+def is_redeem_frame(frame: Frame) -> bool:
+    return any(keyword in frame.url.lower() for keyword in REDEEM_FRAME_KEYWORDS)
+
+
+class FrameDiscoveryStats:
+    def __init__(self):
+        self.discovered = 0
+        self.missed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record(self, latency: Optional[float]):
+        if latency is None:
+            self.missed += 1
+            return
+
+        self.discovered += 1
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "discovered": self.discovered,
+            "missed": self.missed,
+            "avg_latency": round(self.total_latency / self.discovered, 3) if self.discovered else 0.0,
+            "max_latency": round(self.max_latency, 3)
+        }
+
+
+class FrameRegistry:
+    def __init__(self, page: Page, input_timeout: int = 30000):
+        self.logger = logging.getLogger(__name__)
+        self.page = page
+        self.input_timeout = input_timeout
+        self.redeem_frame: Optional[Frame] = None
+        self.ready: asyncio.Future = asyncio.get_event_loop().create_future()
+        self.expected_at: Optional[float] = None
+        self.watchers: Dict[Frame, asyncio.Task] = {}
+
+        self.page.on("frameattached", self._on_frame)
+        self.page.on("framenavigated", self._on_frame)
+        self.page.on("framedetached", self._on_detached)
+        for frame in self.page.frames:
+            self._on_frame(frame)
+
+    @property
+    def has_redeem_frame(self) -> bool:
+        return self.redeem_frame is not None and not self.redeem_frame.is_detached()
+
+    def relevant_frames(self) -> List[Frame]:
+        return [frame for frame in self.page.frames if is_redeem_frame(frame)]
+
+    def expect(self):
+        self.expected_at = time.monotonic()
+        self._forget_redeem_frame()
+
+    async def wait(self, timeout: int) -> Optional[Frame]:
+        if self.has_redeem_frame:
+            return self.redeem_frame
+
+        try:
+            frame = await asyncio.wait_for(asyncio.shield(self.ready), timeout=timeout / 1000)
+        except asyncio.TimeoutError:
+            self.logger.info(f"Redeem frame with input did not appear within {timeout}ms")
+            frame_discovery_stats.record(None)
+            self.expected_at = None
+            return None
+
+        return frame if not frame.is_detached() else None
+
+    def detach(self):
+        for event, handler in [
+            ("frameattached", self._on_frame),
+            ("framenavigated", self._on_frame),
+            ("framedetached", self._on_detached)
+        ]:
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception as e:
+                self.logger.debug(f"Error removing {event} listener: {str(e)}")
+
+        for watcher in self.watchers.values():
+            watcher.cancel()
+        self.watchers = {}
+
+    def _on_frame(self, frame: Frame):
+        if not is_redeem_frame(frame):
+            return
+
+        if frame == self.redeem_frame:
+            self._forget_redeem_frame()
+
+        watcher = self.watchers.pop(frame, None)
+        if watcher:
+            watcher.cancel()
+        self.watchers[frame] = asyncio.create_task(self._watch_frame(frame))
+
+    def _on_detached(self, frame: Frame):
+        watcher = self.watchers.pop(frame, None)
+        if watcher:
+            watcher.cancel()
+
+        if frame == self.redeem_frame:
+            self.logger.info("Cached redeem frame was detached")
+            self._forget_redeem_frame()
+
+    def _forget_redeem_frame(self):
+        self.redeem_frame = None
+        if self.ready.done():
+            self.ready = asyncio.get_event_loop().create_future()
+
+    async def _watch_frame(self, frame: Frame):
+        selector = REDEEM_INPUT_SELECTOR if frame.parent_frame else MAIN_FRAME_INPUT_SELECTOR
+        try:
+            await frame.wait_for_selector(selector, state="attached", timeout=self.input_timeout)
+        except asyncio.CancelledError:
+            raise
+        except TimeoutError:
+            self.logger.debug(f"No redeem input in frame {frame.url} within {self.input_timeout}ms")
+            return
+        except Exception as e:
+            self.logger.debug(f"Stopped watching frame {frame.url}: {str(e)}")
+            return
+        finally:
+            if self.watchers.get(frame) is asyncio.current_task():
+                del self.watchers[frame]
+
+        if self.has_redeem_frame:
+            return
+
+        self.redeem_frame = frame
+        if self.expected_at is not None:
+            latency = time.monotonic() - self.expected_at
+            frame_discovery_stats.record(latency)
+            self.expected_at = None
+            self.logger.info(f"Redeem frame ready in {latency:.2f}s: {frame.url}")
+
+        if not self.ready.done():
+            self.ready.set_result(frame)
+
+
+frame_discovery_stats = FrameDiscoveryStats()
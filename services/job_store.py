@@ -0,0 +1,362 @@
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+from models.key import Key, KeyCheckResult, KeyCheckBatch
+from config import config, DATA_DIR, JobQueueConfig
+
+KEY_QUEUED = "queued"
+KEY_RUNNING = "running"
+KEY_DONE = "done"
+
+SETTING_EXTERNAL_WORKERS = "external_workers"
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS batches ("
+    "batch_id TEXT PRIMARY KEY, created_at REAL NOT NULL, completed_at REAL, "
+    "scheduling TEXT, caching TEXT, prefilter TEXT)",
+    "CREATE TABLE IF NOT EXISTS batch_keys ("
+    "batch_id TEXT NOT NULL, position INTEGER NOT NULL, key TEXT NOT NULL, region TEXT, "
+    "created_at TEXT NOT NULL, state TEXT NOT NULL, account TEXT, result TEXT, updated_at REAL NOT NULL, "
+    "worker TEXT, lease_expires_at REAL, claimed_at REAL, "
+    "PRIMARY KEY (batch_id, position))",
+    "CREATE INDEX IF NOT EXISTS batch_keys_state ON batch_keys (batch_id, state)",
+    "CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+]
+
+
+class JobStore:
+    def __init__(self, path: Optional[Path] = None, profile: Optional[JobQueueConfig] = None):
+        self.logger = logging.getLogger(__name__)
+        self.profile = profile or config.key.job_queue
+        self.path = Path(path or DATA_DIR / self.profile.filename)
+        self.connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.profile.enabled
+
+    def create_batch(self, batch_id: str, items: List[Tuple[Key, Optional[str]]]):
+        if not self.enabled:
+            return
+
+        now = time.time()
+        db = self._db()
+        with db:
+            db.execute("INSERT OR REPLACE INTO batches (batch_id, created_at) VALUES (?, ?)", (batch_id, now))
+            db.execute("DELETE FROM batch_keys WHERE batch_id = ?", (batch_id,))
+            db.executemany(
+                "INSERT INTO batch_keys (batch_id, position, key, region, created_at, state, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (batch_id, position, key.key, region, key.created_at.isoformat(), KEY_QUEUED, now)
+                    for position, (key, region) in enumerate(items)
+                ]
+            )
+        self.logger.info(f"Journaled batch {batch_id} with {len(items)} keys")
+
+    def mark_running(self, batch_id: Optional[str], key: Key, region: Optional[str], account: Optional[str] = None):
+        if not self.enabled or not batch_id:
+            return
+
+        db = self._db()
+        with db:
+            db.execute(
+                "UPDATE batch_keys SET state = ?, account = ?, updated_at = ? WHERE rowid = ("
+                "SELECT rowid FROM batch_keys WHERE batch_id = ? AND key = ? AND region IS ? AND state = ? "
+                "ORDER BY position LIMIT 1)",
+                (KEY_RUNNING, account, time.time(), batch_id, key.key, region, KEY_QUEUED)
+            )
+
+    def record_result(self, batch_id: Optional[str], result: KeyCheckResult, region: Optional[str]):
+        if not self.enabled or not batch_id:
+            return
+
+        payload = result.model_dump_json()
+        db = self._db()
+        with db:
+            db.execute(
+                "UPDATE batch_keys SET state = ?, result = ?, updated_at = ? WHERE rowid = ("
+                "SELECT rowid FROM batch_keys WHERE batch_id = ? AND key = ? AND region IS ? AND state != ? "
+                "ORDER BY state = ? DESC, position LIMIT 1)",
+                (KEY_DONE, payload, time.time(), batch_id, result.key.key, region, KEY_DONE, KEY_RUNNING)
+            )
+
+    def complete_batch(self, batch: KeyCheckBatch):
+        if not self.enabled or not batch.batch_id:
+            return
+
+        db = self._db()
+        with db:
+            db.execute(
+                "UPDATE batches SET completed_at = ?, scheduling = ?, caching = ?, prefilter = ? WHERE batch_id = ?",
+                (
+                    time.time(),
+                    json.dumps(batch.scheduling),
+                    json.dumps(batch.caching),
+                    json.dumps(batch.prefilter),
+                    batch.batch_id
+                )
+            )
+
+    def record_queue_mode(self, external_workers: bool):
+        if not self.enabled:
+            return
+
+        db = self._db()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)",
+                (SETTING_EXTERNAL_WORKERS, json.dumps(external_workers))
+            )
+
+    def accepts_workers(self) -> bool:
+        if not self.enabled:
+            return False
+
+        row = self._db().execute(
+            "SELECT value FROM settings WHERE name = ?", (SETTING_EXTERNAL_WORKERS,)
+        ).fetchone()
+        return bool(row and json.loads(row[0]))
+
+    def claim(self, worker: str, limit: int, lease: Optional[float] = None) -> List[Dict[str, Any]]:
+        if not self.enabled or limit <= 0:
+            return []
+
+        now = time.time()
+        lease_expires_at = now + (lease or self.profile.lease_seconds)
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            if not self.accepts_workers():
+                db.rollback()
+                return []
+            self._requeue_expired(now)
+            oldest = db.execute(
+                "SELECT region FROM batch_keys JOIN batches ON batches.batch_id = batch_keys.batch_id "
+                "WHERE state = ? ORDER BY batches.created_at, position LIMIT 1",
+                (KEY_QUEUED,)
+            ).fetchone()
+            rows = db.execute(
+                "SELECT batch_keys.rowid, batch_keys.batch_id, key, region, batch_keys.created_at FROM batch_keys "
+                "JOIN batches ON batches.batch_id = batch_keys.batch_id "
+                "WHERE state = ? AND region IS ? ORDER BY batches.created_at, position LIMIT ?",
+                (KEY_QUEUED, oldest[0], limit)
+            ).fetchall() if oldest else []
+            db.executemany(
+                "UPDATE batch_keys SET state = ?, worker = ?, lease_expires_at = ?, claimed_at = ?, updated_at = ? "
+                "WHERE rowid = ?",
+                [(KEY_RUNNING, worker, lease_expires_at, now, now, row[0]) for row in rows]
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        return [
+            {
+                "id": rowid,
+                "batch_id": batch_id,
+                "key": Key(key=key_text, region=region, created_at=datetime.fromisoformat(key_created_at)),
+                "region": region
+            }
+            for rowid, batch_id, key_text, region, key_created_at in rows
+        ]
+
+    def complete(self, job_id: int, worker: str, result: KeyCheckResult) -> bool:
+        if not self.enabled:
+            return False
+
+        now = time.time()
+        db = self._db()
+        with db:
+            updated = db.execute(
+                "UPDATE batch_keys SET state = ?, result = ?, account = ?, lease_expires_at = NULL, updated_at = ? "
+                "WHERE rowid = ? AND state = ? AND worker = ?",
+                (KEY_DONE, result.model_dump_json(), result.account_used, now, job_id, KEY_RUNNING, worker)
+            ).rowcount
+            if updated:
+                db.execute(
+                    "UPDATE batches SET completed_at = ? WHERE completed_at IS NULL AND batch_id = "
+                    "(SELECT batch_id FROM batch_keys WHERE rowid = ?) AND NOT EXISTS ("
+                    "SELECT 1 FROM batch_keys WHERE batch_keys.batch_id = batches.batch_id AND state != ?)",
+                    (now, job_id, KEY_DONE)
+                )
+
+        if not updated:
+            self.logger.warning(f"Dropped result for job {job_id} from {worker}: lease is no longer held")
+        return bool(updated)
+
+    def extend_leases(self, worker: str, lease: Optional[float] = None) -> int:
+        if not self.enabled:
+            return 0
+
+        now = time.time()
+        db = self._db()
+        with db:
+            return db.execute(
+                "UPDATE batch_keys SET lease_expires_at = ?, updated_at = ? WHERE worker = ? AND state = ?",
+                (now + (lease or self.profile.lease_seconds), now, worker, KEY_RUNNING)
+            ).rowcount
+
+    def release(self, worker: str, job_ids: Optional[List[int]] = None) -> int:
+        if not self.enabled:
+            return 0
+
+        query = "UPDATE batch_keys SET state = ?, worker = NULL, lease_expires_at = NULL, updated_at = ? " \
+                "WHERE worker = ? AND state = ?"
+        params: List[Any] = [KEY_QUEUED, time.time(), worker, KEY_RUNNING]
+        if job_ids is not None:
+            query += f" AND rowid IN ({', '.join('?' for _ in job_ids)})"
+            params.extend(job_ids)
+
+        db = self._db()
+        with db:
+            return db.execute(query, params).rowcount
+
+    def worker_statistics(self, batch_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        if not self.enabled:
+            return {}
+
+        query = (
+            "SELECT worker, SUM(state = ?), SUM(state = ?), MIN(claimed_at), "
+            "MAX(CASE WHEN state = ? THEN updated_at END), MAX(updated_at) "
+            "FROM batch_keys WHERE worker IS NOT NULL"
+        )
+        params: List[Any] = [KEY_DONE, KEY_RUNNING, KEY_DONE]
+        if batch_id:
+            query += " AND batch_id = ?"
+            params.append(batch_id)
+
+        workers = {}
+        for worker, completed, running, first_claim, last_done, last_seen in self._db().execute(
+            query + " GROUP BY worker", params
+        ):
+            elapsed = (last_done or 0) - (first_claim or 0)
+            workers[worker] = {
+                "completed": completed,
+                "running": running,
+                "keys_per_minute": round(completed / elapsed * 60, 2) if completed and elapsed > 0 else 0.0,
+                "last_seen": last_seen
+            }
+        return workers
+
+    def unfinished_batches(self) -> List[str]:
+        if not self.enabled:
+            return []
+
+        rows = self._db().execute(
+            "SELECT batch_id FROM batches WHERE completed_at IS NULL ORDER BY created_at"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def load_batch(self, batch_id: str) -> Optional[Tuple[KeyCheckBatch, List[Tuple[Key, Optional[str]]]]]:
+        if not self.enabled:
+            return None
+
+        db = self._db()
+        batch_row = db.execute(
+            "SELECT created_at, completed_at, scheduling, caching, prefilter FROM batches WHERE batch_id = ?",
+            (batch_id,)
+        ).fetchone()
+        if not batch_row:
+            return None
+
+        created_at, completed_at, scheduling, caching, prefilter = batch_row
+        keys = []
+        results = []
+        pending = []
+        for key_text, region, key_created_at, state, result in db.execute(
+            "SELECT key, region, created_at, state, result FROM batch_keys WHERE batch_id = ? ORDER BY position",
+            (batch_id,)
+        ):
+            key = Key(key=key_text, region=region, created_at=datetime.fromisoformat(key_created_at))
+            keys.append(key)
+            if state == KEY_DONE and result:
+                results.append(KeyCheckResult.model_validate_json(result))
+            else:
+                pending.append((key, region))
+
+        batch = KeyCheckBatch(
+            batch_id=batch_id,
+            keys=keys,
+            results=results,
+            created_at=datetime.fromtimestamp(created_at),
+            completed_at=datetime.fromtimestamp(completed_at) if completed_at else None,
+            progress=len(results) / len(keys) if keys else 1.0,
+            scheduling=json.loads(scheduling) if scheduling else {},
+            caching=json.loads(caching) if caching else {},
+            prefilter=json.loads(prefilter) if prefilter else {}
+        )
+        return batch, pending
+
+    def _requeue_expired(self, now: float):
+        expired = self._db().execute(
+            "UPDATE batch_keys SET state = ?, worker = NULL, lease_expires_at = NULL, updated_at = ? "
+            "WHERE state = ? AND lease_expires_at IS NOT NULL AND lease_expires_at < ?",
+            (KEY_QUEUED, now, KEY_RUNNING, now)
+        ).rowcount
+        if expired:
+            self.logger.warning(f"Requeued {expired} keys with expired worker leases")
+
+    def requeue_running(self, batch_id: str) -> int:
+        if not self.enabled:
+            return 0
+
+        db = self._db()
+        with db:
+            return db.execute(
+                "UPDATE batch_keys SET state = ?, account = NULL, worker = NULL, lease_expires_at = NULL, updated_at = ? "
+                "WHERE batch_id = ? AND state = ?",
+                (KEY_QUEUED, time.time(), batch_id, KEY_RUNNING)
+            ).rowcount
+
+    def requeue_unleased(self) -> int:
+        if not self.enabled:
+            return 0
+
+        db = self._db()
+        with db:
+            return db.execute(
+                "UPDATE batch_keys SET state = ?, account = NULL, updated_at = ? "
+                "WHERE state = ? AND lease_expires_at IS NULL",
+                (KEY_QUEUED, time.time(), KEY_RUNNING)
+            ).rowcount
+
+    def get_statistics(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False}
+
+        db = self._db()
+        states = db.execute("SELECT state, COUNT(*) FROM batch_keys GROUP BY state").fetchall()
+        batches = db.execute(
+            "SELECT COUNT(*), SUM(completed_at IS NULL) FROM batches"
+        ).fetchone()
+
+        return {
+            "enabled": True,
+            "path": str(self.path),
+            "batches": batches[0],
+            "unfinished_batches": batches[1] or 0,
+            "keys": {state: count for state, count in states}
+        }
+
+    def close(self):
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self.connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(str(self.path), timeout=30)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+            self.connection.commit()
+        return self.connection
@@ -2,15 +2,28 @@ import asyncio
 import logging
 import time
 import random
-from typing import List, Dict, Optional, Tuple, Any
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple, Any, Callable, Awaitable
 
 from playwright.async_api import Page, TimeoutError
 
-from models.key import Key, KeyCheckResult, KeyStatus, KeyCheckBatch
+from models.key import Key, KeyCheckResult, KeyStatus, KeyCheckBatch, KeyFormatError
 from models.account import MicrosoftAccount
 from models.vpn import VPNRegion
 
 from services.microsoft_auth import MicrosoftAuthenticator
+from services.browser_pool import BrowserPool
+from services.session_cache import SessionCache
+from services.selector_stats import SelectorStats
+from services.redeem_session import RedeemSession
+from services.region_scheduler import RegionScheduler
+from services.concurrency_controller import ConcurrencyController, classify_outcome
+from services.rate_limiter import RateLimiter
+from services.result_cache import ResultCache
+from services.single_flight import SingleFlight
+from services.key_prefilter import KeyPrefilter
+from services.job_store import JobStore
+from services.browser_supervisor import BrowserSupervisor, SupervisorError
 from services.account_manager import AccountManager
 from services.vpn_manager import VPNManager
 
@@ -20,14 +33,26 @@ class KeyChecker:
     def __init__(
         self,
         account_manager: AccountManager,
-        vpn_manager: VPNManager
+        vpn_manager: VPNManager,
+        browser_pool: Optional[BrowserPool] = None
     ):
         self.logger = logging.getLogger(__name__)
         self.account_manager = account_manager
         self.vpn_manager = vpn_manager
-        self.authenticator = MicrosoftAuthenticator()
+        self.browser_pool = browser_pool or BrowserPool()
+        self.session_cache = SessionCache()
+        self.selector_stats = SelectorStats()
+        self.supervisor = BrowserSupervisor(self.browser_pool)
+        self.rate_limiter = RateLimiter()
+        self.result_cache = ResultCache()
+        self.single_flight = SingleFlight()
+        self.prefilter = KeyPrefilter()
+        self.job_store = JobStore()
+        self.authenticator = MicrosoftAuthenticator(self.browser_pool, self.selector_stats)
         self.running_tasks = {}  
         self.batch_results = {}  
+        self.batch_controllers: Dict[str, ConcurrencyController] = {}
+        self.result_handlers: Dict[str, Callable[[KeyCheckResult, Optional[str]], None]] = {}
         self.key_check_statuses = {}  
         self.key_check_stages = {
             "init": "Инициализация проверки",
@@ -41,14 +66,29 @@ class KeyChecker:
             "completed": "Проверка завершена"
         }
     
-    async def initialize(self):
-        
-        
+    async def initialize(self, coordinator: bool = True):
+        
+        await self.browser_pool.initialize()
+        await self.supervisor.start()
+        if coordinator:
+            self.job_store.record_queue_mode(config.key.job_queue.external_workers)
+        if coordinator and config.key.job_queue.recover_on_startup:
+            if not config.key.job_queue.external_workers:
+                await self.recover_batches()
+            else:
+                requeued = self.job_store.requeue_unleased()
+                if requeued:
+                    self.logger.info(f"Returned {requeued} keys interrupted during in-process checks to the worker queue")
         self.logger.info("Initialized KeyChecker")
     
     async def close(self):
         
+        await self.supervisor.stop()
         await self.authenticator.close()
+        await self.browser_pool.close()
+        self.selector_stats.flush(force=True)
+        self.result_cache.close()
+        self.job_store.close()
         self.logger.info("Closed KeyChecker resources")
     
     def generate_check_id(self, key: Key) -> str:
@@ -191,6 +231,31 @@ class KeyChecker:
     
     async def check_key(self, key: Key, account: Optional[MicrosoftAccount] = None, region: Optional[str] = None) -> KeyCheckResult:
         
+        region = region or key.region
+        reason = self.prefilter.reject_reason(key.key)
+        if reason:
+            self.logger.info(f"Key {key.key} rejected by pre-filter: {reason.message}")
+            return self._rejected_result(key, reason)
+        
+        return await self._check_once(key, region, lambda: self._check_key_standalone(key, account, region))
+    
+    def _rejected_result(self, key: Key, reason: KeyFormatError) -> KeyCheckResult:
+        
+        result = KeyCheckResult(key=key)
+        result.mark_invalid()
+        result.error_message = reason.message
+        return result
+    
+    async def _check_once(self, key: Key, region: Optional[str], check: Callable[[], Awaitable[KeyCheckResult]]) -> KeyCheckResult:
+        
+        result, shared = await self.single_flight.run(self.result_cache.key_for(key, region), check)
+        if shared:
+            self.logger.info(f"Key {key.formatted_key} coalesced with an in-flight check, Status: {result.status}")
+            return result.copy(update={"key": key})
+        return result
+    
+    async def _check_key_standalone(self, key: Key, account: Optional[MicrosoftAccount] = None, region: Optional[str] = None) -> KeyCheckResult:
+        
         
         result = KeyCheckResult(key=key)
         
@@ -208,15 +273,40 @@ class KeyChecker:
         self.logger.info(f"Начинаем проверку ключа: {key.formatted_key}, ID проверки: {check_id}, временный ID: {temp_check_id}")
         
         
-        auth = MicrosoftAuthenticator()
+        session = None
+        use_vpn = False
         
         try:
             
             if not region and key.region:
                 region = key.region
             
+            proxy = self.vpn_manager.get_region_proxies().get(region.upper()) if region else None
+            use_vpn = bool(region and config.vpn.enabled and not proxy)
+            
+            
+            cached = self.result_cache.get(key, region)
+            if cached:
+                cached.check_id = check_id
+                self.logger.info(f"Key {key.formatted_key} served from result cache, Status: {cached.status}")
+                final_result = {
+                    "key": cached.key.formatted_key,
+                    "status": cached.status,
+                    "error_message": cached.error_message,
+                    "region_used": cached.region_used,
+                    "is_global": cached.is_global,
+                    "from_cache": True
+                }
+                self.update_key_status(check_id, "completed", 100, "Результат получен из кэша", False, final_result)
+                self.update_key_status(temp_check_id, "completed", 100, "Результат получен из кэша", False, final_result)
+                return cached
+            
+            
+            if proxy:
+                self.logger.info(f"Using proxy for region {region} instead of switching VPN")
+                result.region_used = region
             
-            if region and config.vpn.enabled:
+            elif use_vpn:
                 self.update_key_status(check_id, "vpn_connect", 10, "Подключение к VPN")
                 vpn_service = config.vpn.default_provider
                 self.logger.info(f"Connecting to VPN region: {region}")
@@ -241,10 +331,15 @@ class KeyChecker:
                 account_from_pool = True
             
             result.account_used = account.email
+            await self.rate_limiter.acquire(account.id, region)
+            
             
+            session = RedeemSession(account, self.browser_pool, self.session_cache, max_checks=1,
+                                    selector_stats=self.selector_stats, proxy=proxy)
+            auth = session.auth
             
             self.update_key_status(check_id, "browser_init", 20, "Инициализация браузера")
-            if not await auth.initialize():
+            if not await session.start_browser():
                 error_msg = "Failed to initialize browser"
                 result.mark_error(error_msg)
                 self.update_key_status(check_id, "browser_init", 25, error_msg, True)
@@ -270,7 +365,7 @@ class KeyChecker:
             
             
             self.update_key_status(check_id, "login", 30, "Вход в аккаунт Microsoft")
-            login_success = await auth.login(account)
+            login_success = await session.authenticate()
             if not login_success:
                 error_msg = "Failed to login to Microsoft account"
                 result.mark_error(error_msg)
@@ -279,7 +374,7 @@ class KeyChecker:
             
             
             self.update_key_status(check_id, "navigate", 50, "Переход на страницу проверки ключей")
-            if not await auth.navigate_to_redeem_page():
+            if not await session.open_redeem_page():
                 error_msg = "Failed to navigate to redeem page"
                 result.mark_error(error_msg)
                 self.update_key_status(check_id, "navigate", 55, error_msg, True)
@@ -287,43 +382,32 @@ class KeyChecker:
             
             
             self.update_key_status(check_id, "key_input", 70, "Ввод и проверка ключа")
-            
-            
-            check_result = await auth.check_key(key.formatted_key)
+            check_result = await session.check_key(key)
             
             
             self.update_key_status(check_id, "check_processing", 90, "Анализ результатов проверки")
             self.logger.info(f"Key check result: {check_result}")
             
-            if check_result['status'] == 'success':
-                result.mark_valid()
-            elif check_result['status'] == 'used':
-                result.mark_used()
-            elif check_result['status'] == 'invalid':
-                result.mark_invalid()
-            elif check_result['status'] == 'region_error' or check_result['status'] == 'disabled':
-                result.mark_region_error(check_result['message'])
-            elif check_result['status'] == 'unknown':
-                
-                result.mark_error(f"Unknown key status: {check_result['message']}")
-            else:
-                result.mark_error(check_result['message'])
+            self._apply_check_result(result, check_result)
+            network_stats = session.network_stats()
+            self.logger.info(f"Requests blocked: {network_stats['requests_blocked']}, "
+                             f"estimated bytes saved: {network_stats['bytes_saved']}")
             
             
             self.update_key_status(check_id, "cleanup", 95, "Завершение проверки")
-            await auth.logout()
-            await auth.close()
+            await session.close()
             
             
             if account_from_pool:
                 await self.account_manager.release_account(account)
             
             
-            if region and config.vpn.enabled:
+            if use_vpn:
                 await self.vpn_manager.disconnect()
             
             
             self.logger.info(f"Key check completed: {key.formatted_key}, Status: {result.status}")
+            self.result_cache.store(result, region)
             
             
             final_result = {
@@ -332,7 +416,9 @@ class KeyChecker:
                 "error_message": result.error_message,
                 "region_used": result.region_used,
                 "is_global": result.is_global,
-                "message": check_result.get('message', None)
+                "message": check_result.get('message', None),
+                "network": network_stats,
+                "cdp_calls": check_result.get('cdp_calls')
             }
             self.update_key_status(check_id, "completed", 100, "Проверка завершена успешно", False, final_result)
             
@@ -362,48 +448,119 @@ class KeyChecker:
             
             try:
                 
-                if auth:
-                    await auth.close()
+                if session:
+                    session.broken = True
+                    await session.close()
                 
                 
                 if account_from_pool and account:
                     await self.account_manager.release_account(account)
                 
                 
-                if region and config.vpn.enabled:
+                if use_vpn:
                     await self.vpn_manager.disconnect()
             except Exception as cleanup_error:
                 
                 self.logger.error(f"Ошибка при освобождении ресурсов: {str(cleanup_error)}")
             
             return result
+        
+        finally:
+            
+            if session and session.auth.context:
+                await session.auth.close()
+    
+    def _apply_check_result(self, result: KeyCheckResult, check_result: Dict[str, Any]):
+        
+        if check_result['status'] == 'success':
+            result.mark_valid()
+        elif check_result['status'] == 'used':
+            result.mark_used()
+        elif check_result['status'] == 'invalid':
+            result.mark_invalid()
+        elif check_result['status'] == 'region_error' or check_result['status'] == 'disabled':
+            result.mark_region_error(check_result['message'])
+        elif check_result['status'] == 'unknown':
+            
+            result.mark_error(f"Unknown key status: {check_result['message']}")
+        else:
+            result.mark_error(check_result['message'])
     
     async def check_keys_batch(self, keys: List[Key], regions: Optional[List[str]] = None, batch_id: Optional[str] = None) -> str:
         
         if not batch_id:
-            batch_id = f"batch_{int(time.time())}"
+            batch_id = f"batch_{int(time.time())}_{random.randint(1000, 9999)}"
+        
+        items = []
+        for i, key in enumerate(keys):
+            region = None
+            if regions and i < len(regions):
+                region = regions[i]
+            items.append((key, region or key.region))
+        
+        batch = KeyCheckBatch(batch_id=batch_id, keys=keys)
+        self.job_store.create_batch(batch_id, items)
+        
+        if config.key.job_queue.external_workers and self.job_store.enabled:
+            self.logger.info(f"Queued batch {batch_id} with {len(keys)} keys for worker processes")
+            return batch_id
         
-        batch = KeyCheckBatch(keys=keys)
         self.batch_results[batch_id] = batch
         
         
-        task = asyncio.create_task(self._process_batch(batch_id, keys, regions))
+        task = asyncio.create_task(self._process_batch(batch_id, items))
         self.running_tasks[batch_id] = task
         
         self.logger.info(f"Started batch check with ID: {batch_id}, Keys: {len(keys)}")
         return batch_id
     
-    async def get_batch_status(self, batch_id: str) -> Dict[str, Any]:
+    async def recover_batches(self):
+        
+        for batch_id in self.job_store.unfinished_batches():
+            if batch_id in self.batch_results:
+                continue
+            
+            requeued = self.job_store.requeue_running(batch_id)
+            loaded = self.job_store.load_batch(batch_id)
+            if not loaded:
+                continue
+            
+            batch, pending = loaded
+            self.batch_results[batch_id] = batch
+            self.logger.info(f"Восстановлен пакет {batch_id}: {len(batch.results)} результатов, "
+                             f"{len(pending)} ключей в очереди ({requeued} прерванных проверок)")
+            
+            if not pending:
+                batch.completed_at = datetime.now()
+                self.job_store.complete_batch(batch)
+                continue
+            
+            self.running_tasks[batch_id] = asyncio.create_task(self._process_batch(batch_id, pending))
+    
+    def _get_batch(self, batch_id: str) -> Optional[KeyCheckBatch]:
+        
+        if config.key.job_queue.external_workers and batch_id not in self.running_tasks:
+            loaded = self.job_store.load_batch(batch_id)
+            return loaded[0] if loaded else None
         
         if batch_id not in self.batch_results:
+            loaded = self.job_store.load_batch(batch_id)
+            if not loaded:
+                return None
+            self.batch_results[batch_id] = loaded[0]
+        
+        return self.batch_results[batch_id]
+    
+    async def get_batch_status(self, batch_id: str) -> Dict[str, Any]:
+        
+        batch = self._get_batch(batch_id)
+        if not batch:
             return {
                 "status": "not_found",
                 "progress": 0,
                 "results": []
             }
         
-        batch = self.batch_results[batch_id]
-        
         return {
             "status": "completed" if batch.completed_at else "in_progress",
             "progress": batch.progress,
@@ -414,15 +571,20 @@ class KeyChecker:
             "invalid_keys": len(batch.get_invalid_keys()),
             "region_error_keys": len(batch.get_region_error_keys()),
             "error_keys": len(batch.get_error_keys()),
+            "scheduling": batch.scheduling,
+            "caching": batch.caching,
+            "prefilter": batch.prefilter,
+            "workers": self.job_store.worker_statistics(batch_id),
+            "concurrency": self.batch_controllers[batch_id].get_statistics() if batch_id in self.batch_controllers else {},
             "results": [result.dict() for result in batch.results]
         }
     
     async def get_batch_results(self, batch_id: str) -> List[KeyCheckResult]:
         
-        if batch_id not in self.batch_results:
+        batch = self._get_batch(batch_id)
+        if not batch:
             return []
         
-        batch = self.batch_results[batch_id]
         return batch.results
     
     async def _check_key_on_page(self, page: Page, key: Key) -> Tuple[str, Optional[str]]:
@@ -477,32 +639,38 @@ class KeyChecker:
         except Exception as e:
             return "error", f"Error checking key: {str(e)}"
     
-    async def _process_batch(self, batch_id: str, keys: List[Key], regions: Optional[List[str]] = None):
+    async def _process_batch(self, batch_id: str, queued: List[Tuple[Key, Optional[str]]]):
         
         try:
             batch = self.batch_results[batch_id]
             
             
-            semaphore = asyncio.Semaphore(config.key.parallel_checks)
-            
+            items = self.admit_keys(batch, queued)
+            self.logger.info(f"Batch {batch_id}: {len(items)} keys to check, "
+                             f"{batch.prefilter['rejected']} rejected by pre-filter, "
+                             f"{batch.caching['cache_hits']} served from cache, "
+                             f"{batch.caching['duplicates']} duplicates collapsed")
             
-            tasks = []
-            
-            for i, key in enumerate(keys):
-                region = None
-                if regions and i < len(regions):
-                    region = regions[i]
-                
-                
-                tasks.append(self._check_key_with_semaphore(semaphore, key, batch, region))
             
+            scheduler = self.create_scheduler(batch, items)
+            await scheduler.plan()
             
-            await asyncio.gather(*tasks)
+            controller = ConcurrencyController(max_limit=len(items))
+            self.batch_controllers[batch_id] = controller
+            worker_state = {"active_sessions": 0, "requeues": {}}
+            try:
+                await self._run_workers(scheduler, batch, worker_state, controller)
+            finally:
+                await scheduler.finish()
+                batch.scheduling = scheduler.get_statistics()
             
             
-            batch.completed_at = time.time()
+            batch.completed_at = datetime.now()
+            self.job_store.complete_batch(batch)
             
-            self.logger.info(f"Batch check completed: {batch_id}, Keys: {len(keys)}")
+            self.logger.info(f"Batch check completed: {batch_id}, Keys: {len(queued)}, "
+                             f"region switches: {batch.scheduling['region_switches']}, "
+                             f"VPN transitions: {batch.scheduling['vpn_transition_time']}s")
         
         except Exception as e:
             self.logger.error(f"Error processing batch {batch_id}: {str(e)}")
@@ -512,38 +680,342 @@ class KeyChecker:
             if batch_id in self.running_tasks:
                 del self.running_tasks[batch_id]
     
-    async def _check_key_with_semaphore(self, semaphore: asyncio.Semaphore, key: Key, batch: KeyCheckBatch, region: Optional[str] = None):
+    def admit_keys(self, batch: KeyCheckBatch, queued: List[Tuple[Key, Optional[str]]]) -> List[Tuple[Key, Optional[str]]]:
+        
+        items = []
+        cached_results: Dict[str, KeyCheckResult] = {}
+        duplicates = 0
+        rejection_reasons = self.prefilter.validate([key.key for key, _ in queued])
+        for i, (key, region) in enumerate(queued):
+            if rejection_reasons[i]:
+                self._add_result(batch, self._rejected_result(key, rejection_reasons[i]), region)
+                continue
+            
+            cache_key = self.result_cache.key_for(key, region)
+            if cache_key in batch.duplicates:
+                batch.duplicates[cache_key].append((key, region))
+                duplicates += 1
+                continue
+            
+            if cache_key in cached_results:
+                self._add_result(batch, cached_results[cache_key].copy(update={"key": key}), region)
+                duplicates += 1
+                continue
+            
+            cached = self.result_cache.get(key, region)
+            if cached:
+                cached_results[cache_key] = cached
+                self._add_result(batch, cached, region)
+                continue
+            
+            batch.duplicates[cache_key] = []
+            items.append((key, region))
+        
+        cache_hits = batch.caching.get("cache_hits", 0) + len(cached_results)
+        cache_misses = batch.caching.get("cache_misses", 0) + len(items)
+        lookups = cache_hits + cache_misses
+        batch.caching = {
+            "unique_keys": lookups,
+            "duplicates": batch.caching.get("duplicates", 0) + duplicates,
+            "cache_hits": cache_hits,
+            "cache_misses": cache_misses,
+            "hit_ratio": round(cache_hits / lookups, 3) if lookups else 0.0
+        }
+        rejected = batch.prefilter.get("rejected", 0) + sum(1 for reason in rejection_reasons if reason)
+        batch.prefilter = {
+            "checked": batch.prefilter.get("checked", 0) + len(queued),
+            "rejected": rejected,
+            "browser_checks_saved": rejected
+        }
+        return items
+    
+    def create_scheduler(
+        self,
+        batch: KeyCheckBatch,
+        items: List[Tuple[Key, Optional[str]]],
+        streaming: bool = False,
+        allow_vpn: bool = True
+    ) -> RegionScheduler:
+        
+        return RegionScheduler(
+            self.vpn_manager, items,
+            lambda key, region, reason: self._fail_unreachable(batch, key, region, reason),
+            streaming=streaming,
+            allow_vpn=allow_vpn
+        )
+    
+    async def run_stream(
+        self,
+        scheduler: RegionScheduler,
+        batch: KeyCheckBatch,
+        max_parallel: int,
+        on_result: Callable[[KeyCheckResult, Optional[str]], None]
+    ):
+        
+        controller = ConcurrencyController(initial=max_parallel, max_limit=max_parallel)
+        self.batch_controllers[batch.batch_id] = controller
+        self.result_handlers[batch.batch_id] = on_result
+        worker_state = {"active_sessions": 0, "requeues": {}}
+        try:
+            await scheduler.plan()
+            await self._run_workers(scheduler, batch, worker_state, controller)
+        finally:
+            await scheduler.finish()
+            batch.scheduling = scheduler.get_statistics()
+            self.result_handlers.pop(batch.batch_id, None)
+    
+    async def _run_workers(
+        self,
+        scheduler: RegionScheduler,
+        batch: KeyCheckBatch,
+        worker_state: Dict[str, Any],
+        controller: ConcurrencyController
+    ):
+        
+        workers = set()
+        try:
+            while True:
+                while not scheduler.empty and controller.active_workers < controller.limit:
+                    controller.worker_started()
+                    workers.add(asyncio.create_task(self._run_session_worker(scheduler, batch, worker_state, controller)))
+                
+                if not workers:
+                    if scheduler.finished:
+                        break
+                    await scheduler.wait_for_work()
+                    continue
+                
+                done, workers = await asyncio.wait(workers, timeout=1.0)
+                for task in done:
+                    if task.exception():
+                        self.logger.error(f"Session worker failed: {str(task.exception())}")
+        finally:
+            for task in workers:
+                task.cancel()
+            if workers:
+                await asyncio.gather(*workers, return_exceptions=True)
+    
+    async def _run_session_worker(
+        self,
+        scheduler: RegionScheduler,
+        batch: KeyCheckBatch,
+        worker_state: Dict[str, Any],
+        controller: ConcurrencyController
+    ):
         
-        async with semaphore:
+        retired = False
+        try:
+            retired = await self._drain_with_sessions(scheduler, batch, worker_state, controller)
+        finally:
+            controller.worker_finished(retired)
+    
+    async def _drain_with_sessions(
+        self,
+        scheduler: RegionScheduler,
+        batch: KeyCheckBatch,
+        worker_state: Dict[str, Any],
+        controller: ConcurrencyController
+    ) -> bool:
+        
+        retired = False
+        while not scheduler.empty and not retired:
+            if controller.try_retire():
+                return True
             
-            account = await self.account_manager.get_available_account()
+            account = await self.account_manager.get_available_account(
+                delay=lambda account: self.rate_limiter.delay(account.id)
+            )
             
             if not account:
+                if worker_state["active_sessions"] > 0:
+                    
+                    return False
+                
+                item = await scheduler.next()
+                if not item:
+                    break
+                key, region = item
                 result = KeyCheckResult(key=key)
                 result.mark_error("No available accounts")
-                batch.add_result(result)
-                return
+                self._record_result(batch, result, region)
+                await scheduler.done()
+                continue
+            
+            await self.rate_limiter.acquire(account.id)
+            item = await scheduler.next()
+            if not item:
+                await self.account_manager.release_account(account, checks=0)
+                break
+            route = scheduler.route(item[1])
+            
+            max_checks = config.microsoft_account.max_checks_per_account - account.checks_count
+            session = RedeemSession(
+                account, self.browser_pool, self.session_cache,
+                max_checks=max(max_checks, 1), selector_stats=self.selector_stats,
+                proxy=scheduler.proxy_for(route)
+            )
+            worker_state["active_sessions"] += 1
             
             try:
+                try:
+                    opened = await self.supervisor.run(session, session.open(), "login")
+                except SupervisorError as e:
+                    self.logger.error(f"Opening redeem session for {account.email} was stopped: {str(e)}")
+                    session.broken = True
+                    opened = False
                 
-                result = await self.check_key(key, account, region)
-                
-                
-                batch.add_result(result)
-                
-                
-                await self.account_manager.release_account(account)
-                
+                if not opened:
+                    self.logger.error(f"Failed to open redeem session for {account.email}")
+                    session.broken = True
+                    key, region = item
+                    item = None
+                    await self._requeue_or_fail(scheduler, batch, worker_state, session, key, region,
+                                                "failed to open redeem session")
+                    await scheduler.done()
+                    continue
                 
-                await asyncio.sleep(config.key.check_delay)
+                while item:
+                    key, region = item
+                    await self.rate_limiter.acquire_region(region)
+                    started = time.monotonic()
+                    if batch.batch_id not in self.result_handlers:
+                        self.job_store.mark_running(batch.batch_id, key, region, account.email)
+                    try:
+                        result = await self._check_once(
+                            key, region, lambda: self._supervised_check(session, account, key, region)
+                        )
+                    except SupervisorError as e:
+                        session.broken = True
+                        controller.record(time.monotonic() - started, "timeout")
+                        await self._requeue_or_fail(scheduler, batch, worker_state, session, key, region, str(e))
+                        break
+                    finally:
+                        item = None
+                        await scheduler.done()
+                    
+                    self._record_result(batch, result, region)
+                    controller.record(time.monotonic() - started, classify_outcome(result.status, result.error_message))
+                    
+                    if not session.is_usable:
+                        break
+                    
+                    if controller.try_retire():
+                        retired = True
+                        break
+                    
+                    if self.rate_limiter.delay(account.id) > self.rate_limiter.profile.max_session_wait:
+                        self.logger.info(f"Account {account.email} is rate limited, returning its browser context")
+                        break
+                    await self.rate_limiter.acquire(account.id)
+                    item = await scheduler.next(prefer=route)
+                    if item and scheduler.route(item[1]) != route:
+                        await scheduler.requeue(*item)
+                        item = None
+                        await scheduler.done()
+                        break
             
             except Exception as e:
-                self.logger.error(f"Error checking key {key.formatted_key}: {str(e)}")
-                
-                
-                await self.account_manager.release_account(account)
-                
-                
-                result = KeyCheckResult(key=key)
-                result.mark_error(f"Error checking key: {str(e)}")
-                batch.add_result(result) 
\ No newline at end of file
+                self.logger.error(f"Error in redeem session for {account.email}: {str(e)}")
+                session.broken = True
+            
+            finally:
+                if item:
+                    await self._requeue_or_fail(scheduler, batch, worker_state, session, *item, "redeem session failed")
+                    await scheduler.done()
+                worker_state["active_sessions"] -= 1
+                await self.supervisor.dispose(session)
+                await self.account_manager.release_account(account, checks=session.checks_done)
+        
+        return retired
+    
+    async def _supervised_check(self, session: RedeemSession, account: MicrosoftAccount, key: Key, region: Optional[str]) -> KeyCheckResult:
+        
+        return await self.supervisor.run(session, self._check_key_in_session(session, key, region), "key_input")
+    
+    def _fail_unreachable(self, batch: KeyCheckBatch, key: Key, region: Optional[str], reason: str):
+        
+        result = KeyCheckResult(key=key, region_used=region)
+        result.mark_error(reason)
+        self._record_result(batch, result, region)
+    
+    def _record_result(self, batch: KeyCheckBatch, result: KeyCheckResult, region: Optional[str] = None):
+        
+        self._add_result(batch, result, region)
+        self.result_cache.store(result, region)
+        for duplicate, duplicate_region in batch.duplicates.pop(self.result_cache.key_for(result.key, region), []):
+            self._add_result(batch, result.copy(update={"key": duplicate}), duplicate_region)
+    
+    def _add_result(self, batch: KeyCheckBatch, result: KeyCheckResult, region: Optional[str] = None):
+        
+        handler = self.result_handlers.get(batch.batch_id)
+        if handler:
+            handler(result, region)
+            return
+        
+        batch.add_result(result)
+        self.job_store.record_result(batch.batch_id, result, region)
+    
+    async def _requeue_or_fail(
+        self,
+        scheduler: RegionScheduler,
+        batch: KeyCheckBatch,
+        worker_state: Dict[str, Any],
+        session: RedeemSession,
+        key: Key,
+        region: Optional[str],
+        reason: str
+    ):
+        
+        attempts = worker_state["requeues"].get(key.key, 0)
+        if attempts < config.browser.supervisor.max_requeues:
+            worker_state["requeues"][key.key] = attempts + 1
+            self.supervisor.record_requeue()
+            self.logger.warning(f"Requeueing key {key.formatted_key} after worker failure: {reason}")
+            await scheduler.requeue(key, region)
+            return
+        
+        result = KeyCheckResult(key=key, account_used=session.account.email, region_used=region)
+        result.mark_error(f"Worker failed: {reason}")
+        self._record_result(batch, result, region)
+    
+    async def _check_key_in_session(self, session: RedeemSession, key: Key, region: Optional[str] = None) -> KeyCheckResult:
+        
+        result = KeyCheckResult(key=key, account_used=session.account.email)
+        check_id = self.generate_check_id(key)
+        result.check_id = check_id
+        
+        if not region and key.region:
+            region = key.region
+        
+        try:
+            self.update_key_status(check_id, "init", 5, "Инициализация проверки")
+            
+            if region and (config.vpn.enabled or session.proxy):
+                result.region_used = region
+            
+            self.update_key_status(check_id, "key_input", 70, "Ввод и проверка ключа")
+            check_result = await session.check_key(key)
+            self.logger.info(f"Key check result: {check_result}")
+            
+            self._apply_check_result(result, check_result)
+            
+            final_result = {
+                "key": result.key.formatted_key,
+                "status": result.status,
+                "error_message": result.error_message,
+                "region_used": result.region_used,
+                "is_global": result.is_global,
+                "message": check_result.get('message', None),
+                "network": session.network_stats(),
+                "cdp_calls": check_result.get('cdp_calls')
+            }
+            self.update_key_status(check_id, "completed", 100, "Проверка завершена успешно", False, final_result)
+        
+        except Exception as e:
+            error_msg = f"Ошибка при проверке ключа: {str(e)}"
+            self.logger.error(error_msg, exc_info=True)
+            result.mark_error(error_msg)
+            self.update_key_status(check_id, "error", 100, error_msg, True)
+            session.broken = True
+        
+        return result
@@ -0,0 +1,75 @@
+import logging
+import time
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+from models.key import KEY_SEPARATOR_PATTERN, KEY_FORMAT_RULES, KeyFormatError
+from config import config
+
+
+class KeyPrefilter:
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.stats = {"checked": 0, "rejected": 0, "time": 0.0}
+        self.reasons: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return config.key.prefilter_enabled
+
+    def validate(self, keys: List[str]) -> List[Optional[KeyFormatError]]:
+        if not self.enabled or not keys:
+            return [None] * len(keys)
+
+        started = time.perf_counter()
+        raw = pd.Series(keys, dtype="string").fillna("").str.strip()
+        subjects = {
+            "raw": raw,
+            "cleaned": raw.str.upper().str.replace(KEY_SEPARATOR_PATTERN, "", regex=True)
+        }
+
+        violations = []
+        for rule in KEY_FORMAT_RULES:
+            subject = subjects[rule.subject]
+            if rule.must_match:
+                violated = ~subject.str.fullmatch(rule.pattern)
+            else:
+                violated = subject.str.contains(rule.pattern, regex=True)
+            violations.append(violated.to_numpy(dtype=bool))
+
+        codes = np.select(
+            violations,
+            [np.asarray(rule.code, dtype=object) for rule in KEY_FORMAT_RULES],
+            default=None
+        )
+
+        rejected = pd.Series(codes).dropna()
+        lengths = subjects["cleaned"].str.len()
+        errors: List[Optional[KeyFormatError]] = [None] * len(keys)
+        for index, code in rejected.items():
+            errors[index] = KeyFormatError(code, int(lengths.iat[index]))
+
+        self.stats["checked"] += len(keys)
+        self.stats["rejected"] += len(rejected)
+        self.stats["time"] += time.perf_counter() - started
+        for code, count in rejected.value_counts().items():
+            self.reasons[code] = self.reasons.get(code, 0) + int(count)
+
+        if len(rejected):
+            self.logger.info(f"Pre-filter rejected {len(rejected)} of {len(keys)} keys without browser checks")
+        return errors
+
+    def reject_reason(self, key: str) -> Optional[KeyFormatError]:
+        return self.validate([key])[0]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "checked": self.stats["checked"],
+            "rejected": self.stats["rejected"],
+            "browser_checks_saved": self.stats["rejected"],
+            "time": round(self.stats["time"], 4),
+            "reasons": dict(self.reasons)
+        }
@@ -0,0 +1,393 @@
+import logging
+import time
+from enum import Enum
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+from playwright.async_api import Page, TimeoutError
+
+from models.account import MicrosoftAccount
+from services.selector_stats import SelectorStats
+from utils.browser_utils import Deadline
+from config import config
+
+
+class LoginScreen(str, Enum):
+    EMAIL = "email"
+    PASSWORD = "password"
+    STAY_SIGNED_IN = "stay_signed_in"
+    POST_SRF = "post_srf"
+    PROTECT_ACCOUNT = "protect_account"
+    TWO_FACTOR = "two_factor"
+    ERROR = "error"
+    SIGNED_IN = "signed_in"
+    UNKNOWN = "unknown"
+
+
+DETECTION_SPEC = {
+    "signedInHosts": ["account.microsoft.com"],
+    "errorSelectors": [
+        "#usernameError",
+        "#passwordError",
+        "#IDErrorInput",
+        "#idTD_Error",
+        "#idA_IL_Error",
+        ".alert-error",
+        ".ext-error",
+        ".login-error",
+        "[role='alert']"
+    ],
+    "errorPhrases": [
+        "incorrect password", "неверный пароль",
+        "account doesn't exist", "аккаунт не существует",
+        "account has been locked", "аккаунт заблокирован",
+        "suspicious activity", "подозрительная активность"
+    ],
+    "twoFactorSelectors": [
+        "input[name='otc']",
+        ".proofDiv",
+        "#idDiv_SAOTCAS_Title",
+        "#idDiv_SAOTCC_Title"
+    ],
+    "protectSelectors": [
+        "#iSelectProofTitle",
+        "#iProofList",
+        "#iShowSkip"
+    ],
+    "protectPhrases": [
+        "help us protect your account",
+        "помогите нам защитить",
+        "break free from your passwords"
+    ],
+    "staySignedInSelectors": [
+        "#KmsiCheckboxField",
+        "#KmsiDescription",
+        "[data-testid='kmsiVideo']"
+    ],
+    "staySignedInPhrases": [
+        "stay signed in?",
+        "не выходить из системы?"
+    ]
+}
+
+DETECT_SCRIPT = """
+(spec) => {
+    const visible = (element) => !!element && !!(element.offsetWidth || element.offsetHeight || element.getClientRects().length);
+    const first = (selectors) => {
+        for (const selector of selectors) {
+            let element = null;
+            try {
+                element = document.querySelector(selector);
+            } catch (e) {
+                continue;
+            }
+            if (visible(element)) {
+                return element;
+            }
+        }
+        return null;
+    };
+    const text = document.body ? document.body.innerText.toLowerCase() : '';
+    const phrase = (phrases) => phrases.find((item) => text.includes(item));
+    const url = location.href;
+
+    if (spec.signedInHosts.includes(location.hostname)) {
+        return {screen: 'signed_in', url};
+    }
+
+    const error = first(spec.errorSelectors);
+    if (error && error.textContent.trim()) {
+        return {screen: 'error', url, text: error.textContent.trim().slice(0, 300)};
+    }
+
+    const errorPhrase = phrase(spec.errorPhrases);
+    if (errorPhrase) {
+        return {screen: 'error', url, text: errorPhrase};
+    }
+
+    if (first(spec.twoFactorSelectors)) {
+        return {screen: 'two_factor', url};
+    }
+
+    if (first(spec.protectSelectors) || phrase(spec.protectPhrases)) {
+        return {screen: 'protect_account', url};
+    }
+
+    if (first(spec.staySignedInSelectors) || phrase(spec.staySignedInPhrases)) {
+        return {screen: 'stay_signed_in', url};
+    }
+
+    if (first(['input[type="password"]'])) {
+        return {screen: 'password', url};
+    }
+
+    if (first(['input[type="email"]'])) {
+        return {screen: 'email', url};
+    }
+
+    if (url.includes('ppsecure/post.srf')) {
+        return {screen: 'post_srf', url};
+    }
+
+    return {screen: 'unknown', url};
+}
+"""
+
+WAIT_SCRIPT = f"""
+(args) => {{
+    const state = ({DETECT_SCRIPT})(args.spec);
+    return state.screen !== args.screen || state.url !== args.url;
+}}
+"""
+
+NEXT_BUTTON_SELECTORS = [
+    'button[data-testid="primaryButton"]',
+    'input[id="idSIButton9"]',
+    'button:has-text("Далее")',
+    'button:has-text("Next")'
+]
+
+SIGNIN_BUTTON_SELECTORS = [
+    'button[data-testid="primaryButton"]',
+    'input[id="idSIButton9"]',
+    'button:has-text("Войти")',
+    'button:has-text("Sign in")'
+]
+
+SUBMIT_FALLBACK_SELECTORS = [
+    'button[type="submit"]',
+    'input[type="submit"]'
+]
+
+STAY_SIGNED_IN_NO_SELECTORS = [
+    'button[data-testid="secondaryButton"]',
+    'input[id="idBtn_Back"]',
+    'input[value="Нет"]',
+    'input[value="No"]',
+    'button:has-text("Нет")',
+    'button:has-text("No")'
+]
+
+POST_SRF_CONTINUE_SELECTORS = [
+    'input[id="idSIButton9"]',
+    'button[data-testid="primaryButton"]'
+]
+
+PROTECT_SKIP_SELECTORS = [
+    '#iShowSkip',
+    '#iCancel',
+    'input[value="Skip"]',
+    'a:has-text("Skip for now")',
+    'a:has-text("Пропустить")',
+    'a:has-text("Not now")',
+    'button:has-text("Not now")',
+    'a:has-text("Не сейчас")',
+    'button:has-text("Не сейчас")'
+]
+
+BLOCKED_KEYWORDS = ["blocked", "suspicious", "unusual", "locked", "безопасность", "заблокирован", "подозрительн"]
+
+
+class LoginTimingStats:
+    def __init__(self):
+        self.screens: Dict[str, Dict[str, float]] = {}
+        self.logins = {"succeeded": 0, "failed": 0}
+
+    def record(self, timings: List[Dict[str, Any]], success: bool):
+        self.logins["succeeded" if success else "failed"] += 1
+
+        for timing in timings:
+            entry = self.screens.setdefault(timing["screen"], {"count": 0, "total_time": 0.0, "max_time": 0.0})
+            entry["count"] += 1
+            entry["total_time"] += timing["duration"]
+            entry["max_time"] = max(entry["max_time"], timing["duration"])
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            **self.logins,
+            "screens": {
+                screen: {
+                    "count": entry["count"],
+                    "total_time": round(entry["total_time"], 3),
+                    "avg_time": round(entry["total_time"] / entry["count"], 3) if entry["count"] else 0.0,
+                    "max_time": round(entry["max_time"], 3)
+                }
+                for screen, entry in self.screens.items()
+            }
+        }
+
+
+login_timing_stats = LoginTimingStats()
+
+
+class LoginStateMachine:
+    def __init__(
+        self,
+        page: Page,
+        account: MicrosoftAccount,
+        selector_stats: SelectorStats,
+        heartbeat: Optional[Callable[[str], None]] = None,
+        timeout: Optional[int] = None,
+        step_timeout: int = 15000,
+        max_steps: int = 15
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.page = page
+        self.account = account
+        self.selector_stats = selector_stats
+        self.heartbeat = heartbeat
+        self.timeout = timeout or config.microsoft_account.login_timeout * 1000
+        self.step_timeout = step_timeout
+        self.max_steps = max_steps
+        self.visits: Dict[str, int] = {}
+        self.timings: List[Dict[str, Any]] = []
+        self.transitions: Dict[LoginScreen, Callable[[Dict[str, Any]], Awaitable[bool]]] = {
+            LoginScreen.EMAIL: self._submit_email,
+            LoginScreen.PASSWORD: self._submit_password,
+            LoginScreen.STAY_SIGNED_IN: self._decline_stay_signed_in,
+            LoginScreen.POST_SRF: self._continue_post_srf,
+            LoginScreen.PROTECT_ACCOUNT: self._skip_protect_account,
+            LoginScreen.UNKNOWN: self._wait_on_unknown
+        }
+
+    async def run(self) -> bool:
+        deadline = Deadline(self.timeout)
+        state = await self.detect()
+        success = False
+
+        for _ in range(self.max_steps):
+            screen = LoginScreen(state["screen"])
+            entered_at = time.monotonic()
+            self.visits[screen] = self.visits.get(screen, 0) + 1
+            if self.heartbeat:
+                self.heartbeat("login")
+
+            self.logger.info(f"Login screen: {screen.value} ({state['url']})")
+
+            if screen == LoginScreen.SIGNED_IN:
+                success = True
+                self._record(screen, entered_at)
+                break
+
+            if screen in [LoginScreen.ERROR, LoginScreen.TWO_FACTOR]:
+                self._fail(screen, state)
+                self._record(screen, entered_at)
+                break
+
+            if deadline.expired or not await self.transitions[screen](state):
+                self._record(screen, entered_at)
+                break
+
+            state = await self._wait_for_next_state(state, deadline)
+            self._record(screen, entered_at)
+        else:
+            self.account.mark_error(f"Login did not finish after {self.max_steps} steps")
+
+        if not success and deadline.expired:
+            self.account.mark_error(f"Login timed out on screen {state['screen']}")
+
+        login_timing_stats.record(self.timings, success)
+        self.logger.info("Login timings: " + ", ".join(
+            f"{timing['screen']}={timing['duration']:.2f}s" for timing in self.timings
+        ))
+        return success
+
+    async def detect(self) -> Dict[str, Any]:
+        for _ in range(2):
+            try:
+                return await self.page.evaluate(DETECT_SCRIPT, DETECTION_SPEC)
+            except Exception as e:
+                self.logger.debug(f"Login screen detection failed, waiting for page load: {str(e)}")
+                try:
+                    await self.page.wait_for_load_state("domcontentloaded", timeout=self.step_timeout)
+                except Exception:
+                    pass
+
+        return {"screen": LoginScreen.UNKNOWN.value, "url": self.page.url}
+
+    async def _wait_for_next_state(self, state: Dict[str, Any], deadline: Deadline) -> Dict[str, Any]:
+        timeout = max(min(deadline.remaining(), self.step_timeout), 1)
+
+        try:
+            await self.page.wait_for_function(
+                WAIT_SCRIPT,
+                arg={"spec": DETECTION_SPEC, "screen": state["screen"], "url": state["url"]},
+                timeout=timeout
+            )
+        except TimeoutError:
+            self.logger.debug(f"Login screen {state['screen']} did not change within {timeout}ms")
+        except Exception as e:
+            self.logger.debug(f"Navigation while waiting for next login screen: {str(e)}")
+
+        return await self.detect()
+
+    def _record(self, screen: LoginScreen, entered_at: float):
+        self.timings.append({"screen": screen.value, "duration": time.monotonic() - entered_at})
+
+    def _fail(self, screen: LoginScreen, state: Dict[str, Any]):
+        if screen == LoginScreen.TWO_FACTOR:
+            error_msg = "Two-factor authentication required but not supported"
+        else:
+            error_msg = state.get("text") or "Login error"
+
+        self.logger.error(f"Login failed for {self.account.email}: {error_msg}")
+        self.account.mark_error(error_msg)
+
+        if any(keyword in error_msg.lower() for keyword in BLOCKED_KEYWORDS):
+            self.account.mark_blocked(error_msg)
+
+    async def _click(self, page_type: str, selectors: List[str], fallbacks: Optional[List[str]] = None) -> bool:
+        match = await self.selector_stats.find(page_type, [self.page], selectors, fallbacks)
+        if not match:
+            return False
+
+        _, selector, element = match
+        try:
+            await element.click(force=True)
+        except Exception as e:
+            self.logger.debug(f"Error clicking {selector}, retrying via JavaScript: {str(e)}")
+            try:
+                await element.evaluate("element => element.click()")
+            except Exception as js_error:
+                self.logger.error(f"Error with JavaScript click on {selector}: {str(js_error)}")
+                return False
+
+        self.logger.info(f"Clicked {page_type} element: {selector}")
+        return True
+
+    async def _submit_email(self, state: Dict[str, Any]) -> bool:
+        await self.page.fill('input[type="email"]', self.account.email)
+        if not await self._click("login_next", NEXT_BUTTON_SELECTORS, SUBMIT_FALLBACK_SELECTORS):
+            await self.page.press('input[type="email"]', 'Enter')
+        return True
+
+    async def _submit_password(self, state: Dict[str, Any]) -> bool:
+        if self.visits[LoginScreen.PASSWORD] > 2:
+            self.account.mark_error("Password was not accepted")
+            return False
+
+        await self.page.fill('input[type="password"]', self.account.password)
+        if not await self._click("login_signin", SIGNIN_BUTTON_SELECTORS, SUBMIT_FALLBACK_SELECTORS):
+            await self.page.press('input[type="password"]', 'Enter')
+        return True
+
+    async def _decline_stay_signed_in(self, state: Dict[str, Any]) -> bool:
+        return await self._click("login_stay_signed_in", STAY_SIGNED_IN_NO_SELECTORS)
+
+    async def _continue_post_srf(self, state: Dict[str, Any]) -> bool:
+        if self.visits[LoginScreen.POST_SRF] > 2:
+            self.logger.info("Still on post.srf, navigating to account page directly")
+            await self.page.goto("https://account.microsoft.com/", timeout=30000)
+            return True
+
+        await self._click("login_post_srf", POST_SRF_CONTINUE_SELECTORS, SUBMIT_FALLBACK_SELECTORS)
+        return True
+
+    async def _skip_protect_account(self, state: Dict[str, Any]) -> bool:
+        if await self._click("login_protect_account", PROTECT_SKIP_SELECTORS):
+            return True
+
+        self.account.mark_error("Account protection check requires manual action")
+        return False
+
+    async def _wait_on_unknown(self, state: Dict[str, Any]) -> bool:
+        return self.visits[LoginScreen.UNKNOWN] <= 3
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any
+
+from config import config, RateLimitConfig
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, burst: int):
+        self.rate = max(per_minute, 0.0) / 60.0
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.stats = {"acquired": 0, "waits": 0, "wait_time": 0.0, "max_wait": 0.0}
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    @property
+    def level(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def delay(self) -> float:
+        if self.unlimited:
+            return 0.0
+
+        self._refill()
+        return max(1 - self.tokens, 0.0) / self.rate
+
+    async def acquire(self) -> float:
+        if self.unlimited:
+            self.stats["acquired"] += 1
+            return 0.0
+
+        async with self.lock:
+            self._refill()
+            waited = 0.0
+            if self.tokens < 1:
+                waited = (1 - self.tokens) / self.rate
+                await asyncio.sleep(waited)
+                self._refill()
+
+            self.tokens = max(self.tokens - 1, 0.0)
+            self.stats["acquired"] += 1
+            if waited:
+                self.stats["waits"] += 1
+                self.stats["wait_time"] += waited
+                self.stats["max_wait"] = max(self.stats["max_wait"], waited)
+            return waited
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "level": round(self.level, 2),
+            "capacity": self.capacity,
+            "per_minute": round(self.rate * 60, 2) if not self.unlimited else None,
+            "acquired": self.stats["acquired"],
+            "waits": self.stats["waits"],
+            "wait_time": round(self.stats["wait_time"], 2),
+            "max_wait": round(self.stats["max_wait"], 2)
+        }
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = self.capacity if self.unlimited else min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class RateLimiter:
+    def __init__(self, profile: Optional[RateLimitConfig] = None):
+        self.logger = logging.getLogger(__name__)
+        self.profile = profile or config.key.rate_limits
+        self.global_bucket = TokenBucket(self.profile.global_per_minute, self.profile.burst)
+        self.account_buckets: Dict[str, TokenBucket] = {}
+        self.region_buckets: Dict[str, TokenBucket] = {}
+
+    async def acquire(self, account_id: str, region: Optional[str] = None) -> float:
+        if not self.profile.enabled:
+            return 0.0
+
+        waited = await self._bucket(self.account_buckets, account_id, self.profile.account_per_minute).acquire()
+        waited += await self.acquire_region(region)
+        waited += await self.global_bucket.acquire()
+
+        if waited:
+            self.logger.debug(f"Rate limited check for account {account_id}, region {region}: waited {waited:.2f}s")
+        return waited
+
+    def delay(self, account_id: str) -> float:
+        if not self.profile.enabled:
+            return 0.0
+
+        account_bucket = self._bucket(self.account_buckets, account_id, self.profile.account_per_minute)
+        return max(account_bucket.delay(), self.global_bucket.delay())
+
+    async def acquire_region(self, region: Optional[str]) -> float:
+        if not self.profile.enabled or not region:
+            return 0.0
+
+        return await self._bucket(self.region_buckets, region.upper(), self.profile.region_per_minute).acquire()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.profile.enabled,
+            "global": self.global_bucket.to_dict(),
+            "accounts": {account_id: bucket.to_dict() for account_id, bucket in self.account_buckets.items()},
+            "regions": {region: bucket.to_dict() for region, bucket in self.region_buckets.items()}
+        }
+
+    def _bucket(self, buckets: Dict[str, TokenBucket], name: str, per_minute: float) -> TokenBucket:
+        if name not in buckets:
+            buckets[name] = TokenBucket(per_minute, self.profile.burst)
+        return buckets[name]
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import re
+from fnmatch import fnmatch
+from typing import Optional, Dict, Any, List, Set
+from urllib.parse import unquote
+
+from playwright.async_api import BrowserContext, Response
+
+from models.key import PRODUCT_KEY_ALPHABET, KEY_GROUP_SIZE, KEY_GROUPS
+from config import config, RedeemResponseConfig
+
+KEY_IN_URL_PATTERN = re.compile(
+    f"(?<![A-Za-z0-9])[{PRODUCT_KEY_ALPHABET}N]{{{KEY_GROUP_SIZE}}}"
+    f"(?:-?[{PRODUCT_KEY_ALPHABET}N]{{{KEY_GROUP_SIZE}}}){{{KEY_GROUPS - 1}}}(?![A-Za-z0-9])"
+)
+
+
+class RedeemResponseListener:
+    def __init__(self, profile: Optional[RedeemResponseConfig] = None):
+        self.logger = logging.getLogger(__name__)
+        self.profile = profile or config.microsoft_account.redeem_responses
+        self.expected_key: Optional[str] = None
+        self.result: Optional[asyncio.Future] = None
+        self.tasks: Set[asyncio.Task] = set()
+        self.stats = {
+            "responses_matched": 0,
+            "results_from_network": 0,
+            "unclassified_responses": 0
+        }
+
+    def attach(self, context: BrowserContext):
+        if not self.profile.enabled:
+            return
+
+        context.on("response", self._on_response)
+
+    def arm(self, key: str):
+        self.expected_key = self._normalize_key(key)
+        self.result = asyncio.get_running_loop().create_future()
+
+    def disarm(self):
+        if self.result and not self.result.done():
+            self.result.cancel()
+        self.result = None
+        self.expected_key = None
+
+    async def wait(self, timeout: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        if not self.profile.enabled or not self.result:
+            return None
+
+        timeout = timeout if timeout is not None else self.profile.wait_timeout
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(self.result), timeout=max(timeout, 1) / 1000)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            return None
+
+    def take_result(self) -> Optional[Dict[str, Any]]:
+        if self.result and self.result.done() and not self.result.cancelled():
+            return self.result.result()
+        return None
+
+    def matches_url(self, url: str) -> bool:
+        return any(fnmatch(url, pattern) for pattern in self.profile.url_patterns)
+
+    def classify(self, status_code: int, payload: Any) -> Optional[Dict[str, Any]]:
+        if isinstance(payload, dict):
+            token_state = payload.get("tokenState") or payload.get("state")
+            if isinstance(token_state, str):
+                status = self.profile.token_states.get(token_state.lower())
+                if status:
+                    return {"status": status, "message": f"tokenState: {token_state}"}
+
+            for code in self._collect_error_codes(payload):
+                status = self.profile.error_codes.get(code.lower())
+                if status:
+                    return {"status": status, "message": f"error code: {code}"}
+
+        if status_code == 429:
+            return {"status": "error", "message": "Redeem backend throttled the request (429)"}
+
+        return None
+
+    def _on_response(self, response: Response):
+        if not self.result or self.result.done():
+            return
+
+        if response.request.resource_type not in ["xhr", "fetch"] or not self.matches_url(response.url):
+            return
+
+        task = asyncio.create_task(self._inspect_response(response))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _inspect_response(self, response: Response):
+        url = response.url
+        if self._mentions_other_key(url):
+            self.logger.debug(f"Ignoring redeem response for another key: {url}")
+            return
+
+        self.stats["responses_matched"] += 1
+
+        try:
+            payload = await response.json()
+        except Exception:
+            payload = None
+
+        classified = self.classify(response.status, payload)
+        if not classified:
+            self.stats["unclassified_responses"] += 1
+            self.logger.info(f"Unclassified redeem response {response.status} from {url}: {str(payload)[:300]}")
+            return
+
+        if self.result and not self.result.done():
+            self.stats["results_from_network"] += 1
+            self.logger.info(f"Redeem result from network response {response.status}: {classified['status']}")
+            self.result.set_result({**classified, "source": "network"})
+
+    def _mentions_other_key(self, url: str) -> bool:
+        if not self.expected_key:
+            return False
+
+        url = unquote(url)
+        if self.expected_key in self._normalize_key(url):
+            return False
+
+        return bool(KEY_IN_URL_PATTERN.search(url))
+
+    @staticmethod
+    def _normalize_key(key: str) -> str:
+        return ''.join(c for c in key if c.isalnum()).upper()
+
+    @classmethod
+    def _collect_error_codes(cls, payload: Any, depth: int = 0) -> List[str]:
+        if depth > 3:
+            return []
+
+        codes = []
+        if isinstance(payload, dict):
+            for name in ["code", "errorCode", "reason", "subCode"]:
+                value = payload.get(name)
+                if isinstance(value, str):
+                    codes.append(value)
+            for name in ["error", "innerError", "details", "errors"]:
+                codes.extend(cls._collect_error_codes(payload.get(name), depth + 1))
+        elif isinstance(payload, list):
+            for item in payload:
+                codes.extend(cls._collect_error_codes(item, depth + 1))
+
+        return codes
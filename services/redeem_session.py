@@ -0,0 +1,106 @@
+import logging
+from typing import Optional, Dict
+
+from models.key import Key
+from models.account import MicrosoftAccount
+from services.browser_pool import BrowserPool
+from services.session_cache import SessionCache
+from services.selector_stats import SelectorStats
+from services.microsoft_auth import MicrosoftAuthenticator
+
+from config import config
+
+
+class RedeemSession:
+    def __init__(
+        self,
+        account: MicrosoftAccount,
+        browser_pool: BrowserPool,
+        session_cache: SessionCache,
+        max_checks: Optional[int] = None,
+        selector_stats: Optional[SelectorStats] = None,
+        proxy: Optional[Dict[str, str]] = None
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.account = account
+        self.session_cache = session_cache
+        self.proxy = proxy
+        self.auth = MicrosoftAuthenticator(browser_pool, selector_stats)
+        self.max_checks = max_checks if max_checks is not None else config.microsoft_account.max_checks_per_account
+        self.checks_done = 0
+        self.cached_state: Optional[Dict] = None
+        self.consecutive_errors = 0
+        self.broken = False
+
+    @property
+    def remaining_checks(self) -> int:
+        return max(self.max_checks - self.checks_done, 0)
+
+    @property
+    def is_usable(self) -> bool:
+        return not self.broken and self.remaining_checks > 0
+
+    async def start_browser(self) -> bool:
+        self.cached_state = self.session_cache.get(self.account.id)
+        return await self.auth.initialize(storage_state=self.cached_state, proxy=self.proxy)
+
+    async def authenticate(self) -> bool:
+        if self.cached_state:
+            if await self.auth.restore_session(self.account):
+                return True
+            self.session_cache.evict(self.account.id, "validation failed")
+
+        if not await self.auth.login(self.account):
+            return False
+
+        storage_state = await self.auth.export_session()
+        if storage_state:
+            self.session_cache.store(self.account.id, storage_state)
+        return True
+
+    async def open_redeem_page(self) -> bool:
+        return await self.auth.navigate_to_redeem_page()
+
+    async def open(self) -> bool:
+        if not await self.start_browser():
+            self.broken = True
+            return False
+
+        if not await self.authenticate() or not await self.open_redeem_page():
+            self.broken = True
+            return False
+
+        self.logger.info(f"Redeem session opened for {self.account.email}, "
+                         f"up to {self.max_checks} checks"
+                         + (f", via proxy {self.proxy['server']}" if self.proxy else ""))
+        return True
+
+    async def check_key(self, key: Key) -> dict:
+        self.checks_done += 1
+        check_result = await self.auth.check_key(key.formatted_key)
+
+        if check_result["status"] == "error":
+            self.consecutive_errors += 1
+        else:
+            self.consecutive_errors = 0
+
+        if not self.auth.current_account or self.consecutive_errors >= 2:
+            self.logger.warning(f"Redeem session for {self.account.email} is in an unrecoverable state")
+            self.broken = True
+
+        return check_result
+
+    def network_stats(self) -> dict:
+        return self.auth.request_blocker.checkpoint()
+
+    async def close(self):
+        if self.broken:
+            self.session_cache.evict(self.account.id, "session broken")
+
+        if config.microsoft_account.cleanup_mode == "remote_logout" and not self.broken and not self.session_cache.enabled:
+            await self.auth.logout()
+        else:
+            await self.auth.discard_session()
+
+        await self.auth.close()
+        self.auth.selector_stats.flush()
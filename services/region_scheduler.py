@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple, Callable, Deque
+
+from models.key import Key
+from services.vpn_manager import VPNManager
+from config import config
+
+
+class RegionScheduler:
+    def __init__(
+        self,
+        vpn_manager: VPNManager,
+        items: List[Tuple[Key, Optional[str]]],
+        on_unreachable: Callable[[Key, Optional[str], str], None],
+        provider: Optional[str] = None,
+        proxies: Optional[Dict[str, Dict[str, str]]] = None,
+        streaming: bool = False,
+        allow_vpn: bool = True
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.vpn_manager = vpn_manager
+        self.on_unreachable = on_unreachable
+        self.provider = provider or config.vpn.default_provider
+        self.vpn_enabled = config.vpn.enabled
+        self.proxies = proxies if proxies is not None else vpn_manager.get_region_proxies()
+        self.allow_vpn = allow_vpn
+        self.closed = not streaming
+        self.groups: Dict[Optional[str], Deque[Tuple[Key, Optional[str]]]] = {}
+        for key, region in self._reachable(items):
+            self.groups.setdefault(self._phase(region), deque()).append((key, region))
+
+        self.phases: List[Optional[str]] = []
+        self.current: Deque[Tuple[Key, Optional[str]]] = deque()
+        self.current_region: Optional[str] = None
+        self.connected_region: Optional[str] = None
+        self.in_flight = 0
+        self.condition = asyncio.Condition()
+        self.stats = {
+            "regions": [],
+            "region_switches": 0,
+            "vpn_transition_time": 0.0,
+            "failed_regions": [],
+            "proxied_regions": sorted({self.route(region) for _, region in items if self.route(region)})
+        }
+
+    @property
+    def empty(self) -> bool:
+        return not self.current and not self.phases
+
+    @property
+    def finished(self) -> bool:
+        return self.empty and self.closed
+
+    async def plan(self):
+        connected_region = await self.vpn_manager.get_current_region() if self.vpn_enabled else None
+        regions = [region for region in self.groups if region is not None]
+        regions.sort(key=lambda region: (region != connected_region, -len(self.groups[region]), region))
+
+        self.connected_region = connected_region
+        self.phases = regions
+        self.stats["regions"] = [{"region": region, "keys": len(self.groups[region])} for region in regions]
+
+        unbound = self.groups.pop(None, deque())
+        if regions:
+            self.groups[regions[0]].extendleft(reversed(unbound))
+        elif unbound:
+            self.phases = [None]
+            self.groups[None] = unbound
+
+        self.logger.info(f"Region schedule: {self.phases or 'empty'}, "
+                         f"{len(unbound)} keys without VPN region run in the first phase, "
+                         f"proxied regions: {self.stats['proxied_regions']}")
+
+    def route(self, region: Optional[str]) -> Optional[str]:
+        if region and region.upper() in self.proxies:
+            return region.upper()
+        return None
+
+    def proxy_for(self, route: Optional[str]) -> Optional[Dict[str, str]]:
+        return self.proxies.get(route) if route else None
+
+    async def next(self, prefer: Optional[str] = None) -> Optional[Tuple[Key, Optional[str]]]:
+        async with self.condition:
+            while True:
+                if self.current:
+                    self.in_flight += 1
+                    for item in self.current:
+                        if self.route(item[1]) == prefer:
+                            self.current.remove(item)
+                            return item
+                    return self.current.popleft()
+
+                if not self.phases:
+                    if self.closed:
+                        return None
+                    await self.condition.wait()
+                    continue
+
+                if self.in_flight > 0:
+                    await self.condition.wait()
+                    continue
+
+                await self._advance()
+
+    async def done(self):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    async def requeue(self, key: Key, region: Optional[str]):
+        async with self.condition:
+            self.current.append((key, region))
+            self.condition.notify_all()
+
+    async def add(self, items: List[Tuple[Key, Optional[str]]]):
+        async with self.condition:
+            for key, region in self._reachable(items):
+                phase = self._phase(region)
+                if phase is None or (phase == self.current_region and phase == self.connected_region):
+                    self.current.append((key, region))
+                    continue
+
+                if phase not in self.groups:
+                    self.groups[phase] = deque()
+                    self.phases.append(phase)
+                    self.stats["regions"].append({"region": phase, "keys": 0})
+                self.groups[phase].append((key, region))
+                for planned in reversed(self.stats["regions"]):
+                    if planned["region"] == phase:
+                        planned["keys"] += 1
+                        break
+
+                route = self.route(region)
+                if route and route not in self.stats["proxied_regions"]:
+                    self.stats["proxied_regions"].append(route)
+            self.condition.notify_all()
+
+    async def wait_for_work(self):
+        async with self.condition:
+            while self.empty and not self.closed:
+                await self.condition.wait()
+
+    async def close(self):
+        async with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    async def finish(self):
+        if self.connected_region is not None and self.stats["region_switches"]:
+            started = time.monotonic()
+            await self.vpn_manager.disconnect()
+            self.stats["vpn_transition_time"] += time.monotonic() - started
+            self.connected_region = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {**self.stats, "vpn_transition_time": round(self.stats["vpn_transition_time"], 2)}
+
+    def _phase(self, region: Optional[str]) -> Optional[str]:
+        return region if self.vpn_enabled and not self.route(region) else None
+
+    def _reachable(self, items: List[Tuple[Key, Optional[str]]]) -> List[Tuple[Key, Optional[str]]]:
+        if self.allow_vpn:
+            return items
+
+        reachable = []
+        for key, region in items:
+            if self._phase(region) is None:
+                reachable.append((key, region))
+            else:
+                self.on_unreachable(key, region, f"Region {region} has no proxy and VPN switching is disabled for this worker")
+        return reachable
+
+    async def _advance(self):
+        region = self.phases.pop(0)
+        group = self.groups.pop(region)
+        self.current_region = region
+
+        if region is not None and region != self.connected_region:
+            self.logger.info(f"Switching VPN to region {region} for {len(group)} keys")
+            started = time.monotonic()
+            connected = await self.vpn_manager.connect(self.provider, region)
+            self.stats["vpn_transition_time"] += time.monotonic() - started
+            self.stats["region_switches"] += 1
+
+            if not connected:
+                self.connected_region = None
+                self.stats["failed_regions"].append(region)
+                remaining = deque()
+                for key, key_region in group:
+                    if key_region == region:
+                        self.on_unreachable(key, key_region, f"Failed to connect to VPN region: {region}")
+                    else:
+                        remaining.append((key, key_region))
+                self.current = remaining
+                return
+
+            self.connected_region = region
+
+        self.current = group
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+from typing import Optional, Dict, Any, List
+
+import httpx
+
+from models.key import Key, KeyCheckResult
+from services.job_store import JobStore
+from config import config
+
+
+class LocalJobQueue:
+    def __init__(self, job_store: Optional[JobStore] = None):
+        self.job_store = job_store or JobStore()
+
+    @property
+    def enabled(self) -> bool:
+        return self.job_store.enabled
+
+    async def accepts_workers(self) -> Optional[bool]:
+        return self.job_store.accepts_workers()
+
+    async def claim(self, worker: str, limit: int, lease: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self.job_store.claim(worker, limit, lease)
+
+    async def complete(self, job_id: int, worker: str, result: KeyCheckResult) -> Dict[str, List[int]]:
+        if self.job_store.complete(job_id, worker, result):
+            return {"accepted": [job_id], "dropped": []}
+        return {"accepted": [], "dropped": [job_id]}
+
+    async def flush(self, worker: str) -> Dict[str, List[int]]:
+        return {"accepted": [], "dropped": []}
+
+    async def extend_leases(self, worker: str, lease: Optional[float] = None) -> int:
+        return self.job_store.extend_leases(worker, lease)
+
+    async def release(self, worker: str, job_ids: Optional[List[int]] = None) -> int:
+        return self.job_store.release(worker, job_ids)
+
+    async def close(self):
+        self.job_store.close()
+
+
+class RemoteJobQueue:
+    def __init__(self, coordinator_url: str, token: Optional[str] = None, timeout: float = 30.0):
+        self.logger = logging.getLogger(__name__)
+        self.base_url = coordinator_url.rstrip("/") + "/api/workers"
+        token = token or config.key.job_queue.worker_token
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            headers={"X-Worker-Token": token} if token else {}
+        )
+        self.unreported: Dict[int, Dict[str, Any]] = {}
+        self.flush_lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    async def accepts_workers(self) -> Optional[bool]:
+        response = await self._request("GET", "/mode")
+        return response["external_workers"] if response else None
+
+    async def claim(self, worker: str, limit: int, lease: Optional[float] = None) -> List[Dict[str, Any]]:
+        if limit <= 0:
+            return []
+
+        response = await self._request("POST", "/lease", {"worker": worker, "limit": limit, "lease_seconds": lease})
+        if response is None:
+            return []
+
+        return [
+            {**job, "key": Key(**job["key"])}
+            for job in response["jobs"]
+        ]
+
+    async def complete(self, job_id: int, worker: str, result: KeyCheckResult) -> Dict[str, List[int]]:
+        self.unreported[job_id] = {"id": job_id, "result": json.loads(result.json())}
+        return await self.flush(worker)
+
+    async def flush(self, worker: str) -> Dict[str, List[int]]:
+        async with self.flush_lock:
+            if not self.unreported:
+                return {"accepted": [], "dropped": []}
+
+            results = list(self.unreported.values())
+            response = await self._request("POST", "/results", {"worker": worker, "results": results})
+            if response is None:
+                self.logger.warning(f"{len(results)} results are waiting to be reported to {self.base_url}")
+                return {"accepted": [], "dropped": []}
+
+            for item in results:
+                self.unreported.pop(item["id"], None)
+            return {"accepted": response["accepted"], "dropped": response["dropped"]}
+
+    async def extend_leases(self, worker: str, lease: Optional[float] = None) -> int:
+        response = await self._request("POST", "/heartbeat", {"worker": worker})
+        return response["extended"] if response else 0
+
+    async def release(self, worker: str, job_ids: Optional[List[int]] = None) -> int:
+        response = await self._request("POST", "/release", {"worker": worker})
+        return response["released"] if response else 0
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            response = await self.client.request(method, path, json=payload)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self.logger.error(f"Request to {self.base_url}{path} failed, will retry on the next tick: {str(e)}")
+            return None
+        return response.json()
@@ -0,0 +1,75 @@
+import logging
+from fnmatch import fnmatch
+from typing import Optional, Dict, Any, List
+from urllib.parse import urlparse
+
+from playwright.async_api import BrowserContext, Route
+
+from config import config, ResourceBlockingConfig
+
+
+class RequestBlocker:
+    def __init__(self, profile: Optional[ResourceBlockingConfig] = None):
+        self.logger = logging.getLogger(__name__)
+        self.profile = profile or config.browser.blocking
+        self.stats = self._empty_stats()
+        self.last_checkpoint = {"requests_total": 0, "requests_blocked": 0, "bytes_saved": 0}
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        return {
+            "requests_total": 0,
+            "requests_blocked": 0,
+            "bytes_saved": 0,
+            "blocked_by_type": {},
+            "blocked_by_host": {}
+        }
+
+    async def attach(self, context: BrowserContext):
+        if not self.profile.enabled:
+            return
+
+        await context.route("**/*", self._handle_route)
+
+    def checkpoint(self) -> Dict[str, int]:
+        delta = {name: self.stats[name] - value for name, value in self.last_checkpoint.items()}
+        self.last_checkpoint = {name: self.stats[name] for name in self.last_checkpoint}
+        return delta
+
+    def should_block(self, resource_type: str, host: str) -> bool:
+        if self._match_host(host, self.profile.allowed_hosts):
+            return False
+
+        if self._match_host(host, self.profile.blocked_hosts):
+            return True
+
+        if resource_type == "document":
+            return False
+
+        if self.profile.allowed_resource_types and resource_type not in self.profile.allowed_resource_types:
+            return True
+
+        return resource_type in self.profile.blocked_resource_types
+
+    async def _handle_route(self, route: Route):
+        request = route.request
+        host = urlparse(request.url).hostname or ""
+        self.stats["requests_total"] += 1
+
+        if not self.should_block(request.resource_type, host):
+            await route.continue_()
+            return
+
+        self.stats["requests_blocked"] += 1
+        self.stats["bytes_saved"] += self.profile.estimated_bytes.get(request.resource_type, 0)
+        self.stats["blocked_by_type"][request.resource_type] = self.stats["blocked_by_type"].get(request.resource_type, 0) + 1
+        self.stats["blocked_by_host"][host] = self.stats["blocked_by_host"].get(host, 0) + 1
+
+        try:
+            await route.abort("blockedbyclient")
+        except Exception as e:
+            self.logger.debug(f"Error aborting request {request.url}: {str(e)}")
+
+    @staticmethod
+    def _match_host(host: str, patterns: List[str]) -> bool:
+        return any(fnmatch(host, pattern) or host == pattern.lstrip("*.") for pattern in patterns)
@@ -0,0 +1,151 @@
+import json
+import logging
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from models.key import Key, KeyCheckResult, KeyStatus
+from config import config, DATA_DIR, ResultCacheConfig
+
+CACHEABLE_STATUSES = {KeyStatus.VALID, KeyStatus.USED, KeyStatus.INVALID, KeyStatus.REGION_ERROR}
+
+
+class ResultCache:
+    def __init__(self, path: Optional[Path] = None, profile: Optional[ResultCacheConfig] = None):
+        self.logger = logging.getLogger(__name__)
+        self.profile = profile or config.key.result_cache
+        self.path = Path(path or DATA_DIR / self.profile.filename)
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stored": 0,
+            "evicted_expired": 0,
+            "evicted_lru": 0
+        }
+        self.connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.profile.enabled
+
+    @staticmethod
+    def key_for(key: Key, region: Optional[str] = None) -> str:
+        return f"{key.formatted_key.upper()}|{(region or '').upper()}"
+
+    def get(self, key: Key, region: Optional[str] = None) -> Optional[KeyCheckResult]:
+        if not self.enabled:
+            return None
+
+        cache_key = self.key_for(key, region)
+        now = time.time()
+        row = self._db().execute(
+            "SELECT payload, expires_at FROM results WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+
+        if not row:
+            self.stats["misses"] += 1
+            return None
+
+        payload, expires_at = row
+        if expires_at <= now:
+            self._db().execute("DELETE FROM results WHERE cache_key = ?", (cache_key,))
+            self._db().commit()
+            self.stats["evicted_expired"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        self._db().execute("UPDATE results SET last_used_at = ? WHERE cache_key = ?", (now, cache_key))
+        self._db().commit()
+        self.stats["hits"] += 1
+
+        data = json.loads(payload)
+        return KeyCheckResult(
+            key=key,
+            status=KeyStatus(data["status"]),
+            error_message=data.get("error_message"),
+            check_time=datetime.fromisoformat(data["check_time"]),
+            account_used=data.get("account_used"),
+            region_used=data.get("region_used"),
+            is_global=data.get("is_global", False),
+            from_cache=True
+        )
+
+    def store(self, result: KeyCheckResult, region: Optional[str] = None):
+        if not self.enabled or result.from_cache or result.status not in CACHEABLE_STATUSES:
+            return
+
+        ttl = self.profile.ttl.get(result.status.value, 0)
+        if ttl <= 0:
+            return
+
+        now = time.time()
+        payload = json.dumps({
+            "status": result.status.value,
+            "error_message": result.error_message,
+            "check_time": result.check_time.isoformat(),
+            "account_used": result.account_used,
+            "region_used": result.region_used,
+            "is_global": result.is_global
+        })
+        self._db().execute(
+            "INSERT OR REPLACE INTO results (cache_key, status, payload, expires_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+            (self.key_for(result.key, region), result.status.value, payload, now + ttl, now)
+        )
+        self.stats["stored"] += 1
+        self._evict(now)
+        self._db().commit()
+
+    def clear(self):
+        self._db().execute("DELETE FROM results")
+        self._db().commit()
+        self.logger.info("Cleared key result cache")
+
+    def close(self):
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        entries = self._db().execute("SELECT status, COUNT(*) FROM results GROUP BY status").fetchall()
+
+        return {
+            "enabled": self.enabled,
+            "path": str(self.path),
+            "max_entries": self.profile.max_entries,
+            "ttl": self.profile.ttl,
+            "entries": {status: count for status, count in entries},
+            "hit_ratio": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            **self.stats
+        }
+
+    def _evict(self, now: float):
+        expired = self._db().execute("DELETE FROM results WHERE expires_at <= ?", (now,)).rowcount
+        self.stats["evicted_expired"] += expired
+
+        count = self._db().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        overflow = count - self.profile.max_entries
+        if overflow > 0:
+            self._db().execute(
+                "DELETE FROM results WHERE cache_key IN "
+                "(SELECT cache_key FROM results ORDER BY last_used_at LIMIT ?)",
+                (overflow,)
+            )
+            self.stats["evicted_lru"] += overflow
+            self.logger.debug(f"Evicted {overflow} least recently used key results")
+
+    def _db(self) -> sqlite3.Connection:
+        if self.connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.connection = sqlite3.connect(str(self.path), timeout=30)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "cache_key TEXT PRIMARY KEY, status TEXT NOT NULL, payload TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+            )
+            self.connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used_at)")
+            self.connection.commit()
+        return self.connection
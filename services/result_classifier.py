@@ -0,0 +1,160 @@
+import json
+import logging
+import os
+import re
+import time
+from typing import Optional, Dict, Any, List, Tuple
+
+from config import DATA_DIR
+
+STATUS_PRIORITY = ["disabled", "used", "region_error", "invalid", "success"]
+
+STATUS_MESSAGES = {
+    "success": "Ключ активирован успешно",
+    "disabled": "Ключ отключен",
+    "used": "Ключ уже использован",
+    "region_error": "Ключ недоступен в регионе",
+    "invalid": "Недействительный ключ"
+}
+
+
+def _phrase_pattern(phrase: str) -> str:
+    if phrase.endswith("*"):
+        return re.escape(phrase[:-1]) + r"\w*"
+    return re.escape(phrase)
+
+
+class ResultClassifier:
+    def __init__(self, phrases_file: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.phrases_file = phrases_file or os.path.join(DATA_DIR, "result_phrases.json")
+        self.phrases: Dict[str, Dict[str, List[str]]] = {}
+        self.lookup: Dict[str, Tuple[str, str]] = {}
+        self.stem_lookup: List[Tuple[str, str, str]] = []
+        self.pattern: Optional[re.Pattern] = None
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.phrases_file, "r", encoding="utf-8") as f:
+                self.phrases = json.load(f)
+        except Exception as e:
+            self.logger.error(f"Error loading result phrases: {str(e)}")
+            self.phrases = {}
+
+        self.compile()
+
+    def compile(self):
+        self.lookup = {}
+        self.stem_lookup = []
+        alternatives = []
+
+        for language, statuses in self.phrases.items():
+            for status, phrases in statuses.items():
+                if status not in STATUS_PRIORITY:
+                    self.logger.warning(f"Unknown result status {status} in phrases for {language}")
+                    continue
+
+                for phrase in phrases:
+                    phrase = phrase.lower()
+                    if phrase.endswith("*"):
+                        self.stem_lookup.append((phrase[:-1], status, language))
+                    else:
+                        self.lookup.setdefault(phrase, (status, language))
+                    alternatives.append(phrase)
+
+        if not alternatives:
+            self.pattern = None
+            return
+
+        alternatives.sort(key=len, reverse=True)
+        self.pattern = re.compile(
+            r"(?<!\w)(?:" + "|".join(_phrase_pattern(phrase) for phrase in alternatives) + r")(?!\w)",
+            re.IGNORECASE
+        )
+        self.logger.info(f"Compiled {len(alternatives)} result phrases for {len(self.phrases)} languages")
+
+    def classify(self, text: Optional[str]) -> Optional[Dict[str, str]]:
+        if not text or not self.pattern:
+            return None
+
+        best: Optional[Dict[str, str]] = None
+        for match in self.pattern.finditer(text):
+            phrase = match.group(0).lower()
+            found = self._resolve(phrase)
+            if not found:
+                continue
+
+            status, language = found
+            if not best or STATUS_PRIORITY.index(status) < STATUS_PRIORITY.index(best["status"]):
+                best = {"status": status, "phrase": match.group(0), "language": language}
+                if status == STATUS_PRIORITY[0]:
+                    break
+
+        return best
+
+    def to_result(self, match: Dict[str, str], message: Optional[str] = None) -> Dict[str, str]:
+        return {
+            "status": match["status"],
+            "message": message or STATUS_MESSAGES[match["status"]],
+            "matched_phrase": match["phrase"],
+            "language": match["language"]
+        }
+
+    def _resolve(self, phrase: str) -> Optional[Tuple[str, str]]:
+        if phrase in self.lookup:
+            return self.lookup[phrase]
+
+        for stem, status, language in self.stem_lookup:
+            if phrase.startswith(stem):
+                return status, language
+        return None
+
+
+def _substring_chain(text: str) -> str:
+    text_lower = text.lower()
+    if "активировано" in text_lower or "activated" in text_lower or "success" in text_lower or "успех" in text_lower:
+        return "success"
+    elif "отключен" in text_lower or "disabled" in text_lower:
+        return "disabled"
+    elif "использован" in text_lower or "used" in text_lower:
+        return "used"
+    elif "недействителен" in text_lower or "invalid" in text_lower:
+        return "invalid"
+    return "unknown"
+
+
+def benchmark(classifier: ResultClassifier, corpus_file: Optional[str] = None, iterations: int = 1000) -> Dict[str, Any]:
+    corpus_file = corpus_file or os.path.join(DATA_DIR, "result_corpus.json")
+    with open(corpus_file, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    report = {"samples": len(corpus), "iterations": iterations, "methods": {}}
+    methods = {
+        "compiled_matcher": lambda text: (classifier.classify(text) or {"status": "unknown"})["status"],
+        "substring_chain": _substring_chain
+    }
+
+    for name, method in methods.items():
+        mismatches = []
+        for sample in corpus:
+            status = method(sample["text"])
+            if status != sample["expected"]:
+                mismatches.append({"text": sample["text"][:80], "expected": sample["expected"], "got": status})
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for sample in corpus:
+                method(sample["text"])
+        elapsed = time.perf_counter() - started
+
+        report["methods"][name] = {
+            "accuracy": round(1 - len(mismatches) / len(corpus), 3) if corpus else 0.0,
+            "us_per_text": round(elapsed / (iterations * len(corpus)) * 1e6, 2) if corpus else 0.0,
+            "mismatches": mismatches
+        }
+
+    return report
+
+
+result_classifier = ResultClassifier()
@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import time
+from typing import Optional, Dict, Any, List, Tuple, Union
+from urllib.parse import urlparse
+
+from playwright.async_api import Page, Frame, ElementHandle
+
+from config import DATA_DIR
+
+
+class SelectorStats:
+    def __init__(self, stats_file: Optional[str] = None, save_interval: float = 30.0):
+        self.logger = logging.getLogger(__name__)
+        self.stats_file = stats_file or os.path.join(DATA_DIR, "selector_stats.json")
+        self.save_interval = save_interval
+        self.stats: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.dirty = False
+        self.last_saved = 0.0
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.stats_file):
+            return
+
+        try:
+            with open(self.stats_file, "r", encoding="utf-8") as f:
+                self.stats = json.load(f)
+            self.logger.info(f"Loaded selector statistics for {len(self.stats)} page types")
+        except Exception as e:
+            self.logger.error(f"Error loading selector statistics: {str(e)}")
+            self.stats = {}
+
+    def save(self):
+        try:
+            temp_file = f"{self.stats_file}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(self.stats, f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, self.stats_file)
+            self.dirty = False
+            self.last_saved = time.time()
+        except Exception as e:
+            self.logger.error(f"Error saving selector statistics: {str(e)}")
+
+    def flush(self, force: bool = False):
+        if self.dirty and (force or time.time() - self.last_saved >= self.save_interval):
+            self.save()
+
+    def clear(self):
+        self.stats = {}
+        self.save()
+
+    def record(
+        self,
+        page_type: str,
+        selector: str,
+        hit: bool,
+        elapsed: float = 0.0,
+        frame_url: Optional[str] = None,
+        frame_kind: Optional[str] = None
+    ):
+        entry = self.stats.setdefault(page_type, {}).setdefault(selector, {
+            "hits": 0,
+            "misses": 0,
+            "time_spent": 0.0,
+            "frames": {}
+        })
+
+        if hit:
+            entry["hits"] += 1
+            if frame_url is not None:
+                frame_key = self._frame_key(frame_url)
+                entry["frames"][frame_key] = entry["frames"].get(frame_key, 0) + 1
+            if frame_kind is not None:
+                kinds = entry.setdefault("kinds", {})
+                kinds[frame_kind] = kinds.get(frame_kind, 0) + 1
+        else:
+            entry["misses"] += 1
+
+        entry["time_spent"] += elapsed
+        self.dirty = True
+
+    def ordered(self, page_type: str, selectors: List[str], frame_kind: Optional[str] = None) -> List[str]:
+        page_stats = self.stats.get(page_type, {})
+
+        def hits(selector: str) -> int:
+            entry = page_stats.get(selector, {})
+            if frame_kind is None:
+                return entry.get("hits", 0)
+            return entry.get("kinds", {}).get(frame_kind, 0)
+
+        return sorted(selectors, key=lambda selector: -hits(selector))
+
+    def ordered_frames(self, page_type: str, frames: List[Union[Page, Frame]]) -> List[Union[Page, Frame]]:
+        frame_hits: Dict[str, int] = {}
+        for entry in self.stats.get(page_type, {}).values():
+            for frame_key, hits in entry["frames"].items():
+                frame_hits[frame_key] = frame_hits.get(frame_key, 0) + hits
+
+        return sorted(frames, key=lambda frame: -frame_hits.get(self._frame_key(frame.url), 0))
+
+    async def find(
+        self,
+        page_type: str,
+        targets: List[Union[Page, Frame]],
+        selectors: List[str],
+        fallbacks: Optional[List[str]] = None
+    ) -> Optional[Tuple[Union[Page, Frame], str, ElementHandle]]:
+        targets = self.ordered_frames(page_type, targets)
+        for target in targets:
+            for selector in self.ordered(page_type, selectors, self._frame_kind(target)):
+                match = await self._query(page_type, target, selector)
+                if match:
+                    return match
+
+        for target in targets:
+            for selector in fallbacks or []:
+                match = await self._query(page_type, target, selector)
+                if match:
+                    return match
+
+        return None
+
+    async def _query(
+        self,
+        page_type: str,
+        target: Union[Page, Frame],
+        selector: str
+    ) -> Optional[Tuple[Union[Page, Frame], str, ElementHandle]]:
+        started = time.monotonic()
+        try:
+            handle = await target.query_selector(selector)
+        except Exception as e:
+            self.logger.debug(f"Error querying selector {selector}: {str(e)}")
+            handle = None
+
+        self.record(
+            page_type, selector, handle is not None, time.monotonic() - started, target.url, self._frame_kind(target)
+        )
+        return (target, selector, handle) if handle else None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        page_types = {}
+        for page_type, page_stats in self.stats.items():
+            selectors = []
+            for selector, entry in page_stats.items():
+                attempts = entry["hits"] + entry["misses"]
+                selectors.append({
+                    "selector": selector,
+                    "hits": entry["hits"],
+                    "misses": entry["misses"],
+                    "hit_rate": round(entry["hits"] / attempts, 3) if attempts else 0.0,
+                    "time_spent": round(entry["time_spent"], 3),
+                    "avg_time": round(entry["time_spent"] / attempts, 4) if attempts else 0.0,
+                    "frames": entry["frames"],
+                    "kinds": entry.get("kinds", {})
+                })
+            selectors.sort(key=lambda item: -item["hits"])
+            page_types[page_type] = {
+                "winner": selectors[0]["selector"] if selectors and selectors[0]["hits"] else None,
+                "time_spent": round(sum(item["time_spent"] for item in selectors), 3),
+                "selectors": selectors
+            }
+
+        return {"page_types": page_types}
+
+    @staticmethod
+    def _frame_kind(target: Union[Page, Frame]) -> str:
+        if isinstance(target, Page) or target.parent_frame is None:
+            return "main"
+        return "iframe"
+
+    @staticmethod
+    def _frame_key(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.netloc}{parsed.path}"
@@ -0,0 +1,92 @@
+import logging
+import time
+from typing import Optional, Dict, Any
+
+from config import config
+
+
+class CachedSession:
+    def __init__(self, account_id: str, storage_state: Dict[str, Any]):
+        self.account_id = account_id
+        self.storage_state = storage_state
+        self.created_at = time.time()
+        self.last_used_at = self.created_at
+        self.hits = 0
+
+    def is_expired(self, ttl: int) -> bool:
+        return time.time() - self.created_at > ttl
+
+
+class SessionCache:
+    def __init__(self, ttl: Optional[int] = None):
+        self.logger = logging.getLogger(__name__)
+        self.ttl = ttl or config.microsoft_account.session_ttl
+        self.sessions: Dict[str, CachedSession] = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stored": 0,
+            "evicted_expired": 0,
+            "evicted_invalid": 0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return config.microsoft_account.session_cache_enabled
+
+    def get(self, account_id: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+
+        session = self.sessions.get(account_id)
+        if not session:
+            self.stats["misses"] += 1
+            return None
+
+        if session.is_expired(self.ttl):
+            self.logger.info(f"Cached session for account {account_id} expired")
+            del self.sessions[account_id]
+            self.stats["evicted_expired"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        session.hits += 1
+        session.last_used_at = time.time()
+        self.stats["hits"] += 1
+        return session.storage_state
+
+    def store(self, account_id: str, storage_state: Dict[str, Any]):
+        if not self.enabled:
+            return
+
+        self.sessions[account_id] = CachedSession(account_id, storage_state)
+        self.stats["stored"] += 1
+        self.logger.info(f"Cached session for account {account_id}")
+
+    def evict(self, account_id: str, reason: str = "invalid"):
+        if self.sessions.pop(account_id, None):
+            self.stats["evicted_invalid"] += 1
+            self.logger.info(f"Evicted cached session for account {account_id}: {reason}")
+
+    def clear(self):
+        self.sessions = {}
+        self.logger.info("Cleared session cache")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "cached_sessions": len(self.sessions),
+            "hit_ratio": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            **self.stats,
+            "sessions": [
+                {
+                    "account_id": session.account_id,
+                    "age": round(time.time() - session.created_at, 1),
+                    "hits": session.hits
+                }
+                for session in self.sessions.values()
+            ]
+        }
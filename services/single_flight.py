@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from typing import Dict, Any, Tuple, Callable, Awaitable
+
+
+class FlightAborted(Exception):
+    pass
+
+
+class SingleFlight:
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.flights: Dict[str, asyncio.Future] = {}
+        self.stats = {"started": 0, "coalesced": 0, "aborted": 0}
+
+    def in_flight(self, name: str) -> bool:
+        return name in self.flights
+
+    async def run(self, name: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        while name in self.flights:
+            self.stats["coalesced"] += 1
+            self.logger.info(f"Joining in-flight check for {name}")
+            try:
+                return await asyncio.shield(self.flights[name]), True
+            except FlightAborted:
+                self.logger.info(f"In-flight check for {name} was aborted, retrying")
+
+        future = asyncio.get_event_loop().create_future()
+        self.flights[name] = future
+        self.stats["started"] += 1
+        try:
+            result = await factory()
+        except BaseException as e:
+            self.stats["aborted"] += 1
+            future.set_exception(FlightAborted(str(e) or type(e).__name__))
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self.flights.get(name) is future:
+                del self.flights[name]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self.flights),
+            "keys": list(self.flights),
+            **self.stats
+        }
@@ -9,7 +9,7 @@ from typing import Optional, List, Dict
 import pycountry
 import requests
 
-from models.vpn import VPNRegion, VPNService, VPNServicePool, VPNProvider, VPNStatus
+from models.vpn import VPNRegion, VPNService, VPNServicePool, VPNProvider, VPNStatus, ProxyEndpoint
 from config import config, DATA_DIR
 
 class VPNManager:
@@ -130,12 +130,44 @@ class VPNManager:
             
             return True
     
+    async def set_region_proxy(self, service_name: str, region_id: str, proxy: Optional[ProxyEndpoint]) -> Optional[VPNRegion]:
+        
+        async with self.lock:
+            service = await self.get_service(service_name)
+            if not service:
+                self.logger.error(f"VPN service {service_name} not found")
+                return None
+            
+            region = service.get_region_by_id(region_id)
+            if not region:
+                self.logger.error(f"Region with ID {region_id} not found for service {service_name}")
+                return None
+            
+            region.proxy = proxy
+            if proxy:
+                self.logger.info(f"Region {region.name} ({region.code}) now routes through proxy {proxy.server}")
+            else:
+                self.logger.info(f"Removed proxy from region {region.name} ({region.code})")
+            
+            await self.save_vpn_services()
+            
+            return region
+    
+    def get_region_proxies(self) -> Dict[str, Dict[str, str]]:
+        
+        return {code: proxy.to_playwright() for code, proxy in self.vpn_pool.get_region_proxies().items()}
+    
     async def connect(self, service_name: str, region_code: str) -> bool:
         
         async with self.lock:
             
             if self.current_service and self.current_service.status == VPNStatus.CONNECTED:
-                await self.disconnect()
+                current_region = self.current_service.current_region
+                if self.current_service.name == service_name and current_region and current_region.code == region_code:
+                    self.logger.info(f"Already connected to {service_name} ({current_region.name})")
+                    return True
+                
+                await self._disconnect_current()
             
             service = await self.get_service(service_name)
             if not service:
@@ -189,37 +221,41 @@ class VPNManager:
     async def disconnect(self) -> bool:
         
         async with self.lock:
-            if not self.current_service:
-                self.logger.info("No active VPN connection to disconnect")
-                return True
-            
-            try:
-                if self.current_service.provider == VPNProvider.NORDVPN:
-                    success = await self._disconnect_nordvpn()
-                elif self.current_service.provider == VPNProvider.SURFSHARK:
-                    success = await self._disconnect_surfshark()
-                elif self.current_service.provider == VPNProvider.CUSTOM:
-                    success = await self._disconnect_custom()
-                else:
-                    self.logger.error(f"Unsupported VPN provider: {self.current_service.provider}")
-                    self.current_service.set_error(f"Unsupported VPN provider: {self.current_service.provider}")
-                    return False
-                
-                if success:
-                    self.current_service.set_disconnected()
-                    self.logger.info(f"Disconnected from {self.current_service.name}")
-                    self.current_service = None
-                    return True
-                else:
-                    self.current_service.set_error("Failed to disconnect from VPN")
-                    self.logger.error(f"Failed to disconnect from {self.current_service.name}")
-                    return False
+            return await self._disconnect_current()
+    
+    async def _disconnect_current(self) -> bool:
+        
+        if not self.current_service:
+            self.logger.info("No active VPN connection to disconnect")
+            return True
+        
+        try:
+            if self.current_service.provider == VPNProvider.NORDVPN:
+                success = await self._disconnect_nordvpn()
+            elif self.current_service.provider == VPNProvider.SURFSHARK:
+                success = await self._disconnect_surfshark()
+            elif self.current_service.provider == VPNProvider.CUSTOM:
+                success = await self._disconnect_custom()
+            else:
+                self.logger.error(f"Unsupported VPN provider: {self.current_service.provider}")
+                self.current_service.set_error(f"Unsupported VPN provider: {self.current_service.provider}")
+                return False
             
-            except Exception as e:
-                error_msg = f"Error disconnecting from VPN: {str(e)}"
-                self.logger.error(error_msg)
-                self.current_service.set_error(error_msg)
+            if success:
+                self.current_service.set_disconnected()
+                self.logger.info(f"Disconnected from {self.current_service.name}")
+                self.current_service = None
+                return True
+            else:
+                self.current_service.set_error("Failed to disconnect from VPN")
+                self.logger.error(f"Failed to disconnect from {self.current_service.name}")
                 return False
+        
+        except Exception as e:
+            error_msg = f"Error disconnecting from VPN: {str(e)}"
+            self.logger.error(error_msg)
+            self.current_service.set_error(error_msg)
+            return False
     
     async def check_connection(self) -> bool:
         
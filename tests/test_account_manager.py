@@ -0,0 +1,55 @@
+import pytest
+
+from services import account_manager
+from services.account_manager import AccountManager
+from models.account import AccountStatus
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(account_manager, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+async def roster(count: int) -> AccountManager:
+    manager = AccountManager()
+    for index in range(count):
+        await manager.add_account(f"user{index}@example.com", "secret")
+    for index, account in enumerate(manager.account_pool.accounts):
+        account.id = str(index)
+    await manager.save_accounts()
+    return manager
+
+
+async def test_worker_state_is_kept_in_its_shard_file(data_dir):
+    await roster(3)
+    accounts_json = (data_dir / "accounts.json").read_text()
+
+    worker = AccountManager(shard=(1, 2))
+    await worker.initialize()
+    account = await worker.get_available_account()
+    await worker.release_account(account, checks=2)
+
+    assert [account.id for account in worker.account_pool.accounts] == ["1"]
+    assert (data_dir / "accounts.json").read_text() == accounts_json
+    assert (data_dir / "accounts.shard1-of-2.json").exists()
+
+    restarted = AccountManager(shard=(1, 2))
+    await restarted.initialize()
+    assert restarted.account_pool.accounts[0].checks_count == 2
+
+    api = AccountManager()
+    await api.initialize()
+    assert [account.checks_count for account in api.account_pool.accounts] == [0, 0, 0]
+
+
+async def test_accounts_left_in_use_by_a_dead_worker_are_released(data_dir):
+    await roster(2)
+    worker = AccountManager(shard=(0, 1))
+    await worker.initialize()
+    await worker.get_available_account()
+
+    restarted = AccountManager(shard=(0, 1))
+    await restarted.initialize()
+
+    assert [account.status for account in restarted.account_pool.accounts] == [AccountStatus.AVAILABLE] * 2
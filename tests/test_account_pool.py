@@ -0,0 +1,42 @@
+from models.account import MicrosoftAccount, AccountPool, AccountStatus
+
+
+def make_pool(count: int) -> AccountPool:
+    return AccountPool(accounts=[
+        MicrosoftAccount(id=str(index), email=f"user{index}@example.com", password="secret")
+        for index in range(count)
+    ])
+
+
+def test_accounts_are_picked_round_robin():
+    pool = make_pool(3)
+
+    picked = [pool.get_available_account().id for _ in range(4)]
+
+    assert picked == ["0", "1", "2", "0"]
+
+
+def test_unavailable_accounts_are_skipped():
+    pool = make_pool(3)
+    pool.accounts[0].mark_in_use()
+    pool.accounts[1].mark_blocked()
+
+    assert pool.get_available_account().id == "2"
+    pool.accounts[2].mark_in_use()
+    assert pool.get_available_account() is None
+
+
+def test_account_with_shortest_rate_delay_is_preferred():
+    pool = make_pool(3)
+    delays = {"0": 30.0, "1": 0.0, "2": 0.0}
+
+    assert pool.get_available_account(delay=lambda account: delays[account.id]).id == "1"
+    assert pool.get_available_account(delay=lambda account: delays[account.id]).id == "2"
+    assert pool.get_available_account(delay=lambda account: delays[account.id]).id == "1"
+
+
+def test_throttled_account_is_still_used_when_it_is_the_only_one():
+    pool = make_pool(2)
+    pool.accounts[1].status = AccountStatus.ERROR
+
+    assert pool.get_available_account(delay=lambda account: 30.0).id == "0"
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from config import config
+from services.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+        self.hangs = False
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    async def add_cookies(self, cookies):
+        pass
+
+    async def close(self):
+        if self.hangs:
+            await asyncio.sleep(3600)
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def new_context(self, **options):
+        return FakeContext(self)
+
+    async def close(self):
+        self.closed = True
+        self.connected = False
+
+
+class FakeBrowserType:
+    def __init__(self):
+        self.launched = []
+        self.delay = 0.0
+
+    async def launch(self, **options):
+        await asyncio.sleep(self.delay)
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeBrowserType()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(config.browser.supervisor, "close_timeout", 0.05)
+    monkeypatch.setattr(config.browser, "health_check_interval", 0)
+    pool = BrowserPool(size=1, max_contexts_per_browser=3)
+    pool.playwright = FakePlaywright()
+    pool.slots = asyncio.Semaphore(pool.size * pool.max_contexts_per_browser)
+    return pool
+
+
+async def test_stuck_context_is_discarded_without_closing_the_browser(pool):
+    stuck, healthy = await pool.acquire_context(), await pool.acquire_context()
+    browser = stuck.browser
+
+    assert await pool.discard_context(stuck)
+
+    assert stuck.closed
+    assert not browser.closed
+    assert not healthy.closed
+    assert pool.get_statistics()["active_contexts"] == 1
+    assert pool.slots._value == 2
+
+
+async def test_browser_retires_after_its_last_context_when_close_hangs(pool):
+    stuck, healthy = await pool.acquire_context(), await pool.acquire_context()
+    stuck.hangs = True
+    browser = stuck.browser
+
+    assert await pool.discard_context(stuck)
+    assert pool.browsers[0].retiring
+    assert not browser.closed
+
+    await pool.release_context(healthy)
+
+    assert browser.closed
+    assert len(pool.browsers) == 1
+    assert pool.browsers[0].browser is not browser
+    assert pool.slots._value == 3
+
+
+async def test_context_released_by_cancelled_close_is_still_discarded(pool):
+    stuck = await pool.acquire_context()
+    stuck.hangs = True
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(pool.release_context(stuck), timeout=0.01)
+
+    assert await pool.discard_context(stuck)
+    assert pool.slots._value == 3
+    assert stuck.browser.closed
+
+
+async def test_replacement_launches_outside_the_lock(pool):
+    pool.browsers.append(await pool._launch_browser())
+    pool.browsers[0].browser.connected = False
+    pool.playwright.chromium.delay = 0.2
+
+    health = asyncio.create_task(pool.check_health())
+    await asyncio.sleep(0.05)
+    assert not pool.lock.locked()
+    await health
+
+    assert len(pool.browsers) == 1
+    assert pool.browsers[0].is_healthy()
+    assert pool.stats["browsers_replaced"] == 1
@@ -0,0 +1,42 @@
+import asyncio
+
+from config import JobQueueConfig
+from models.key import Key, KeyCheckResult, KeyStatus
+from services import job_store, result_cache, selector_stats
+from services.check_worker import CheckWorker
+from services.job_store import JobStore
+from services.key_checker import KeyChecker
+
+KEY = "BCDFG-HJKMP-QRTVW-XY234-6789B"
+
+
+async def test_duplicate_with_differently_cased_region_is_reported(tmp_path, monkeypatch):
+    for module in (job_store, result_cache, selector_stats):
+        monkeypatch.setattr(module, "DATA_DIR", tmp_path)
+    store = JobStore(tmp_path / "jobs.db", JobQueueConfig(lease_seconds=60))
+    store.record_queue_mode(external_workers=True)
+    store.create_batch("b1", [(Key(key=KEY), "US"), (Key(key=KEY), "us")])
+
+    worker = CheckWorker(worker_id="w1", job_store=store)
+    worker.key_checker = KeyChecker(None, None)
+    worker.key_checker.result_handlers[worker.batch.batch_id] = worker._on_result
+
+    admitted = []
+    for _ in range(2):
+        jobs = await worker.queue.claim("w1", 10)
+        admitted += worker.key_checker.admit_keys(worker.batch, worker._accept(jobs))
+
+    assert len(admitted) == 1
+    key, region = admitted[0]
+    worker.key_checker._record_result(
+        worker.batch, KeyCheckResult(key=key, status=KeyStatus.VALID, account_used="a@example.com"), region
+    )
+    await asyncio.gather(*worker.reports)
+
+    assert worker.jobs == {}
+    assert worker.pending == {}
+    assert worker.stats["completed"] == 2
+    assert store.unfinished_batches() == []
+
+    worker.key_checker.result_cache.close()
+    store.close()
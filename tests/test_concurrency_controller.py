@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import pytest
+
+from config import ConcurrencyConfig
+from services import concurrency_controller
+from services.concurrency_controller import ConcurrencyController, classify_outcome
+
+
+@pytest.fixture
+def memory(monkeypatch):
+    state = SimpleNamespace(percent=40.0)
+    monkeypatch.setattr(concurrency_controller.psutil, "virtual_memory", lambda: state)
+    return state
+
+
+def make_controller(**overrides) -> ConcurrencyController:
+    settings = dict(
+        min_parallel=1, max_parallel=8, window=3, target_latency=10.0,
+        max_error_rate=0.2, decrease_factor=0.5, decrease_cooldown=0.0
+    )
+    profile = ConcurrencyConfig(**{**settings, **overrides})
+    return ConcurrencyController(initial=4, profile=profile)
+
+
+def record_window(controller: ConcurrencyController, latency: float = 1.0, outcome: str = "ok"):
+    for _ in range(controller.profile.window):
+        controller.record(latency, outcome)
+
+
+def test_additive_increase_on_healthy_window(memory):
+    controller = make_controller()
+
+    record_window(controller)
+    record_window(controller)
+
+    assert controller.limit == 6
+    assert [change["to"] for change in controller.changes] == [5, 6]
+
+
+def test_increase_stops_at_max(memory):
+    controller = make_controller()
+
+    for _ in range(10):
+        record_window(controller)
+
+    assert controller.limit == 8
+
+
+@pytest.mark.parametrize("outcome", ["timeout", "throttled"])
+def test_timeout_or_throttle_halves_immediately(memory, outcome):
+    controller = make_controller()
+
+    controller.record(5.0, outcome)
+
+    assert controller.limit == 2
+    assert controller.samples == []
+
+
+def test_error_rate_latency_and_memory_decrease(memory):
+    controller = make_controller()
+    controller.record(1.0, "error")
+    controller.record(1.0, "ok")
+    controller.record(1.0, "ok")
+    assert controller.limit == 2
+
+    controller = make_controller()
+    record_window(controller, latency=30.0)
+    assert controller.limit == 2
+
+    controller = make_controller()
+    memory.percent = 95.0
+    record_window(controller)
+    assert controller.limit == 2
+
+
+def test_decrease_respects_cooldown_and_min(memory):
+    controller = make_controller(decrease_cooldown=60.0)
+
+    controller.record(1.0, "timeout")
+    controller.record(1.0, "timeout")
+    assert controller.limit == 2
+
+    controller = make_controller()
+    for _ in range(5):
+        controller.record(1.0, "timeout")
+    assert controller.limit == 1
+
+
+def test_fixed_limit_when_not_adaptive(memory):
+    controller = make_controller(adaptive=False)
+
+    controller.record(1.0, "timeout")
+    record_window(controller)
+
+    assert controller.limit == 4
+    assert controller.outcomes["timeout"] == 1
+
+
+def test_workers_retire_above_limit(memory):
+    controller = make_controller()
+    for _ in range(4):
+        controller.worker_started()
+
+    controller.record(1.0, "timeout")
+
+    assert [controller.try_retire() for _ in range(3)] == [True, True, False]
+    controller.worker_finished(retired=True)
+    assert controller.active_workers == 2
+
+
+@pytest.mark.parametrize("status, message, outcome", [
+    ("valid", None, "ok"),
+    ("error", "Redeem backend throttled the request (429)", "throttled"),
+    ("error", "Worker failed: no heartbeat for 45s during key_input", "timeout"),
+    ("error", "Failed to open redeem session", "error"),
+    ("error", "HTTP 429 Too Many Requests", "throttled"),
+    ("error", "HTTP/1.1 429", "throttled"),
+    ("error", "Response status code: 429", "throttled"),
+    ("error", "Proxy 10.0.0.1:4290 refused the connection", "error"),
+    ("error", "Check check_KEY_1714290000_4291 failed", "error"),
+    ("error", "Account hit 429 checks today", "error"),
+])
+def test_classify_outcome(status, message, outcome):
+    assert classify_outcome(status, message) == outcome
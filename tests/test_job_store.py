@@ -0,0 +1,217 @@
+import pytest
+
+from config import JobQueueConfig
+from models.key import Key, KeyCheckResult, KeyStatus
+from services import job_store
+from services.job_store import JobStore, KEY_QUEUED, KEY_RUNNING, KEY_DONE
+
+KEYS = [
+    "BCDFG-HJKMP-QRTVW-XY234-6789B", "CDFGH-JKMPQ-RTVWX-Y2346-789BC",
+    "DFGHJ-KMPQR-TVWXY-23467-89BCD", "FGHJK-MPQRT-VWXY2-34678-9BCDF"
+]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(job_store.time, "time", clock.time)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    store = JobStore(tmp_path / "jobs.db", JobQueueConfig(lease_seconds=60))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def external(store):
+    store.record_queue_mode(external_workers=True)
+
+
+def items(*regions):
+    return [(Key(key=KEYS[index]), region) for index, region in enumerate(regions)]
+
+
+def result(key: Key, status: KeyStatus = KeyStatus.VALID) -> KeyCheckResult:
+    return KeyCheckResult(key=key, status=status, account_used="a@example.com")
+
+
+def states(store: JobStore):
+    return store.get_statistics()["keys"]
+
+
+def test_batch_round_trips_with_results_and_pending_keys(store):
+    store.create_batch("b1", items("US", None, "DE"))
+    store.record_result("b1", result(Key(key=KEYS[1]), KeyStatus.USED), None)
+
+    batch, pending = store.load_batch("b1")
+
+    assert [key.key for key in batch.keys] == KEYS[:3]
+    assert [(item.key.key, item.status) for item in batch.results] == [(KEYS[1], KeyStatus.USED)]
+    assert [(key.key, region) for key, region in pending] == [(KEYS[0], "US"), (KEYS[2], "DE")]
+    assert batch.progress == pytest.approx(1 / 3)
+    assert store.unfinished_batches() == ["b1"]
+
+
+def test_result_settles_running_row_first(store):
+    store.create_batch("b1", [(Key(key=KEYS[0]), "US"), (Key(key=KEYS[0]), "US")])
+    store.mark_running("b1", Key(key=KEYS[0]), "US", "a@example.com")
+
+    store.record_result("b1", result(Key(key=KEYS[0])), "US")
+
+    assert states(store) == {KEY_QUEUED: 1, KEY_DONE: 1}
+
+
+def test_interrupted_keys_are_requeued_for_recovery(store):
+    store.create_batch("b1", items("US", "US"))
+    store.mark_running("b1", Key(key=KEYS[0]), "US", "a@example.com")
+    store.mark_running("b1", Key(key=KEYS[1]), "US", "a@example.com")
+    store.record_result("b1", result(Key(key=KEYS[1])), "US")
+
+    assert store.requeue_running("b1") == 1
+    assert states(store) == {KEY_QUEUED: 1, KEY_DONE: 1}
+    assert [key.key for key, _ in store.load_batch("b1")[1]] == [KEYS[0]]
+
+
+def test_completed_batch_is_not_recovered(store, clock):
+    store.create_batch("b1", items("US"))
+    clock.now += 1
+    store.create_batch("b2", items("US"))
+    store.record_result("b1", result(Key(key=KEYS[0])), "US")
+    batch, _ = store.load_batch("b1")
+    batch.scheduling = {"region_switches": 0}
+
+    store.complete_batch(batch)
+
+    assert store.unfinished_batches() == ["b2"]
+    completed, _ = store.load_batch("b1")
+    assert completed.completed_at is not None
+    assert completed.scheduling == {"region_switches": 0}
+
+
+def test_disabled_store_is_inert(tmp_path):
+    store = JobStore(tmp_path / "jobs.db", JobQueueConfig(enabled=False))
+
+    store.create_batch("b1", items("US"))
+
+    assert store.load_batch("b1") is None
+    assert store.unfinished_batches() == []
+    assert store.get_statistics() == {"enabled": False}
+    assert not (tmp_path / "jobs.db").exists()
+
+
+def test_claims_wait_for_external_worker_mode(store):
+    store.create_batch("b1", items("US"))
+
+    assert not store.accepts_workers()
+    assert store.claim("w1", 1) == []
+
+    store.record_queue_mode(external_workers=True)
+    assert len(store.claim("w1", 1)) == 1
+
+    store.record_queue_mode(external_workers=False)
+    store.release("w1")
+    assert store.claim("w1", 1) == []
+    assert states(store) == {KEY_QUEUED: 1}
+
+
+@pytest.mark.usefixtures("external")
+def test_claims_do_not_overlap(store):
+    store.create_batch("b1", items("US", "US", "US", "US"))
+
+    first = store.claim("w1", 3)
+    second = store.claim("w2", 3)
+
+    assert [job["key"].key for job in first] == KEYS[:3]
+    assert len(second) == 1
+    assert not {job["id"] for job in first} & {job["id"] for job in second}
+    assert store.claim("w3", 3) == []
+    assert states(store) == {KEY_RUNNING: 4}
+
+
+@pytest.mark.usefixtures("external")
+def test_claim_groups_oldest_region(store, clock):
+    store.create_batch("b1", items("DE", "US", "DE", None))
+    clock.now += 1
+    store.create_batch("b2", items("US"))
+
+    assert [job["region"] for job in store.claim("w1", 10)] == ["DE", "DE"]
+    assert [(job["batch_id"], job["region"]) for job in store.claim("w1", 10)] == [("b1", "US"), ("b2", "US")]
+    assert [job["region"] for job in store.claim("w1", 10)] == [None]
+
+
+@pytest.mark.usefixtures("external")
+def test_expired_lease_is_requeued(store, clock):
+    store.create_batch("b1", items("US", "US"))
+    stale = store.claim("w1", 2, lease=10)
+
+    clock.now += 11
+    fresh = store.claim("w2", 5)
+
+    assert [job["id"] for job in fresh] == [job["id"] for job in stale]
+    assert not store.complete(stale[0]["id"], "w1", result(stale[0]["key"]))
+    assert store.complete(fresh[0]["id"], "w2", result(fresh[0]["key"]))
+    assert states(store) == {KEY_DONE: 1, KEY_RUNNING: 1}
+
+
+@pytest.mark.usefixtures("external")
+def test_extended_lease_is_not_requeued(store, clock):
+    store.create_batch("b1", items("US"))
+    store.claim("w1", 1, lease=10)
+
+    clock.now += 8
+    assert store.extend_leases("w1", lease=10) == 1
+    clock.now += 8
+
+    assert store.claim("w2", 1) == []
+
+
+@pytest.mark.usefixtures("external")
+def test_inline_running_keys_are_not_stolen(store, clock):
+    store.create_batch("b1", items("US", "US"))
+    store.mark_running("b1", Key(key=KEYS[0]), "US", "a@example.com")
+
+    clock.now += 3600
+    claimed = store.claim("w1", 5)
+
+    assert [job["key"].key for job in claimed] == [KEYS[1]]
+    assert store.requeue_unleased() == 1
+    assert [job["key"].key for job in store.claim("w1", 5)] == [KEYS[0]]
+
+
+@pytest.mark.usefixtures("external")
+def test_release_returns_keys_to_queue(store):
+    store.create_batch("b1", items("US", "US", "US"))
+    jobs = store.claim("w1", 3)
+
+    assert store.release("w1", [jobs[0]["id"]]) == 1
+    assert states(store) == {KEY_QUEUED: 1, KEY_RUNNING: 2}
+    assert store.release("w1") == 2
+    assert store.release("w1") == 0
+    assert [job["id"] for job in store.claim("w2", 3)] == [job["id"] for job in jobs]
+
+
+@pytest.mark.usefixtures("external")
+def test_batch_completes_with_last_worker_result(store):
+    store.create_batch("b1", items("US", "US"))
+    jobs = store.claim("w1", 2)
+
+    store.complete(jobs[0]["id"], "w1", result(jobs[0]["key"]))
+    assert store.unfinished_batches() == ["b1"]
+    store.complete(jobs[1]["id"], "w1", result(jobs[1]["key"]))
+
+    assert store.unfinished_batches() == []
+    batch, pending = store.load_batch("b1")
+    assert pending == []
+    assert [item.status for item in batch.results] == [KeyStatus.VALID, KeyStatus.VALID]
+    assert store.worker_statistics("b1")["w1"]["completed"] == 2
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from config import config
+from models.key import Key, KeyFormatError, PRODUCT_KEY_ALPHABET, KEY_FORMAT_MESSAGES, key_format_error
+from services.key_prefilter import KeyPrefilter
+
+VALID_KEY = "BCDFG-HJKMP-QRTVW-XY234-6789B"
+
+
+@pytest.fixture
+def prefilter(monkeypatch):
+    monkeypatch.setattr(config.key, "prefilter_enabled", True)
+    return KeyPrefilter()
+
+
+@pytest.mark.parametrize("key", [
+    VALID_KEY,
+    "bcdfg-hjkmp-qrtvw-xy234-6789b",
+    "BCDFG HJKMP QRTVW XY234 6789B",
+    "BCDFGHJKMPQRTVWXY2346789B",
+    "  NCDFG-HJKMP-QRTVW-XY234-6789B  ",
+])
+def test_accepts_well_formed_keys(prefilter, key):
+    assert prefilter.reject_reason(key) is None
+
+
+@pytest.mark.parametrize("key, code, length", [
+    ("BCDFG-HJKMP-QRTVW-XY234-6789!", "characters", 25),
+    ("BCDFG-HJKMP-QRTVW-XY234", "length", 20),
+    ("ACDFG-HJKMP-QRTVW-XY234-6789B", "alphabet", 25),
+    ("NNDFG-HJKMP-QRTVW-XY234-6789B", "letter_n", 25),
+    ("BCDF-GHJKMP-QRTVW-XY234-6789B", "grouping", 25),
+    ("", "length", 0),
+])
+def test_rejects_malformed_keys(prefilter, key, code, length):
+    assert prefilter.reject_reason(key) == KeyFormatError(code, length)
+
+
+def test_reason_messages_carry_the_detail_separately():
+    assert KeyFormatError("length", 20).message == "Key must contain 25 characters, got 20"
+    assert KeyFormatError("alphabet", 25).message == KEY_FORMAT_MESSAGES["alphabet"]
+
+
+def test_statistics_count_rejections_by_reason(prefilter):
+    prefilter.validate([VALID_KEY, "short", "also short", "ACDFG-HJKMP-QRTVW-XY234-6789B"])
+    stats = prefilter.get_statistics()
+
+    assert stats["checked"] == 4
+    assert stats["rejected"] == 3
+    assert stats["browser_checks_saved"] == 3
+    assert stats["reasons"] == {"length": 2, "alphabet": 1}
+
+
+def test_disabled_prefilter_accepts_everything(prefilter, monkeypatch):
+    monkeypatch.setattr(config.key, "prefilter_enabled", False)
+
+    assert prefilter.validate(["short", VALID_KEY]) == [None, None]
+
+
+def test_matches_key_model_validation(prefilter):
+    rng = random.Random(7)
+    alphabet = PRODUCT_KEY_ALPHABET + "NAEIOUZ015 -_."
+    samples = [
+        "".join(rng.choice(alphabet) for _ in range(rng.choice([24, 25, 29, 30])))
+        for _ in range(2000)
+    ]
+    samples += [VALID_KEY, VALID_KEY.lower(), VALID_KEY.replace("-", " ")]
+
+    reasons = prefilter.validate(samples)
+
+    assert reasons == [key_format_error(sample) for sample in samples]
+    assert [reason is None for reason in reasons] == [Key(key=sample).is_valid_format() for sample in samples]
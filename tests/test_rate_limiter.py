@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from config import RateLimitConfig
+from services.rate_limiter import TokenBucket, RateLimiter
+
+
+async def test_burst_is_served_without_waiting():
+    bucket = TokenBucket(per_minute=60, burst=3)
+
+    waits = [await bucket.acquire() for _ in range(3)]
+
+    assert waits == [0.0, 0.0, 0.0]
+    assert bucket.stats["acquired"] == 3
+    assert bucket.stats["waits"] == 0
+
+
+async def test_waits_for_refill_after_burst():
+    bucket = TokenBucket(per_minute=600, burst=1)
+
+    await bucket.acquire()
+    started = time.monotonic()
+    waited = await bucket.acquire()
+
+    assert waited == pytest.approx(0.1, abs=0.02)
+    assert time.monotonic() - started >= 0.08
+    assert bucket.stats["waits"] == 1
+    assert bucket.stats["max_wait"] == pytest.approx(waited)
+
+
+async def test_refill_is_capped_at_burst():
+    bucket = TokenBucket(per_minute=6000, burst=2)
+    bucket.updated -= 60
+
+    assert bucket.level == 2
+
+
+@pytest.mark.parametrize("per_minute", [0, -5])
+async def test_zero_rate_is_unlimited(per_minute):
+    bucket = TokenBucket(per_minute=per_minute, burst=1)
+
+    waits = [await bucket.acquire() for _ in range(50)]
+
+    assert bucket.unlimited
+    assert set(waits) == {0.0}
+    assert bucket.stats["acquired"] == 50
+    assert bucket.to_dict()["per_minute"] is None
+
+
+async def test_limiter_keeps_separate_account_and_region_buckets():
+    limiter = RateLimiter(RateLimitConfig(global_per_minute=0, account_per_minute=600, region_per_minute=0, burst=1))
+
+    assert await limiter.acquire("a", "us") == 0.0
+    assert await limiter.acquire("b", "US") == 0.0
+    assert await limiter.acquire("a", "us") > 0.0
+
+    stats = limiter.get_statistics()
+    assert set(stats["accounts"]) == {"a", "b"}
+    assert set(stats["regions"]) == {"US"}
+    assert stats["regions"]["US"]["acquired"] == 3
+
+
+async def test_disabled_limiter_never_waits():
+    limiter = RateLimiter(RateLimitConfig(enabled=False, account_per_minute=1, burst=1))
+
+    assert [await limiter.acquire("a", "us") for _ in range(5)] == [0.0] * 5
+    assert await limiter.acquire_region("us") == 0.0
+
+
+async def test_delay_reports_wait_without_taking_a_token():
+    bucket = TokenBucket(per_minute=600, burst=1)
+
+    assert bucket.delay() == 0.0
+    await bucket.acquire()
+
+    assert bucket.delay() == pytest.approx(0.1, abs=0.02)
+    assert bucket.stats["acquired"] == 1
+    assert TokenBucket(per_minute=0, burst=1).delay() == 0.0
+
+
+async def test_limiter_delay_covers_account_and_global_buckets():
+    limiter = RateLimiter(RateLimitConfig(global_per_minute=60, account_per_minute=600, region_per_minute=0, burst=1))
+
+    await limiter.acquire("a")
+
+    assert limiter.delay("a") == pytest.approx(1.0, abs=0.05)
+    assert limiter.delay("b") == pytest.approx(1.0, abs=0.05)
+    assert RateLimiter(RateLimitConfig(enabled=False)).delay("a") == 0.0
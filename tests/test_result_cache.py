@@ -0,0 +1,116 @@
+import pytest
+
+from config import ResultCacheConfig
+from models.key import Key, KeyCheckResult, KeyStatus
+from services import result_cache
+from services.result_cache import ResultCache
+
+KEYS = ["BCDFG-HJKMP-QRTVW-XY234-6789B", "CDFGH-JKMPQ-RTVWX-Y2346-789BC", "DFGHJ-KMPQR-TVWXY-23467-89BCD"]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache.time, "time", clock.time)
+    return clock
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**settings) -> ResultCache:
+        cache = ResultCache(tmp_path / f"cache_{len(caches)}.db", ResultCacheConfig(**settings))
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def result(key: str, status: KeyStatus = KeyStatus.VALID, **fields) -> KeyCheckResult:
+    return KeyCheckResult(key=Key(key=key), status=status, **fields)
+
+
+def test_hit_returns_cached_copy(make_cache, clock):
+    cache = make_cache()
+    cache.store(result(KEYS[0], KeyStatus.USED, account_used="a@example.com"), "us")
+
+    cached = cache.get(Key(key=KEYS[0]), "US")
+
+    assert cached.status == KeyStatus.USED
+    assert cached.account_used == "a@example.com"
+    assert cached.from_cache
+    assert cache.get(Key(key=KEYS[0]), "DE") is None
+    assert cache.get_statistics()["hit_ratio"] == 0.5
+
+
+def test_entries_expire_after_status_ttl(make_cache, clock):
+    cache = make_cache(ttl={"valid": 60, "invalid": 3600})
+    cache.store(result(KEYS[0], KeyStatus.VALID))
+    cache.store(result(KEYS[1], KeyStatus.INVALID))
+
+    clock.now += 61
+
+    assert cache.get(Key(key=KEYS[0])) is None
+    assert cache.get(Key(key=KEYS[1])).status == KeyStatus.INVALID
+    stats = cache.get_statistics()
+    assert stats["evicted_expired"] == 1
+    assert stats["entries"] == {"invalid": 1}
+
+
+def test_least_recently_used_entry_is_evicted(make_cache, clock):
+    cache = make_cache(max_entries=2)
+    cache.store(result(KEYS[0]))
+    clock.now += 1
+    cache.store(result(KEYS[1]))
+    clock.now += 1
+    assert cache.get(Key(key=KEYS[0])) is not None
+
+    clock.now += 1
+    cache.store(result(KEYS[2]))
+
+    assert cache.get(Key(key=KEYS[1])) is None
+    assert cache.get(Key(key=KEYS[0])) is not None
+    assert cache.get(Key(key=KEYS[2])) is not None
+    assert cache.get_statistics()["evicted_lru"] == 1
+
+
+def test_only_final_results_are_stored(make_cache, clock):
+    cache = make_cache(ttl={"valid": 60})
+    cache.store(result(KEYS[0], KeyStatus.ERROR, error_message="Failed to open redeem session"))
+    cache.store(result(KEYS[1], KeyStatus.INVALID))
+    cache.store(result(KEYS[2], KeyStatus.VALID, from_cache=True))
+
+    assert cache.get_statistics()["stored"] == 0
+    assert cache.get(Key(key=KEYS[0])) is None
+
+
+def test_disabled_cache_is_bypassed(make_cache, clock):
+    cache = make_cache(enabled=False)
+    cache.store(result(KEYS[0]))
+
+    assert cache.get(Key(key=KEYS[0])) is None
+    assert cache.stats["misses"] == 0
+
+
+def test_entries_survive_reopen(tmp_path, clock):
+    path = tmp_path / "cache.db"
+    cache = ResultCache(path, ResultCacheConfig())
+    cache.store(result(KEYS[0], KeyStatus.REGION_ERROR, region_used="TR"), "tr")
+    cache.close()
+
+    reopened = ResultCache(path, ResultCacheConfig())
+    try:
+        assert reopened.get(Key(key=KEYS[0]), "tr").region_used == "TR"
+    finally:
+        reopened.close()
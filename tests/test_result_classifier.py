@@ -0,0 +1,41 @@
+import pytest
+
+from services.result_classifier import ResultClassifier, benchmark
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return ResultClassifier()
+
+
+def test_corpus_accuracy(classifier):
+    report = benchmark(classifier, iterations=1)
+
+    assert report["samples"] > 0
+    assert report["methods"]["compiled_matcher"]["accuracy"] == 1.0
+    assert report["methods"]["compiled_matcher"]["mismatches"] == []
+    assert report["methods"]["substring_chain"]["accuracy"] < report["methods"]["compiled_matcher"]["accuracy"]
+
+
+@pytest.mark.parametrize("text, status", [
+    ("You now have Xbox Game Pass Ultimate", "success"),
+    ("This code has already been redeemed", "used"),
+    ("Этот код недействителен", "invalid"),
+])
+def test_classify_known_phrases(classifier, text, status):
+    assert classifier.classify(text)["status"] == status
+
+
+def test_classify_unknown_text(classifier):
+    assert classifier.classify("Loading, please wait") is None
+    assert classifier.classify(None) is None
+    assert classifier.classify("") is None
+
+
+def test_to_result_includes_matched_phrase(classifier):
+    match = classifier.classify("This code has already been redeemed")
+    result = classifier.to_result(match)
+
+    assert result["status"] == "used"
+    assert result["matched_phrase"].lower() in "this code has already been redeemed"
+    assert result["message"]
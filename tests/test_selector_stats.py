@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from services.selector_stats import SelectorStats
+
+
+class FakeFrame:
+    def __init__(self, url: str, elements, parent=None):
+        self.url = url
+        self.elements = set(elements)
+        self.parent_frame = parent
+        self.queries = []
+
+    async def query_selector(self, selector: str):
+        self.queries.append(selector)
+        return f"{self.url}#{selector}" if selector in self.elements else None
+
+
+SPECIFIC = ['input[aria-label="Enter code"]', 'input[name="tokenString"]']
+GENERIC = ['input[type="text"]']
+
+
+@pytest.fixture
+def stats(tmp_path):
+    return SelectorStats(str(tmp_path / "selector_stats.json"))
+
+
+@pytest.fixture
+def main_page():
+    return FakeFrame("https://account.microsoft.com/billing/redeem", [])
+
+
+async def test_learned_selector_is_tried_first(stats, main_page):
+    main_page.elements = {SPECIFIC[1]}
+    await stats.find("redeem_input", [main_page], SPECIFIC)
+    main_page.queries.clear()
+
+    match = await stats.find("redeem_input", [main_page], SPECIFIC)
+
+    assert match[1] == SPECIFIC[1]
+    assert main_page.queries == [SPECIFIC[1]]
+
+
+async def test_generic_fallback_is_never_promoted(tmp_path, main_page):
+    path = tmp_path / "selector_stats.json"
+    path.write_text(json.dumps({"redeem_input": {GENERIC[0]: {
+        "hits": 500, "misses": 0, "time_spent": 0.0, "frames": {}, "kinds": {"main": 500}
+    }}}))
+    stats = SelectorStats(str(path))
+    main_page.elements = {SPECIFIC[1], GENERIC[0]}
+
+    match = await stats.find("redeem_input", [main_page], SPECIFIC, GENERIC)
+
+    assert match[1] == SPECIFIC[1]
+    assert GENERIC[0] not in main_page.queries
+
+
+async def test_fallbacks_run_after_specific_selectors_in_every_target(stats, main_page):
+    frame = FakeFrame("https://redeem.microsoft.com/webpurchase", GENERIC, parent=main_page)
+    main_page.elements = {SPECIFIC[0]}
+
+    match = await stats.find("redeem_input", [frame, main_page], SPECIFIC, GENERIC)
+
+    assert match[0] is main_page
+    assert match[1] == SPECIFIC[0]
+    assert frame.queries == SPECIFIC
+
+
+async def test_fallback_is_used_when_nothing_specific_matches(stats, main_page):
+    frame = FakeFrame("https://redeem.microsoft.com/webpurchase", GENERIC, parent=main_page)
+
+    match = await stats.find("redeem_input", [frame, main_page], SPECIFIC, GENERIC)
+
+    assert match[0] is frame
+    assert match[1] == GENERIC[0]
+
+
+async def test_selectors_are_ranked_per_frame_kind(stats, main_page):
+    frame = FakeFrame("https://redeem.microsoft.com/webpurchase", {SPECIFIC[1]}, parent=main_page)
+    for _ in range(3):
+        await stats.find("redeem_input", [frame], SPECIFIC)
+
+    assert stats.ordered("redeem_input", SPECIFIC, "iframe") == [SPECIFIC[1], SPECIFIC[0]]
+    assert stats.ordered("redeem_input", SPECIFIC, "main") == SPECIFIC
+    entry = next(item for item in stats.get_statistics()["page_types"]["redeem_input"]["selectors"]
+                 if item["selector"] == SPECIFIC[1])
+    assert entry["kinds"] == {"iframe": 3}
+
+
+async def test_statistics_survive_flush(tmp_path, main_page):
+    path = str(tmp_path / "selector_stats.json")
+    stats = SelectorStats(path)
+    main_page.elements = {SPECIFIC[1]}
+    await stats.find("redeem_input", [main_page], SPECIFIC)
+    stats.flush(force=True)
+
+    assert SelectorStats(path).ordered("redeem_input", SPECIFIC, "main") == [SPECIFIC[1], SPECIFIC[0]]
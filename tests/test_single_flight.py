@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+async def test_followers_share_leader_result():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def check():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "valid"
+
+    tasks = [asyncio.create_task(flight.run("KEY", check)) for _ in range(4)]
+    await asyncio.sleep(0)
+    assert flight.in_flight("KEY")
+    release.set()
+
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert results == [("valid", False)] + [("valid", True)] * 3
+    assert not flight.in_flight("KEY")
+    assert flight.get_statistics()["coalesced"] == 3
+
+
+async def test_followers_retry_after_leader_failure():
+    flight = SingleFlight()
+    attempts = []
+    release = asyncio.Event()
+
+    async def check():
+        attempts.append(len(attempts))
+        await release.wait()
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("browser crashed")
+        return "used"
+
+    leader = asyncio.create_task(flight.run("KEY", check))
+    followers = [asyncio.create_task(flight.run("KEY", check)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    with pytest.raises(RuntimeError, match="browser crashed"):
+        await leader
+    results = await asyncio.gather(*followers)
+
+    assert len(attempts) == 2
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert {value for value, _ in results} == {"used"}
+    stats = flight.get_statistics()
+    assert stats["started"] == 2
+    assert stats["aborted"] == 1
+    assert stats["in_flight"] == 0
+
+
+async def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "invalid"
+
+    leader = asyncio.create_task(flight.run("KEY", slow))
+    await started.wait()
+    follower = asyncio.create_task(flight.run("KEY", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == ("invalid", False)
+    assert leader.cancelled()
+
+
+async def test_different_keys_run_independently():
+    flight = SingleFlight()
+
+    async def check(value):
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(flight.run("A", lambda: check(1)), flight.run("B", lambda: check(2)))
+
+    assert results == [(1, False), (2, False)]
+    assert flight.stats["coalesced"] == 0
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+import main
+from api import keys as keys_api
+from config import config
+from models.key import Key
+from services import account_manager, vpn_manager, job_store, result_cache, selector_stats
+from services.browser_pool import BrowserPool
+from services.check_worker import CheckWorker, QueueModeError
+from services.job_store import JobStore
+from services.key_checker import KeyChecker
+
+KEYS = ["BCDFG-HJKMP-QRTVW-XY234-6789B", "CDFGH-JKMPQ-RTVWX-Y2346-789BC", "DFGHJ-KMPQR-TVWXY-23467-89BCD"]
+
+
+async def noop(*args, **kwargs):
+    pass
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    for module in (account_manager, vpn_manager, job_store, result_cache, selector_stats):
+        monkeypatch.setattr(module, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(config.key.job_queue, "enabled", True)
+    monkeypatch.setattr(config.key.job_queue, "recover_on_startup", True)
+    monkeypatch.setattr(config.key.job_queue, "external_workers", False)
+    monkeypatch.setattr(config.vpn, "enabled", False)
+    monkeypatch.setattr(main.playwright_runtime, "start", noop)
+    monkeypatch.setattr(main.playwright_runtime, "stop", noop)
+    monkeypatch.setattr(BrowserPool, "initialize", noop)
+    return tmp_path
+
+
+@pytest.fixture
+def processed(monkeypatch):
+    batches = []
+
+    async def process_batch(self, batch_id, queued):
+        batches.append((batch_id, [(key.key, region) for key, region in queued]))
+        self.running_tasks.pop(batch_id, None)
+
+    monkeypatch.setattr(KeyChecker, "_process_batch", process_batch)
+    return batches
+
+
+async def test_unfinished_batches_resume_on_startup_without_requests(data_dir, processed):
+    store = JobStore(data_dir / "jobs.db")
+    store.create_batch("crashed", [(Key(key=key), "US") for key in KEYS])
+    store.mark_running("crashed", Key(key=KEYS[0]), "US", "a@example.com")
+    store.close()
+
+    async with main.lifespan(main.app):
+        await asyncio.sleep(0)
+        assert processed == [("crashed", [(key, "US") for key in KEYS])]
+        assert keys_api.key_checker is not None
+
+    assert keys_api.key_checker is None
+
+
+async def test_startup_with_empty_journal_schedules_nothing(data_dir, processed):
+    async with main.lifespan(main.app):
+        await asyncio.sleep(0)
+        assert processed == []
+
+
+async def test_workers_refuse_to_start_against_inline_api(data_dir, processed):
+    async with main.lifespan(main.app):
+        worker = CheckWorker(job_store=JobStore(data_dir / "jobs.db"))
+        with pytest.raises(QueueModeError):
+            await worker.run()
+
+
+async def test_external_api_accepts_workers(data_dir, processed, monkeypatch):
+    monkeypatch.setattr(config.key.job_queue, "external_workers", True)
+    store = JobStore(data_dir / "jobs.db")
+
+    async with main.lifespan(main.app):
+        assert store.accepts_workers()
+
+    store.close()
@@ -1,5 +1,17 @@
 from utils.crypto import encrypt_data, decrypt_data
-from utils.browser_utils import setup_browser, wait_for_navigation
+from utils.browser_utils import (
+    setup_browser,
+    wait_for_navigation,
+    Deadline,
+    capture_page_state,
+    wait_for_page_change,
+    wait_for_url_change,
+    wait_for_url_matching,
+    wait_for_frame,
+    wait_for_any_selector
+)
+from utils.playwright_runtime import PlaywrightRuntime, playwright_runtime
+from utils.local_proxy import LocalProxy
 from utils.file_handlers import read_file, write_file, parse_csv, parse_txt
 
 __all__ = [
@@ -7,6 +19,16 @@ __all__ = [
     "decrypt_data",
     "setup_browser",
     "wait_for_navigation",
+    "Deadline",
+    "capture_page_state",
+    "wait_for_page_change",
+    "wait_for_url_change",
+    "wait_for_url_matching",
+    "wait_for_frame",
+    "wait_for_any_selector",
+    "PlaywrightRuntime",
+    "playwright_runtime",
+    "LocalProxy",
     "read_file",
     "write_file",
     "parse_csv",
@@ -1,10 +1,12 @@
 import asyncio
 import logging
-from typing import Optional, Dict, Any, Tuple, List
+import time
+from typing import Optional, Dict, Any, Tuple, List, Callable, Sequence, Union
 
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page, TimeoutError, Response
+from playwright.async_api import Browser, BrowserContext, Page, Frame, ElementHandle, TimeoutError, Response
 
 from config import config
+from utils.playwright_runtime import playwright_runtime
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +27,7 @@ async def setup_browser(
     
     try:
         
-        playwright = await async_playwright().start()
+        playwright = await playwright_runtime.start()
         
         
         browser_launcher = getattr(playwright, browser_type)
@@ -164,4 +166,134 @@ async def click_element(page: Page, selector: str, timeout: int = None, wait_for
     
     except Exception as e:
         logger.error(f"Error clicking element: {str(e)}")
-        return False 
\ No newline at end of file
+        return False
+
+class Deadline:
+    def __init__(self, timeout: int):
+        self.timeout = timeout
+        self.started_at = time.monotonic()
+    
+    def remaining(self) -> int:
+        elapsed = (time.monotonic() - self.started_at) * 1000
+        return max(int(self.timeout - elapsed), 0)
+    
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+async def capture_page_state(page: Union[Page, Frame]) -> Dict[str, Any]:
+    
+    try:
+        text_length = await page.evaluate("() => document.body ? document.body.innerText.length : 0")
+    except Exception:
+        text_length = 0
+    
+    return {"url": page.url, "text_length": text_length}
+
+async def wait_for_page_change(page: Union[Page, Frame], previous_state: Dict[str, Any], timeout: int = 5000) -> bool:
+    
+    timeout = max(timeout, 1)
+    
+    try:
+        await page.wait_for_function(
+            """([url, textLength]) => location.href !== url ||
+                (document.body && document.body.innerText.length !== textLength)""",
+            arg=[previous_state["url"], previous_state["text_length"]],
+            timeout=timeout
+        )
+        return True
+    
+    except TimeoutError:
+        logger.debug(f"Page did not change within {timeout}ms")
+        return False
+    
+    except Exception as e:
+        logger.debug(f"Error waiting for page change: {str(e)}")
+        return page.url != previous_state["url"]
+
+async def wait_for_url_change(page: Page, previous_url: str, timeout: int = 5000) -> bool:
+    
+    try:
+        await page.wait_for_url(lambda url: url != previous_url, timeout=timeout, wait_until="commit")
+        return True
+    
+    except TimeoutError:
+        logger.debug(f"URL did not change from {previous_url} within {timeout}ms")
+        return False
+    
+    except Exception as e:
+        logger.debug(f"Error waiting for URL change: {str(e)}")
+        return page.url != previous_url
+
+async def wait_for_url_matching(page: Page, predicate: Callable[[str], bool], timeout: int = 5000) -> bool:
+    
+    if predicate(page.url):
+        return True
+    
+    try:
+        await page.wait_for_url(predicate, timeout=timeout, wait_until="commit")
+        return True
+    
+    except TimeoutError:
+        logger.debug(f"URL did not match within {timeout}ms, current URL: {page.url}")
+        return False
+    
+    except Exception as e:
+        logger.debug(f"Error waiting for URL: {str(e)}")
+        return predicate(page.url)
+
+async def wait_for_frame(page: Page, predicate: Callable[[Frame], bool], timeout: int = 15000) -> Optional[Frame]:
+    
+    deadline = Deadline(timeout)
+    
+    while True:
+        for frame in page.frames:
+            if predicate(frame):
+                return frame
+        
+        if deadline.expired:
+            logger.debug(f"No matching frame within {timeout}ms")
+            return None
+        
+        try:
+            await page.wait_for_event("framenavigated", timeout=max(deadline.remaining(), 1))
+        except TimeoutError:
+            pass
+        except Exception as e:
+            logger.debug(f"Error waiting for frame: {str(e)}")
+            return None
+
+async def wait_for_any_selector(
+    targets: Sequence[Union[Page, Frame]],
+    selectors: List[str],
+    timeout: int = 5000,
+    state: str = "attached"
+) -> Optional[Tuple[Union[Page, Frame], str, Optional[ElementHandle]]]:
+    
+    tasks = {}
+    for target in targets:
+        for selector in selectors:
+            task = asyncio.ensure_future(target.wait_for_selector(selector, timeout=timeout, state=state))
+            tasks[task] = (target, selector)
+    
+    if not tasks:
+        return None
+    
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled() or task.exception():
+                    continue
+                target, selector = tasks[task]
+                return target, selector, task.result()
+        
+        logger.debug(f"None of {len(selectors)} selectors reached state '{state}' within {timeout}ms")
+        return None
+    
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
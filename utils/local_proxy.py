@@ -0,0 +1,111 @@
+import asyncio
+import logging
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class LocalProxy:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8899, name: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.name = name or f"proxy:{port}"
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.stats = {"connections": 0, "tunnels": 0, "requests": 0, "errors": 0, "bytes": 0}
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"Local proxy {self.name} listening on {self.url}")
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {"name": self.name, "url": self.url, **self.stats}
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+
+            method, target, version = request_line.decode("latin-1").strip().split(" ", 2)
+            headers = []
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                headers.append(line)
+
+            if method.upper() == "CONNECT":
+                host, port = self._split_host(target, 443)
+                upstream_reader, upstream_writer = await asyncio.open_connection(host, port)
+                writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+                await writer.drain()
+                self.stats["tunnels"] += 1
+            else:
+                parts = urlsplit(target)
+                host, port = self._split_host(parts.netloc, 80)
+                upstream_reader, upstream_writer = await asyncio.open_connection(host, port)
+                path = parts.path or "/"
+                if parts.query:
+                    path += f"?{parts.query}"
+                upstream_writer.write(f"{method} {path} {version}\r\n".encode("latin-1"))
+                for header in headers:
+                    if not header.lower().startswith(b"proxy-"):
+                        upstream_writer.write(header)
+                upstream_writer.write(b"\r\n")
+                await upstream_writer.drain()
+                self.stats["requests"] += 1
+
+            logger.debug(f"{self.name}: {method} {target}")
+            await asyncio.gather(
+                self._pipe(reader, upstream_writer),
+                self._pipe(upstream_reader, writer)
+            )
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.debug(f"{self.name}: error handling client: {str(e)}")
+        finally:
+            writer.close()
+
+    async def _pipe(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                self.stats["bytes"] += len(data)
+                writer.write(data)
+                await writer.drain()
+        except Exception as e:
+            logger.debug(f"{self.name}: pipe closed: {str(e)}")
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _split_host(netloc: str, default_port: int) -> Tuple[str, int]:
+        if netloc.startswith("["):
+            host, _, port = netloc[1:].partition("]:")
+            return host.rstrip("]"), int(port) if port else default_port
+
+        host, _, port = netloc.partition(":")
+        return host, int(port) if port else default_port
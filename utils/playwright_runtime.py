@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Optional, Dict, Any, List
+
+import psutil
+from playwright.async_api import async_playwright, Playwright
+
+
+class PlaywrightRuntime:
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.playwright: Optional[Playwright] = None
+        self.lock = asyncio.Lock()
+        self.started_at: Optional[float] = None
+        self.starts = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self.playwright is not None
+
+    async def start(self) -> Playwright:
+        async with self.lock:
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+                self.started_at = time.time()
+                self.starts += 1
+                self.logger.info("Started Playwright driver")
+
+            return self.playwright
+
+    async def stop(self):
+        async with self.lock:
+            if self.playwright is None:
+                return
+
+            try:
+                await self.playwright.stop()
+            except Exception as e:
+                self.logger.error(f"Error stopping Playwright driver: {str(e)}")
+
+            self.playwright = None
+            self.started_at = None
+            self.logger.info("Stopped Playwright driver")
+
+    def get_process_statistics(self) -> Dict[str, Any]:
+        current = psutil.Process(os.getpid())
+        groups = {name: {"count": 0, "rss": 0} for name in ["driver", "browser", "renderer", "helper", "other"]}
+        processes: List[Dict[str, Any]] = []
+
+        for process in current.children(recursive=True):
+            try:
+                with process.oneshot():
+                    cmdline = process.cmdline()
+                    rss = process.memory_info().rss
+                    name = process.name()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+            group = self._classify_process(name, cmdline)
+            groups[group]["count"] += 1
+            groups[group]["rss"] += rss
+            processes.append({"pid": process.pid, "name": name, "group": group, "rss": rss})
+
+        return {
+            "running": self.is_running,
+            "driver_starts": self.starts,
+            "uptime": round(time.time() - self.started_at, 1) if self.started_at else 0.0,
+            "python_rss": current.memory_info().rss,
+            "children_rss": sum(group["rss"] for group in groups.values()),
+            "groups": groups,
+            "processes": processes
+        }
+
+    @staticmethod
+    def _classify_process(name: str, cmdline: List[str]) -> str:
+        command = " ".join(cmdline).lower()
+
+        if "node" in name.lower() and "playwright" in command:
+            return "driver"
+
+        if not any(browser in command for browser in ["chrom", "firefox", "webkit"]):
+            return "other"
+
+        if "--type=renderer" in command or "-contentproc" in command:
+            return "renderer"
+
+        if "--type=" in command:
+            return "helper"
+
+        return "browser"
+
+
+playwright_runtime = PlaywrightRuntime()